@@ -65,6 +65,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',  # First, so latency covers the whole stack
     'corsheaders.middleware.CorsMiddleware',  # CORS Middleware
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise
@@ -76,6 +77,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL count/time headers and sampled cProfile reports (core.middleware.ProfilingMiddleware)
+API_PROFILING = os.getenv('API_PROFILING', 'False') == 'True'
+API_PROFILE_SAMPLE_RATE = int(os.getenv('API_PROFILE_SAMPLE_RATE', '0'))  # Profile 1 in N requests, 0 = only ?profile=1
+API_PROFILE_DIR = os.getenv('API_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+if API_PROFILING:
+    MIDDLEWARE.insert(1, 'core.middleware.ProfilingMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -174,14 +182,25 @@ STORAGES = {
 }
 
 # DRF & CORS
+# Opt-in: stateless mode authorises API requests from the token's role/permission claims
+# instead of loading the user row; only the user's permission_version is looked
+# up, cached for AUTH_PERMISSION_CACHE_SECONDS (see core/authentication.py).
+# That cache is per process unless CACHES points at a shared backend, so other
+# workers honour a changed role until their entry expires
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', 'False') == 'True'
+AUTH_PERMISSION_CACHE_SECONDS = int(os.getenv('AUTH_PERMISSION_CACHE_SECONDS', '30'))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.StatelessJWTAuthentication' if JWT_STATELESS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
 }
 
 CORS_ALLOW_ALL_ORIGINS = os.getenv('CORS_ALLOW_ALL_ORIGINS', 'False') == 'True'
 CORS_ALLOWED_ORIGINS = [origin for origin in os.getenv('CORS_ALLOWED_ORIGINS', '').split(',') if origin]
+# Lets the frontend read ETags for conditional polling (open incidents feed)
+CORS_EXPOSE_HEADERS = ['ETag']
 CSRF_TRUSTED_ORIGINS = [origin for origin in os.getenv('CSRF_TRUSTED_ORIGINS', '').split(',') if origin]
 
 # Simple JWT
@@ -197,3 +216,95 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
+
+# Security log sources for check_logs, as comma separated KIND:PATH pairs
+# (kinds: all, auth, nginx, fail2ban), e.g. "auth:/var/log/auth.log,nginx:/var/log/nginx/access.log"
+SECURITY_LOG_SOURCES = [source for source in os.getenv('SECURITY_LOG_SOURCES', '').split(',') if source]
+
+# Security alert aggregation: alert once an IP produces THRESHOLD events of a type
+# within WINDOW seconds, then stay quiet for COOLDOWN seconds and send suppressed
+# counts in a digest every DIGEST_INTERVAL seconds.
+SECURITY_ALERT_THRESHOLD = int(os.getenv('SECURITY_ALERT_THRESHOLD', '5'))
+SECURITY_ALERT_WINDOW = int(os.getenv('SECURITY_ALERT_WINDOW', '60'))
+SECURITY_ALERT_COOLDOWN = int(os.getenv('SECURITY_ALERT_COOLDOWN', '3600'))
+SECURITY_DIGEST_INTERVAL = int(os.getenv('SECURITY_DIGEST_INTERVAL', '3600'))
+
+# Local CIDR datasets for IP enrichment (country.csv, asn.csv, *.txt/*.netset blocklists)
+SECURITY_IP_DATASETS_DIR = os.getenv('SECURITY_IP_DATASETS_DIR', str(BASE_DIR / 'ip_datasets'))
+
+# Check engine self-monitoring: the agent starts a cycle every PULSE_AGENT_INTERVAL
+# seconds; /api/health/ reports degraded when checks start more than
+# PULSE_HEALTH_MAX_LAG seconds late. PULSE_CYCLE_BUDGET (seconds, 0 = unlimited)
+# stops a cycle from starting new checks so an overloaded agent cannot drift.
+PULSE_AGENT_INTERVAL = int(os.getenv('PULSE_AGENT_INTERVAL', '60'))
+PULSE_HEALTH_MAX_LAG = float(os.getenv('PULSE_HEALTH_MAX_LAG', '30'))
+PULSE_CYCLE_BUDGET = float(os.getenv('PULSE_CYCLE_BUDGET', '0'))
+CHECK_CYCLE_RETENTION_DAYS = int(os.getenv('CHECK_CYCLE_RETENTION_DAYS', '14'))
+
+# Adaptive scheduling (monitor.scheduling): failing monitors are re-checked every
+# PULSE_CONFIRM_INTERVAL seconds (0 = off) for their first PULSE_CONFIRM_CHECKS
+# failures; monitors stable for PULSE_RELAX_AFTER seconds (0 = off) back off
+# toward their configured interval. The agent ticks often enough for both.
+PULSE_CONFIRM_INTERVAL = int(os.getenv('PULSE_CONFIRM_INTERVAL', '20'))
+PULSE_CONFIRM_CHECKS = int(os.getenv('PULSE_CONFIRM_CHECKS', '3'))
+PULSE_RELAX_AFTER = int(os.getenv('PULSE_RELAX_AFTER', '0'))
+
+# Check concurrency: PULSE_CHECK_WORKERS checks run at once, at most
+# PULSE_HOST_CONCURRENCY per host name and PULSE_IP_CONCURRENCY per resolved
+# address (0 = no limit), starting at least PULSE_HOST_SPACING seconds apart
+# per address so our own checks don't trip WAF rate limits or skew latency.
+PULSE_CHECK_WORKERS = int(os.getenv('PULSE_CHECK_WORKERS', '8'))
+PULSE_HOST_CONCURRENCY = int(os.getenv('PULSE_HOST_CONCURRENCY', '2'))
+PULSE_IP_CONCURRENCY = int(os.getenv('PULSE_IP_CONCURRENCY', '4'))
+PULSE_HOST_SPACING = float(os.getenv('PULSE_HOST_SPACING', '0.25'))
+
+# Opt-in: HTTP/API/KEYWORD monitors without an explicit parent depend on an
+# active PING (else PORT) monitor of the same host; while it is down they are
+# not checked themselves.
+PULSE_AUTO_DEPENDENCIES = os.getenv('PULSE_AUTO_DEPENDENCIES', 'False') == 'True'
+
+# Several agents can run side by side: each leases due monitors in batches of
+# PULSE_LEASE_BATCH (0 = all at once). A lease expires after PULSE_LEASE_SECONDS,
+# which must exceed the longest cycle, so a crashed agent's monitors are taken
+# over. PULSE_AGENT_ID names the agent in leases and cycles (default: host-pid).
+PULSE_AGENT_ID = os.getenv('PULSE_AGENT_ID', '')
+PULSE_LEASE_BATCH = int(os.getenv('PULSE_LEASE_BATCH', '100'))
+PULSE_LEASE_SECONDS = int(os.getenv('PULSE_LEASE_SECONDS', '300'))
+
+# Multi-location confirmation (monitor.incidents): an incident opens once
+# PULSE_PROBE_QUORUM locations (the local agent, named PULSE_PROBE_LOCATION, and
+# remote probe agents) reported the monitor down within PULSE_PROBE_MAX_AGE
+# seconds. Remote probes submit at most PULSE_PROBE_MAX_BATCH results per request.
+PULSE_PROBE_QUORUM = int(os.getenv('PULSE_PROBE_QUORUM', '1'))
+PULSE_PROBE_MAX_AGE = int(os.getenv('PULSE_PROBE_MAX_AGE', '300'))
+PULSE_PROBE_LOCATION = os.getenv('PULSE_PROBE_LOCATION', 'Local agent')
+PULSE_PROBE_MAX_BATCH = int(os.getenv('PULSE_PROBE_MAX_BATCH', '5000'))
+# Used by manage.py probe_agent when running as a remote probe
+PULSE_PROBE_SERVER = os.getenv('PULSE_PROBE_SERVER', '')
+PULSE_PROBE_TOKEN = os.getenv('PULSE_PROBE_TOKEN', '')
+
+# Response-time anomalies (monitor.anomaly): each monitor keeps an EWMA baseline
+# (smoothing PULSE_ANOMALY_ALPHA, 0 = off) judged after PULSE_ANOMALY_WARMUP
+# samples. A check is anomalous when the recent level is beyond
+# PULSE_ANOMALY_SIGMA deviations and at least PULSE_ANOMALY_MIN_RATIO times the
+# baseline; PULSE_ANOMALY_CHECKS in a row open a "degraded" incident, and three
+# times as many checks back near the baseline resolve it.
+PULSE_ANOMALY_ALPHA = float(os.getenv('PULSE_ANOMALY_ALPHA', '0.05'))
+PULSE_ANOMALY_WARMUP = int(os.getenv('PULSE_ANOMALY_WARMUP', '30'))
+PULSE_ANOMALY_SIGMA = float(os.getenv('PULSE_ANOMALY_SIGMA', '3'))
+PULSE_ANOMALY_MIN_RATIO = float(os.getenv('PULSE_ANOMALY_MIN_RATIO', '1.5'))
+PULSE_ANOMALY_CHECKS = int(os.getenv('PULSE_ANOMALY_CHECKS', '3'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.middleware': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>" when set, else a valid JWT
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
@@ -0,0 +1,83 @@
+"""
+Stateless JWT authentication.
+
+Access tokens carry the user's role and permission flags (see
+CustomTokenObtainPairSerializer), so requests are authorised from the token
+claims without loading the User row. The only lookup is the user's current
+permission_version, cached for AUTH_PERMISSION_CACHE_SECONDS: once a role,
+flag or active status changes, tokens minted before the change are
+rejected (within that window on other workers) and the client refreshes.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+PERMISSION_CLAIMS = ('role', 'can_create', 'can_edit', 'can_delete')
+VERSION_CLAIM = 'pv'
+
+
+def add_permission_claims(token, user):
+    for claim in PERMISSION_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = user.permission_version
+    return token
+
+
+def current_permission_version(user_id):
+    """The user's permission_version, or None when the user is missing or inactive."""
+    def load():
+        version = User.objects.filter(pk=user_id, is_active=True).values_list('permission_version', flat=True).first()
+        # Cache misses for unknown users too, as -1
+        return -1 if version is None else version
+
+    version = cache.get_or_set(User.PERMISSION_CACHE_KEY.format(user_id), load, settings.AUTH_PERMISSION_CACHE_SECONDS)
+    return None if version == -1 else version
+
+
+class PulseTokenUser(TokenUser):
+    """Request user built from token claims; has what the permission classes need."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def can_create(self):
+        return bool(self.token.get('can_create'))
+
+    @cached_property
+    def can_edit(self):
+        return bool(self.token.get('can_edit'))
+
+    @cached_property
+    def can_delete(self):
+        return bool(self.token.get('can_delete'))
+
+    @property
+    def is_superadmin(self):
+        return self.role == 'SUPERADMIN'
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        # Tokens issued before permission claims existed still resolve the row
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        version = current_permission_version(user_id)
+        if version is None:
+            raise AuthenticationFailed('User not found or inactive', code='user_not_found')
+        if validated_token[VERSION_CLAIM] != version:
+            raise AuthenticationFailed('Token permissions are outdated, refresh the token', code='token_outdated')
+        return PulseTokenUser(validated_token)
+
+
+def get_authentication_class():
+    return StatelessJWTAuthentication if settings.JWT_STATELESS_AUTH else JWTAuthentication
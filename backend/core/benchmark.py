@@ -0,0 +1,271 @@
+"""
+Synthetic fleet generator and timing harness for the `benchmark` command.
+
+Everything here writes to whatever database is active, so the command runs
+it inside a throwaway test database.
+"""
+import datetime
+import hashlib
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from core.profiling import QueryStats
+
+BATCH_SIZE = 5000
+MONITOR_TYPES = ('HTTP', 'HTTP', 'HTTP', 'API', 'KEYWORD', 'PING', 'PORT')
+SECURITY_TYPES = ('UFW_BLOCK', 'SSH_FAIL', 'SSH_FAIL', 'SUDO_FAIL', 'HTTP_ERROR', 'FAIL2BAN_BAN')
+
+
+@contextmanager
+def benchmark_database(db_file=None, keepdb=False):
+    """
+    Switches the default connection to a test database for the duration of
+    the block: in memory, or `db_file` (SQLite) which keepdb preserves.
+    """
+    if db_file:
+        if connection.vendor != 'sqlite':
+            raise ValueError('A database file only applies to SQLite')
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = db_file
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Lets bulk_create store historical values in auto_now_add fields."""
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+def _bulk(model, objects):
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    return len(objects)
+
+
+def generate_fleet(monitors=100, days=7, intervals=(1, 5, 15), outages_per_day=0.5,
+                   security_events=20000, seed=1, log=None):
+    """
+    Creates a superadmin, `monitors` monitors with `days` of check history,
+    incidents with activity logs for random outages, a status page and
+    security events. Returns counts of the rows created.
+    """
+    from core.models import User
+    from monitor.models import ActivityLog, AlertContact, Incident, MonitoredURL, MonitorStatus, StatusPage, UptimeRecord
+    from security.models import SecurityEvent
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    log = log or (lambda message: None)
+    counts = {}
+
+    User.objects.create_user(username='bench-admin', email='bench@example.com', password='bench', role='SUPERADMIN')
+    contacts = [AlertContact.objects.create(name=f"bench-{i}", contact_type='EMAIL', value=f"ops{i}@example.com") for i in range(3)]
+
+    _bulk(MonitoredURL, [
+        MonitoredURL(
+            name=f"bench-{i:05d}",
+            url=f"https://site{i}.example.com/health",
+            monitor_type=rng.choice(MONITOR_TYPES),
+            interval=rng.choice(intervals),
+            keyword='ok',
+            port=443,
+        )
+        for i in range(monitors)
+    ])
+    fleet = list(MonitoredURL.objects.filter(name__startswith='bench-').order_by('id'))
+    through = MonitoredURL.alert_contacts.through
+    through.objects.bulk_create([through(monitoredurl_id=m.id, alertcontact_id=rng.choice(contacts).id) for m in fleet], batch_size=BATCH_SIZE)
+    counts['monitors'] = len(fleet)
+    log(f"Created {len(fleet)} monitors")
+
+    records = incidents = 0
+    statuses = []
+    with explicit_timestamps(UptimeRecord._meta.get_field('checked_at'), Incident._meta.get_field('started_at'),
+                             ActivityLog._meta.get_field('timestamp')):
+        batch = []
+        for monitor in fleet:
+            step = datetime.timedelta(minutes=monitor.interval)
+            checks = int(days * 1440 / monitor.interval)
+            if not checks:
+                # Nothing to generate (e.g. --days 0): the monitor has no history yet
+                statuses.append(MonitorStatus(monitor=monitor))
+                continue
+            down = set()
+            for _ in range(max(0, round(days * outages_per_day * rng.random() * 2))):
+                start = rng.randrange(checks)
+                down.update(range(start, min(checks, start + rng.randint(1, 6))))
+
+            for n in range(checks):
+                is_up = n not in down
+                batch.append(UptimeRecord(
+                    url=monitor,
+                    status_code=200 if is_up else rng.choice((500, 502, 503)),
+                    response_time=rng.lognormvariate(-1.8, 0.5),
+                    is_up=is_up,
+                    error_message=None if is_up else 'Service unavailable',
+                    checked_at=now - step * (checks - n),
+                ))
+            last = batch[-1]
+            if len(batch) >= BATCH_SIZE:
+                records += _bulk(UptimeRecord, batch)
+                batch = []
+
+            # One incident per contiguous outage, oldest first
+            outage_starts = sorted(n for n in down if n - 1 not in down)
+            for start in outage_starts:
+                end = start
+                while end + 1 in down:
+                    end += 1
+                started_at = now - step * (checks - start)
+                resolved_at = now - step * (checks - end - 1)
+                is_open = end == checks - 1
+                incident = Incident.objects.create(
+                    monitor=monitor,
+                    status='OPEN' if is_open else 'RESOLVED',
+                    root_cause='Service unavailable',
+                    started_at=started_at,
+                    resolved_at=None if is_open else resolved_at,
+                )
+                logs = [
+                    ActivityLog(incident=incident, message='Outage detected', log_type='ERROR', timestamp=started_at),
+                    ActivityLog(incident=incident, message='Outage confirmed', log_type='ERROR', timestamp=started_at),
+                ]
+                if not is_open:
+                    logs.append(ActivityLog(incident=incident, message='Incident resolved', log_type='SUCCESS', timestamp=resolved_at))
+                ActivityLog.objects.bulk_create(logs)
+                incidents += 1
+
+            failures = 0
+            while checks - 1 - failures in down:
+                failures += 1
+            statuses.append(MonitorStatus(
+                monitor=monitor, status='UP' if last.is_up else 'DOWN', is_up=last.is_up,
+                status_code=last.status_code, response_time=last.response_time, error_message=last.error_message,
+                last_checked_at=last.checked_at, consecutive_failures=failures,
+                open_incident=incident if failures else None,
+            ))
+        records += _bulk(UptimeRecord, batch)
+    _bulk(MonitorStatus, statuses)
+    counts['uptime_records'] = records
+    counts['incidents'] = incidents
+    log(f"Created {records} uptime records and {incidents} incidents")
+
+    page = StatusPage.objects.create(name='Bench status', slug='bench')
+    page.monitors.set(fleet[:50])
+
+    ips = [f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(max(1, security_events // 20))]
+    seconds = max(1, int(days * 86400))
+    counts['security_events'] = _bulk(SecurityEvent, [
+        SecurityEvent(
+            event_type=rng.choice(SECURITY_TYPES),
+            ip_address=rng.choice(ips),
+            raw_log=f"bench event {i}",
+            detected_at=now - datetime.timedelta(seconds=rng.randrange(seconds)),
+            source='/var/log/bench.log',
+            fingerprint=hashlib.sha256(f"bench-{seed}-{i}".encode()).hexdigest(),
+        )
+        for i in range(security_events)
+    ])
+    log(f"Created {counts['security_events']} security events")
+    return counts
+
+
+def synthetic_log_lines(count, seed=1):
+    """auth.log and ufw lines in the formats the parser pipeline understands, plus noise."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        ip = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        stamp = f"Jan {1 + i % 28:2d} {i % 24:02d}:{i % 60:02d}:{(i * 7) % 60:02d}"
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"{stamp} host sshd[{1000 + i}]: Failed password for root from {ip} port {20000 + i % 40000} ssh2")
+        elif kind == 1:
+            lines.append(f"{stamp} host kernel: [UFW BLOCK] IN=eth0 OUT= SRC={ip} DST=10.0.0.1 PROTO=TCP SPT={i % 65535} DPT=22")
+        elif kind == 2:
+            lines.append(f"{stamp} host sshd[{1000 + i}]: Invalid user admin{i % 50} from {ip} port {i % 65535}")
+        else:
+            lines.append(f"{stamp} host CRON[{1000 + i}]: pam_unix(cron:session): session opened for user root")
+    return lines
+
+
+class Benchmark:
+    """Collects per-iteration wall time and SQL query counts by case name."""
+
+    def __init__(self):
+        self.results = {}
+
+    def measure(self, name, func, iterations=20, warmup=1):
+        for _ in range(warmup):
+            func()
+        samples = []
+        for _ in range(iterations):
+            queries = QueryStats()
+            with queries.capture():
+                started = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - started
+            samples.append((elapsed, queries.count, queries.seconds))
+        self.results[name] = samples
+        return samples
+
+    def summary(self):
+        rows = {}
+        for name, samples in self.results.items():
+            times = sorted(s[0] * 1000 for s in samples)
+            rows[name] = {
+                'n': len(times),
+                'p50_ms': round(percentile(times, 50), 2),
+                'p95_ms': round(percentile(times, 95), 2),
+                'p99_ms': round(percentile(times, 99), 2),
+                'max_ms': round(times[-1], 2),
+                'queries': round(statistics.mean(s[1] for s in samples), 1),
+                'sql_ms': round(statistics.mean(s[2] for s in samples) * 1000, 2),
+            }
+        return rows
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+def format_table(rows, baseline=None):
+    columns = ('n', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'queries', 'sql_ms')
+    width = max([len(name) for name in rows] + [4])
+    lines = [f"{'case':<{width}}  " + '  '.join(f"{c:>9}" for c in columns) + ('  p50 vs base' if baseline else '')]
+    for name, row in rows.items():
+        line = f"{name:<{width}}  " + '  '.join(f"{row[c]:>9}" for c in columns)
+        base = (baseline or {}).get(name)
+        if base and base.get('p50_ms'):
+            line += f"  {(row['p50_ms'] - base['p50_ms']) / base['p50_ms'] * 100:+.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f).get('results', {})
@@ -1,16 +1,18 @@
-from rest_framework import viewsets
+from urllib.parse import urlencode
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.functions import TruncHour
+from rest_framework import viewsets, permissions
+from rest_framework.pagination import CursorPagination
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from monitor.models import MonitoredURL, UptimeRecord
-from security.models import SecurityEvent
+from monitor.models import MonitoredURL
+from monitor.status import serialize_status
+from security.models import SecurityEvent, SecurityOffender
+from security.filters import filter_events
 from rest_framework import serializers
 
 # Serializers
-class UptimeRecordSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = UptimeRecord
-        fields = '__all__'
-
 class MonitoredURLSerializer(serializers.ModelSerializer):
     last_record = serializers.SerializerMethodField()
 
@@ -19,19 +21,21 @@ class MonitoredURLSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'url', 'interval', 'is_active', 'last_record']
 
     def get_last_record(self, obj):
-        last = obj.records.last()
-        if last:
-            return UptimeRecordSerializer(last).data
-        return None
+        return serialize_status(getattr(obj, 'current_status', None))
 
 class SecurityEventSerializer(serializers.ModelSerializer):
     class Meta:
         model = SecurityEvent
         fields = '__all__'
 
+class SecurityOffenderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SecurityOffender
+        fields = ['ip_address', 'event_type', 'count', 'first_seen', 'last_seen', 'last_alerted_at']
+
 # Views
 class MonitorViewSet(viewsets.ModelViewSet):
-    queryset = MonitoredURL.objects.all()
+    queryset = MonitoredURL.objects.select_related('current_status')
     serializer_class = MonitoredURLSerializer
 
     @action(detail=False, methods=['get'])
@@ -40,6 +44,71 @@ class MonitorViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(urls, many=True)
         return Response(serializer.data)
 
+class SecurityEventPagination(CursorPagination):
+    ordering = '-detected_at'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
 class SecurityViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = SecurityEvent.objects.order_by('-detected_at')[:20]
+    """
+    Security events, newest first, cursor paginated over the detected_at index.
+    Filters: type, ip, cidr, since, until, resolved, aggregate.
+    """
     serializer_class = SecurityEventSerializer
+    pagination_class = SecurityEventPagination
+    permission_classes = [permissions.IsAuthenticated]
+
+    # Aggregations are cached briefly; dashboards poll them
+    AGGREGATE_CACHE_SECONDS = 30
+    AGGREGATE_DEFAULT_DAYS = 1
+    AGGREGATE_MAX_ROWS = 100
+
+    def get_queryset(self):
+        return filter_events(SecurityEvent.objects.all(), self.request.query_params)
+
+    def _limit(self, request, default=10):
+        try:
+            return max(1, min(int(request.query_params.get('limit', default)), self.AGGREGATE_MAX_ROWS))
+        except ValueError:
+            return default
+
+    def _cached(self, request, name, compute):
+        key = f"security-events:{name}:{urlencode(sorted(request.query_params.items()))}"
+        return cache.get_or_set(key, compute, self.AGGREGATE_CACHE_SECONDS)
+
+    @action(detail=False, methods=['get'], url_path='by-ip')
+    def by_ip(self, request):
+        # GROUP BY ip_address over the (filtered) time range, default last 24h
+        queryset = filter_events(SecurityEvent.objects.filter(is_aggregate=False), request.query_params, self.AGGREGATE_DEFAULT_DAYS)
+        limit = self._limit(request)
+
+        def compute():
+            rows = (queryset.exclude(ip_address__isnull=True)
+                    .values('ip_address')
+                    .annotate(count=Count('id'), last_seen=Max('detected_at'))
+                    .order_by('-count')[:limit])
+            return list(rows)
+        return Response(self._cached(request, 'by-ip', compute))
+
+    @action(detail=False, methods=['get'], url_path='per-hour')
+    def per_hour(self, request):
+        queryset = filter_events(SecurityEvent.objects.filter(is_aggregate=False), request.query_params, self.AGGREGATE_DEFAULT_DAYS)
+
+        def compute():
+            rows = (queryset.annotate(hour=TruncHour('detected_at'))
+                    .values('hour', 'event_type')
+                    .annotate(count=Count('id'))
+                    .order_by('hour', 'event_type'))
+            return list(rows)
+        return Response(self._cached(request, 'per-hour', compute))
+
+    @action(detail=False, methods=['get'], url_path='top-offenders')
+    def top_offenders(self, request):
+        # Reads the running totals kept by check_logs instead of aggregating SecurityEvent
+        offenders = SecurityOffender.objects.order_by('-count')
+        event_type = request.query_params.get('type')
+        if event_type:
+            offenders = offenders.filter(event_type=event_type)
+        limit = self._limit(request)
+        return Response(SecurityOffenderSerializer(offenders[:limit], many=True).data)
@@ -0,0 +1,25 @@
+"""Parsing of date/time query parameters shared by the API apps."""
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def parse_timestamp(value, end_of_day=False):
+    """
+    Accepts an ISO datetime or a plain date (YYYY-MM-DD). Naive values are
+    interpreted in the project timezone. Returns None for empty input.
+    """
+    if not value:
+        return None
+    # Plain dates first: parse_datetime also accepts them (as midnight)
+    day = parse_date(value)
+    if day is not None:
+        parsed = datetime.datetime.combine(day, datetime.time.max if end_of_day else datetime.time.min)
+    else:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"Invalid date: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
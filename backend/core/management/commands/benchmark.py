@@ -0,0 +1,126 @@
+import itertools
+import json
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.benchmark import Benchmark, benchmark_database, format_table, generate_fleet, load_baseline, synthetic_log_lines
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the main API and ingest paths against a synthetic fleet in a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--monitors', type=int, default=100, help='Number of synthetic monitors')
+        parser.add_argument('--days', type=int, default=7, help='Days of check history per monitor')
+        parser.add_argument('--intervals', type=str, default='1,5,15', help='Comma separated check intervals (minutes) to pick from')
+        parser.add_argument('--outages-per-day', type=float, default=0.5, help='Average outages (incidents) per monitor per day')
+        parser.add_argument('--security-events', type=int, default=20000, help='Number of synthetic security events')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed iterations per case')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed, keep fixed to compare runs')
+        parser.add_argument('--cases', type=str, help='Only run cases whose name contains one of these comma separated strings')
+        parser.add_argument('--db-file', type=str, help='SQLite file for the benchmark database (default: in memory)')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database and reuse its data on the next run')
+        parser.add_argument('--output', type=str, help='Write results as JSON to this file')
+        parser.add_argument('--compare', type=str, help='JSON results of a previous run to compare p50 latency against')
+
+    def handle(self, *args, **options):
+        baseline = load_baseline(options['compare']) if options['compare'] else None
+        if options['db_file'] and connection.vendor != 'sqlite':
+            raise CommandError('--db-file only applies to SQLite')
+
+        with benchmark_database(options['db_file'], options['keepdb']):
+            dataset = self.prepare(options)
+            bench = Benchmark()
+            for name, func in self.cases(options):
+                if options['cases'] and not any(part in name for part in options['cases'].split(',')):
+                    continue
+                self.stdout.write(f"Running {name}...")
+                bench.measure(name, func, iterations=options['iterations'])
+            rows = bench.summary()
+
+        self.stdout.write(format_table(rows, baseline))
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'python': platform.python_version(),
+                    'database': connection.vendor,
+                    'dataset': dataset,
+                    'options': {k: options[k] for k in ('monitors', 'days', 'intervals', 'security_events', 'iterations', 'seed')},
+                    'results': rows,
+                }, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def prepare(self, options):
+        from monitor.models import MonitoredURL
+        if options['keepdb'] and MonitoredURL.objects.filter(name__startswith='bench-').exists():
+            self.stdout.write("Reusing the existing benchmark dataset")
+            return {'reused': True}
+        intervals = [int(value) for value in options['intervals'].split(',') if value]
+        return generate_fleet(
+            monitors=options['monitors'],
+            days=options['days'],
+            intervals=intervals,
+            outages_per_day=options['outages_per_day'],
+            security_events=options['security_events'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+
+    def cases(self, options):
+        from rest_framework.test import APIClient
+        from core.models import User
+        from monitor.incidents import IncidentManager
+        from monitor.models import MonitoredURL, UptimeRecord
+        from monitor.summary import fleet_summary
+        from security.ingest import EventIngestor
+        from security.parsers import ParserPipeline
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(email='bench@example.com'))
+        monitor_ids = itertools.cycle(MonitoredURL.objects.filter(name__startswith='bench-').values_list('id', flat=True))
+
+        def get(path):
+            def run():
+                response = client.get(path() if callable(path) else path)
+                if response.status_code != 200:
+                    raise CommandError(f"{response.status_code} from {response.request['PATH_INFO']}")
+            return run
+
+        yield 'api.monitors.list', get('/api/monitors/')
+        yield 'api.monitors.summary', get('/api/monitors/summary/')
+        # The endpoint is cached, time the uncached build as well
+        yield 'monitors.fleet_summary', fleet_summary
+        yield 'api.monitors.detail', get(lambda: f"/api/monitors/{next(monitor_ids)}/")
+        yield 'api.incidents.list', get('/api/incidents/')
+        yield 'api.status_pages.by_slug', get('/api/status-pages/by-slug/bench/')
+        yield 'api.security_events.list', get('/api/security-events/')
+        yield 'api.security_events.filtered', get('/api/security-events/?type=SSH_FAIL,UFW_BLOCK&cidr=10.0.0.0/8')
+        yield 'api.security_events.by_ip', get('/api/security-events/by-ip/')
+
+        # Ingest paths, per batch: parse + dedup + insert, and the per-check result writes
+        batch_lines = 1000
+        lines = iter(synthetic_log_lines(batch_lines * (options['iterations'] + 1), seed=options['seed']))
+        pipeline = ParserPipeline('auth')
+
+        def ingest_security():
+            ingestor = EventIngestor(source='/var/log/bench-auth.log')
+            for line in itertools.islice(lines, batch_lines):
+                parsed = pipeline.parse(line)
+                if parsed:
+                    ingestor.add(*parsed, line)
+            ingestor.flush()
+        yield f'ingest.security_lines[x{batch_lines}]', ingest_security
+
+        incidents = IncidentManager()
+        batch_checks = 100
+
+        def write_results():
+            for _ in range(batch_checks):
+                monitor = MonitoredURL(id=next(monitor_ids))
+                UptimeRecord.objects.create(url=monitor, status_code=200, response_time=0.12, is_up=True)
+                incidents.update(monitor, True, '')
+        yield f'ingest.check_results[x{batch_checks}]', write_results
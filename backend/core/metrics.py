@@ -0,0 +1,350 @@
+"""
+Minimal Prometheus-style metrics registry.
+
+Each process keeps its metrics in memory and periodically merges them into a
+MetricSnapshot row named after its role, host and pid (e.g.
+"agent@pulse-1:42"), so workers sharing a host never write each other's row.
+Counters and histograms are merged as deltas since the previous flush;
+gauges are overwritten. Rows of processes on the same host that have exited,
+such as earlier check_websites runs, are folded into the flushing process's
+row: their counts carry on and their gauges are dropped. The /metrics view
+renders the merged snapshots of every process, which makes the agent
+container visible from the web container.
+"""
+import math
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Gauges from processes that have not flushed for this long are dropped
+GAUGE_STALE_SECONDS = 300
+
+
+def _label_key(labelnames, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values))
+
+
+def _merge_count(samples, kind, key, value):
+    """Adds a counter or histogram delta to stored samples."""
+    if kind == 'counter':
+        samples[key] = samples.get(key, 0) + value
+        return
+    current = samples.get(key) or {'buckets': [0] * len(value['buckets']), 'sum': 0.0, 'count': 0}
+    samples[key] = {
+        'buckets': [a + b for a, b in zip(current['buckets'], value['buckets'])],
+        'sum': current['sum'] + value['sum'],
+        'count': current['count'] + value['count'],
+    }
+
+
+def _process_alive(pid):
+    if os.name == 'nt':
+        # os.kill() would terminate the process there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Child:
+    def __init__(self, family, key):
+        self._family = family
+        self._key = key
+
+    def inc(self, amount=1):
+        self._family._inc(self._key, amount)
+
+    def dec(self, amount=1):
+        self._family._inc(self._key, -amount)
+
+    def set(self, value):
+        self._family._set(self._key, value)
+
+    def observe(self, value):
+        self._family._observe(self._key, value)
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class MetricFamily:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = registry.lock
+        self._values = {}
+        self._flushed = {}
+        registry.register(self)
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        return _Child(self, _label_key(self.labelnames, values))
+
+    # Unlabelled shortcuts
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def track_inprogress(self):
+        return self.labels().track_inprogress()
+
+
+class Counter(MetricFamily):
+    kind = 'counter'
+
+    def _inc(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def take_delta(self):
+        delta = {}
+        for key, value in self._values.items():
+            change = value - self._flushed.get(key, 0)
+            if change:
+                delta[key] = change
+        self._flushed = dict(self._values)
+        return delta
+
+
+class Gauge(MetricFamily):
+    kind = 'gauge'
+
+    def _inc(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _set(self, key, value):
+        with self._lock:
+            self._values[key] = value
+
+    def take_delta(self):
+        return dict(self._values)
+
+
+class Histogram(MetricFamily):
+    kind = 'histogram'
+
+    def _observe(self, key, value):
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                sample = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+
+    def take_delta(self):
+        delta = {}
+        for key, sample in self._values.items():
+            flushed = self._flushed.get(key) or {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            if sample['count'] == flushed['count']:
+                continue
+            delta[key] = {
+                'buckets': [a - b for a, b in zip(sample['buckets'], flushed['buckets'])],
+                'sum': sample['sum'] - flushed['sum'],
+                'count': sample['count'] - flushed['count'],
+            }
+        self._flushed = {key: {'buckets': list(s['buckets']), 'sum': s['sum'], 'count': s['count']} for key, s in self._values.items()}
+        return delta
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.families = {}
+        self.role = 'web'
+        self._last_flush = time.monotonic()
+
+    def register(self, family):
+        self.families[family.name] = family
+
+    def counter(self, name, documentation, labelnames=()):
+        return Counter(self, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return Gauge(self, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return Histogram(self, name, documentation, labelnames, buckets)
+
+    @property
+    def host_name(self):
+        return f"{self.role}@{os.getenv('HOSTNAME') or socket.gethostname()}"
+
+    @property
+    def process_name(self):
+        return f"{self.host_name}:{os.getpid()}"
+
+    def flush(self):
+        """Merges this process's metrics into its MetricSnapshot row."""
+        from django.db import transaction
+        from .models import MetricSnapshot
+
+        with self.lock:
+            deltas = {name: (family, family.take_delta()) for name, family in self.families.items()}
+            self._last_flush = time.monotonic()
+
+        with transaction.atomic():
+            snapshot, _ = MetricSnapshot.objects.select_for_update().get_or_create(process=self.process_name)
+            payload = snapshot.payload or {}
+            self._fold_exited(MetricSnapshot, payload)
+            for name, (family, delta) in deltas.items():
+                stored = payload.setdefault(name, {'samples': {}})
+                stored.update({'type': family.kind, 'help': family.documentation, 'buckets': list(family.buckets)})
+                samples = stored['samples']
+                for key, value in delta.items():
+                    if family.kind == 'gauge':
+                        samples[key] = value
+                    else:
+                        _merge_count(samples, family.kind, key, value)
+                if family.kind == 'gauge':
+                    # Gauges reflect current state only
+                    for key in list(samples):
+                        if key not in delta:
+                            del samples[key]
+            snapshot.payload = payload
+            snapshot.save()
+
+    def _fold_exited(self, model, payload):
+        """Moves counts of exited processes on this host into payload and deletes their rows."""
+        prefix = f"{self.host_name}:"
+        rows = model.objects.select_for_update().filter(process__startswith=prefix).exclude(process=self.process_name)
+        exited = []
+        for row in rows:
+            pid = row.process[len(prefix):]
+            if not pid.isdigit() or not _process_alive(int(pid)):
+                exited.append(row)
+        for row in exited:
+            for name, family in (row.payload or {}).items():
+                if family['type'] == 'gauge':
+                    continue
+                stored = payload.setdefault(name, {k: v for k, v in family.items() if k != 'samples'})
+                samples = stored.setdefault('samples', {})
+                for key, value in family['samples'].items():
+                    _merge_count(samples, family['type'], key, value)
+        model.objects.filter(pk__in=[row.pk for row in exited]).delete()
+
+    def maybe_flush(self, interval=10):
+        if time.monotonic() - self._last_flush >= interval:
+            try:
+                self.flush()
+            except Exception:
+                # Metrics must never break the request or the check cycle
+                pass
+
+
+def render(snapshots, now=None):
+    """Renders merged MetricSnapshot rows in the Prometheus text format."""
+    from django.utils import timezone
+    now = now or timezone.now()
+    merged = {}
+    for snapshot in snapshots:
+        stale = (now - snapshot.updated_at).total_seconds() > GAUGE_STALE_SECONDS
+        for name, family in (snapshot.payload or {}).items():
+            target = merged.setdefault(name, {'type': family['type'], 'help': family['help'], 'buckets': family.get('buckets', []), 'samples': {}})
+            for key, value in family['samples'].items():
+                if family['type'] == 'gauge':
+                    if stale:
+                        continue
+                    # Keep per-process gauges apart
+                    process_label = f'process="{_escape(snapshot.process)}"'
+                    target['samples'][f"{key},{process_label}" if key else process_label] = value
+                elif family['type'] == 'counter':
+                    target['samples'][key] = target['samples'].get(key, 0) + value
+                else:
+                    current = target['samples'].get(key)
+                    if current is None:
+                        target['samples'][key] = {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+                    else:
+                        current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                        current['sum'] += value['sum']
+                        current['count'] += value['count']
+
+    lines = []
+    for name in sorted(merged):
+        family = merged[name]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for key, value in sorted(family['samples'].items()):
+            if family['type'] != 'histogram':
+                lines.append(f"{name}{{{key}}} {_format(value)}" if key else f"{name} {_format(value)}")
+                continue
+            prefix = f"{key}," if key else ''
+            for bound, count in zip(family['buckets'], value['buckets']):
+                lines.append(f'{name}_bucket{{{prefix}le="{_format(bound)}"}} {count}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {value["count"]}')
+            lines.append(f"{name}_sum{{{key}}} {_format(value['sum'])}" if key else f"{name}_sum {_format(value['sum'])}")
+            lines.append(f"{name}_count{{{key}}} {value['count']}" if key else f"{name}_count {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _format(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+registry = Registry()
+
+# Check engine (monitor app)
+CHECK_DURATION = registry.histogram('pulse_check_duration_seconds', 'Duration of a single monitor check', ['monitor_type'])
+CHECKS_TOTAL = registry.counter('pulse_checks_total', 'Completed monitor checks', ['monitor_type', 'result'])
+CHECKS_IN_FLIGHT = registry.gauge('pulse_checks_in_flight', 'Monitor checks currently running')
+CYCLE_DURATION = registry.histogram('pulse_check_cycle_duration_seconds', 'Duration of a full check cycle', buckets=(1, 5, 10, 20, 30, 45, 60, 90, 120, 300, 600))
+SCHEDULER_LAG = registry.gauge('pulse_scheduler_lag_seconds', 'Delay between the scheduled and actual start of the last check cycle')
+DB_WRITE_DURATION = registry.histogram('pulse_db_write_duration_seconds', 'Duration of check engine database writes', ['operation'])
+LATENCY_EVENTS = registry.counter('pulse_latency_events_total', 'Monitors entering or leaving degraded response time', ['event'])
+HOST_SLOT_WAIT = registry.histogram('pulse_host_slot_wait_seconds', 'Time checks waited for per-host/per-address concurrency slots and spacing')
+
+# Notifications
+NOTIFICATION_QUEUE_DEPTH = registry.gauge('pulse_notification_queue_depth', 'Notifications waiting to be delivered')
+NOTIFICATIONS_SENT = registry.counter('pulse_notifications_sent_total', 'Delivered notifications', ['channel'])
+NOTIFICATIONS_FAILED = registry.counter('pulse_notifications_failed_total', 'Failed notification deliveries', ['channel'])
+
+# API
+API_REQUEST_DURATION = registry.histogram('pulse_api_request_duration_seconds', 'API request latency by view', ['view', 'method', 'status'])
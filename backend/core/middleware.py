@@ -0,0 +1,91 @@
+import logging
+import os
+import random
+import time
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import get_authentication_class
+from .metrics import API_REQUEST_DURATION, registry
+from .profiling import Profiler, QueryStats
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """Records API latency per resolved view and periodically flushes this worker's metrics."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name != 'metrics':
+            API_REQUEST_DURATION.labels(
+                view=match.view_name,
+                method=request.method,
+                status=f"{response.status_code // 100}xx",
+            ).observe(time.perf_counter() - started)
+            registry.maybe_flush()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in (API_PROFILING) request profiling. Every request gets SQL query
+    count/time and total time in X-SQL-Queries, X-SQL-Time-Ms and
+    X-Response-Time-Ms headers and a log line. A request is also profiled with
+    cProfile when a superadmin passes ?profile=1, or for 1 in
+    API_PROFILE_SAMPLE_RATE requests; the report is written to API_PROFILE_DIR
+    and named in X-Profile-Report.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryStats()
+        started = time.perf_counter()
+        if self.should_profile(request):
+            profiler = Profiler(limit=60)
+            with queries.capture(), profiler:
+                response = self.get_response(request)
+            report = self.save_report(request, profiler, response)
+            response['X-Profile-Report'] = os.path.basename(report)
+        else:
+            with queries.capture():
+                response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        response['X-SQL-Queries'] = str(queries.count)
+        response['X-SQL-Time-Ms'] = f"{queries.seconds * 1000:.1f}"
+        response['X-Response-Time-Ms'] = f"{elapsed * 1000:.1f}"
+        logger.info(
+            "%s %s %s: %d queries, %.1fms SQL, %.1fms total",
+            request.method, request.path, response.status_code, queries.count, queries.seconds * 1000, elapsed * 1000,
+        )
+        return response
+
+    def should_profile(self, request):
+        rate = settings.API_PROFILE_SAMPLE_RATE
+        if rate and random.randrange(rate) == 0:
+            return True
+        if request.GET.get('profile') != '1':
+            return False
+        try:
+            authenticated = get_authentication_class()().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return bool(authenticated) and authenticated[0].role == 'SUPERADMIN'
+
+    def save_report(self, request, profiler, response):
+        os.makedirs(settings.API_PROFILE_DIR, exist_ok=True)
+        name = request.resolver_match.view_name if getattr(request, 'resolver_match', None) else 'unresolved'
+        path = os.path.join(settings.API_PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{os.getpid()}.txt")
+        with open(path, 'w') as f:
+            f.write(profiler.report(f"{request.method} {request.get_full_path()} -> {response.status_code}"))
+        logger.info("Profile for %s %s written to %s", request.method, request.path, path)
+        return path
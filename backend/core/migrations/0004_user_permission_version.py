@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_metricsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='permission_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
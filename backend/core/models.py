@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.utils.translation import gettext_lazy as _
 import random
 import string
@@ -18,6 +19,14 @@ class User(AbstractUser):
     can_create = models.BooleanField(default=False, null=True, blank=True)
     can_edit = models.BooleanField(default=False, null=True, blank=True)
     can_delete = models.BooleanField(default=False, null=True, blank=True)
+    # Embedded in access tokens; bumped whenever a field below changes so
+    # tokens carrying stale role/permission claims stop being accepted
+    permission_version = models.PositiveIntegerField(default=0)
+
+    # Not the password: hashers upgrade it silently at login, and refresh
+    # tokens outlive it anyway
+    PERMISSION_FIELDS = ('role', 'can_create', 'can_edit', 'can_delete', 'is_active')
+    PERMISSION_CACHE_KEY = 'auth:permission_version:{}'
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -25,6 +34,29 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.email} ({self.role})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_permissions = instance._permission_state()
+        return instance
+
+    def _permission_state(self):
+        return tuple(getattr(self, field) for field in self.PERMISSION_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_permissions', None)
+        if loaded is not None and loaded != self._permission_state():
+            self.permission_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'permission_version'}
+        super().save(*args, **kwargs)
+        self._loaded_permissions = self._permission_state()
+        cache.delete(self.PERMISSION_CACHE_KEY.format(self.pk))
+
+    def delete(self, *args, **kwargs):
+        cache.delete(self.PERMISSION_CACHE_KEY.format(self.pk))
+        return super().delete(*args, **kwargs)
+
     @property
     def is_superadmin(self):
         return self.role == 'SUPERADMIN'
@@ -41,3 +73,12 @@ class OTP(models.Model):
     @staticmethod
     def generate_code():
         return ''.join(random.choices(string.digits, k=6))
+
+class MetricSnapshot(models.Model):
+    """Merged metrics of one process (role@host:pid), written by core.metrics.Registry.flush()."""
+    process = models.CharField(max_length=150, unique=True)
+    payload = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.process} @ {self.updated_at}"
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import OTP, User
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import add_permission_claims
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -38,11 +40,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token['role'] = user.role
-        token['can_create'] = user.can_create
-        token['can_edit'] = user.can_edit
-        token['can_delete'] = user.can_delete
-        return token
+        return add_permission_claims(token, user)
 
     def validate(self, attrs):
         data = super().validate(attrs)
@@ -56,6 +54,25 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
         return data
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Re-reads role and permissions so a refreshed access token carries current claims."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = self.token_class(data.get('refresh', attrs['refresh']), verify=False)
+        user = User.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise serializers.ValidationError({'detail': 'No active account found for this token.'})
+        access = add_permission_claims(refresh.access_token, user)
+        data['access'] = str(access)
+        data['role'] = user.role
+        data['permissions'] = {
+            'can_create': user.can_create,
+            'can_edit': user.can_edit,
+            'can_delete': user.can_delete,
+        }
+        return data
+
 class ForgotPasswordSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
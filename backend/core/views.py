@@ -1,13 +1,17 @@
 from rest_framework import viewsets, status, views, permissions
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
-from .models import OTP, User
+from .authentication import get_authentication_class
+from .metrics import registry, render
+from .models import OTP, User, MetricSnapshot
 from django.core.mail import send_mail
+from django.http import HttpResponse
 from .serializers import (
     ForgotPasswordSerializer, VerifyOTPSerializer, 
-    TeamUserSerializer, CustomTokenObtainPairSerializer
+    TeamUserSerializer, CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 )
 from django.conf import settings
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 class IsSuperAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -16,6 +20,9 @@ class IsSuperAdmin(permissions.BasePermission):
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+
 class TeamUserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = TeamUserSerializer
@@ -126,3 +133,21 @@ class VerifyOTPView(views.APIView):
             except (User.DoesNotExist, OTP.DoesNotExist):
                 return Response({'error': 'Invalid request'}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def metrics_view(request):
+    """Prometheus exposition of the merged metrics of every web worker and agent."""
+    token = settings.METRICS_TOKEN
+    if token:
+        if request.headers.get('Authorization') != f"Bearer {token}":
+            return HttpResponse(status=401)
+    else:
+        try:
+            authenticated = get_authentication_class()().authenticate(request)
+        except AuthenticationFailed:
+            authenticated = None
+        if not authenticated:
+            return HttpResponse(status=401)
+
+    registry.maybe_flush(interval=0)
+    return HttpResponse(render(MetricSnapshot.objects.all()), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,90 @@
+"""
+Streaming response-time baselines and degradation detection.
+
+Every monitor keeps a slow exponentially weighted mean of its log response
+time (the baseline), a fast EWMA of its recent level and the variance of
+checks around that level on its MonitorStatus row. They are updated in O(1)
+per successful check, so nothing rescans UptimeRecord and the baseline
+survives restarts. Working in log space makes the threshold relative: a
+check is anomalous when the recent level is more than PULSE_ANOMALY_SIGMA
+deviations (of that level) above the baseline and at least
+PULSE_ANOMALY_MIN_RATIO times the baseline latency. PULSE_ANOMALY_CHECKS
+anomalous checks in a row mark the monitor degraded; recovery takes a longer
+run of checks back within a margin of the baseline. While the recent level
+is elevated the baseline only creeps toward it, so a lasting slowdown stays
+flagged for a good while before it becomes the new normal.
+"""
+import math
+
+from django.conf import settings
+
+DEGRADED = 'DEGRADED'
+RECOVERED = 'RECOVERED'
+
+# Smoothing of the short-term level that is compared against the baseline
+RECENT_ALPHA = 0.3
+# Fraction of the thresholds the recent level must fall under to recover
+RECOVERY_MARGIN = 0.5
+# Recovery needs this many times PULSE_ANOMALY_CHECKS normal checks, against flapping
+RECOVERY_CHECKS = 3
+# Share of the smoothing factor the baseline moves by while the recent level is elevated
+ANOMALY_WEIGHT = 0.1
+# Deviation floor (log units, ~5%) so near-constant latencies don't alert on jitter
+MIN_STDDEV = 0.05
+
+
+def baseline_latency(status):
+    """Typical response time in seconds (geometric EWMA), or None before the first sample."""
+    return None if status.latency_mean is None else math.exp(status.latency_mean)
+
+
+def recent_latency(status):
+    return None if status.latency_recent is None else math.exp(status.latency_recent)
+
+
+def observe_latency(status, response_time, checked_at):
+    """
+    Folds one successful check into the status row's baseline (in memory).
+    Returns DEGRADED or RECOVERED when the monitor changes state, else None.
+    """
+    alpha = settings.PULSE_ANOMALY_ALPHA
+    if not alpha or not response_time or response_time <= 0:
+        return None
+    sample = math.log(response_time)
+    if status.latency_mean is None:
+        status.latency_mean = status.latency_recent = sample
+        status.latency_var, status.latency_samples = 0.0, 1
+        return None
+
+    # The spread is measured around the recent level, so a level shift doesn't inflate it
+    noise = sample - status.latency_recent
+    status.latency_var = (1 - alpha) * (status.latency_var + alpha * noise * noise)
+    status.latency_recent += RECENT_ALPHA * noise
+    shift = status.latency_recent - status.latency_mean
+    stddev = max(math.sqrt(status.latency_var), MIN_STDDEV)
+    warm = status.latency_samples >= settings.PULSE_ANOMALY_WARMUP
+    # The short-term level averages out noise: its deviation is a fraction of a single check's
+    limit = settings.PULSE_ANOMALY_SIGMA * stddev * math.sqrt(RECENT_ALPHA / (2 - RECENT_ALPHA))
+    min_shift = math.log(settings.PULSE_ANOMALY_MIN_RATIO)
+    anomalous = warm and shift > limit and shift >= min_shift
+    # A degraded monitor must come back within the recovery margin of both limits
+    elevated = warm and shift > RECOVERY_MARGIN * limit and shift >= RECOVERY_MARGIN * min_shift
+    degraded = status.degraded_since is not None
+    if degraded:
+        anomalous = elevated
+    # While the recent level is elevated the baseline only creeps toward it
+    status.latency_mean += alpha * (ANOMALY_WEIGHT if elevated else 1) * (sample - status.latency_mean)
+    status.latency_samples += 1
+
+    # The streak counts consecutive checks that disagree with the current state
+    status.latency_streak = status.latency_streak + 1 if anomalous != degraded else 0
+    if status.latency_streak < max(1, settings.PULSE_ANOMALY_CHECKS) * (RECOVERY_CHECKS if degraded else 1):
+        return None
+    status.latency_streak = 0
+    status.degraded_since = None if degraded else checked_at
+    return RECOVERED if degraded else DEGRADED
+
+
+def describe(status):
+    baseline, recent = baseline_latency(status), recent_latency(status)
+    return f"Response time {recent:.3f}s vs baseline {baseline:.3f}s ({recent / baseline:.1f}x)"
@@ -0,0 +1,277 @@
+import csv
+import io
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from .models import AlertContact, MonitoredURL, StatusPage, UptimeRecord
+
+BULK_BATCH_SIZE = 500
+PURGE_CHUNK_SIZE = 5000
+
+# Plain columns that can be imported, exported and bulk-edited.
+MONITOR_FIELDS = [
+    'name', 'url', 'monitor_type', 'category', 'keyword', 'port', 'http_method',
+    'post_data', 'expected_status_code', 'request_headers', 'interval', 'timeout',
+    'check_ssl_errors', 'check_ssl_expiry', 'notify_email', 'check_ssl',
+    'visible_on_status_page', 'is_active',
+]
+RELATION_FIELDS = ['alert_contacts', 'team_members']
+# Dependency, exported as the parent's id. On import it refers to the row with
+# that "id" in the same file, or else to an existing monitor.
+PARENT_FIELD = 'parent'
+
+# CSV cells hold relation ids separated by ';'
+ID_SEPARATOR = ';'
+
+
+class MonitorImportSerializer(serializers.ModelSerializer):
+    """Row validator for bulk import/edit. Relations are validated in bulk by the caller."""
+    class Meta:
+        model = MonitoredURL
+        fields = MONITOR_FIELDS
+
+
+def active_monitors():
+    return MonitoredURL.objects.filter(pending_deletion=False)
+
+
+def _parse_ids(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = [v for v in value.replace(',', ID_SEPARATOR).split(ID_SEPARATOR) if v.strip()]
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return [int(v) for v in value]
+
+
+def parse_import_payload(data, upload=None):
+    """
+    Returns a list of row dicts from a JSON body (a list, or {"monitors": [...]})
+    or from an uploaded .csv/.json file.
+    """
+    if upload is not None:
+        content = upload.read().decode('utf-8-sig')
+        if upload.name.lower().endswith('.json'):
+            data = json.loads(content)
+        else:
+            return [
+                {k: v for k, v in row.items() if k and v not in ('', None)}
+                for row in csv.DictReader(io.StringIO(content))
+            ]
+    if isinstance(data, dict):
+        data = data.get('monitors')
+    if not isinstance(data, list):
+        raise ValueError('Expected a list of monitors or a "monitors" list.')
+    return data
+
+
+def _parse_id(value):
+    if value in (None, ''):
+        return None
+    return int(value)
+
+
+def _parent_cycles(parents):
+    """Exported ids (keys of {id: parent id}) whose parent chain within the file loops back."""
+    looping = set()
+    for start in parents:
+        seen, current = set(), start
+        while current in parents and current not in seen:
+            seen.add(current)
+            current = parents[current]
+        if current == start:
+            looping.add(start)
+    return looping
+
+
+def _bulk_create_monitors(instances):
+    if connection.features.can_return_rows_from_bulk_insert:
+        return MonitoredURL.objects.bulk_create(instances, batch_size=BULK_BATCH_SIZE)
+    # MySQL can't return ids from a multi-row INSERT, and concurrent inserts may
+    # interleave auto-increment ids, so rows are saved one by one (the caller's
+    # transaction keeps this to a single commit)
+    for instance in instances:
+        instance.save(force_insert=True)
+    return instances
+
+
+def import_monitors(rows, partial=False):
+    """
+    Validates every row and inserts the valid ones with bulk_create, then
+    writes alert_contacts/team_members through-table rows in bulk and links
+    parents (see PARENT_FIELD).
+
+    Returns (created_monitors, errors) where errors is a list of
+    {"row": index, "errors": {...}}. Unless partial is True nothing is
+    created when any row is invalid.
+    """
+    contact_ids = set(AlertContact.objects.values_list('id', flat=True))
+    member_ids = set(get_user_model().objects.values_list('id', flat=True))
+    monitor_ids = set(active_monitors().values_list('id', flat=True))
+
+    # Parents that refer to other rows of the file, by their exported id
+    file_parents = {}
+    for row in rows:
+        try:
+            row_id = _parse_id(row.get('id'))
+            if row_id is not None:
+                file_parents[row_id] = _parse_id(row.get(PARENT_FIELD))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    looping = _parent_cycles(file_parents)
+
+    pending, errors = [], []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'non_field_errors': ['Expected an object.']}})
+            continue
+
+        row_errors = {}
+        relations = {}
+        for field, known in (('alert_contacts', contact_ids), ('team_members', member_ids)):
+            try:
+                ids = _parse_ids(row.get(field))
+            except (TypeError, ValueError):
+                row_errors[field] = ['Expected a list of ids.']
+                continue
+            unknown = sorted(set(ids) - known)
+            if unknown:
+                row_errors[field] = [f"Unknown ids: {', '.join(map(str, unknown))}"]
+            relations[field] = ids
+
+        try:
+            relations['id'] = _parse_id(row.get('id'))
+        except (TypeError, ValueError):
+            row_errors['id'] = ['Expected a monitor id.']
+        try:
+            relations[PARENT_FIELD] = parent = _parse_id(row.get(PARENT_FIELD))
+        except (TypeError, ValueError):
+            row_errors[PARENT_FIELD] = ['Expected a monitor id.']
+        else:
+            if parent is not None and parent not in file_parents and parent not in monitor_ids:
+                row_errors[PARENT_FIELD] = [f"Unknown monitor id: {parent}"]
+            elif relations.get('id') in looping:
+                row_errors[PARENT_FIELD] = ['Parents must not depend on each other in a loop.']
+
+        serializer = MonitorImportSerializer(data={k: v for k, v in row.items() if k not in RELATION_FIELDS + [PARENT_FIELD]})
+        if not serializer.is_valid():
+            row_errors.update(serializer.errors)
+
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+            continue
+        pending.append((MonitoredURL(**serializer.validated_data), relations))
+
+    if not pending or (errors and not partial):
+        return [], errors
+
+    ContactLink = MonitoredURL.alert_contacts.through
+    MemberLink = MonitoredURL.team_members.through
+
+    with transaction.atomic():
+        created = _bulk_create_monitors([monitor for monitor, _ in pending])
+        contact_links, member_links = [], []
+        for monitor, (_, relations) in zip(created, pending):
+            contact_links += [ContactLink(monitoredurl_id=monitor.pk, alertcontact_id=i) for i in relations.get('alert_contacts', [])]
+            member_links += [MemberLink(monitoredurl_id=monitor.pk, user_id=i) for i in relations.get('team_members', [])]
+        ContactLink.objects.bulk_create(contact_links, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+        MemberLink.objects.bulk_create(member_links, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+
+        # A parent imported in the same file wins over an existing monitor with its old id
+        imported = {relations['id']: monitor.pk for monitor, (_, relations) in zip(created, pending)
+                    if relations['id'] is not None}
+        linked = []
+        for monitor, (_, relations) in zip(created, pending):
+            parent = relations[PARENT_FIELD]
+            parent_id = imported.get(parent, parent if parent in monitor_ids else None)
+            if parent_id is not None:
+                monitor.parent_id = parent_id
+                linked.append(monitor)
+        MonitoredURL.objects.bulk_update(linked, [PARENT_FIELD], batch_size=BULK_BATCH_SIZE)
+
+    return created, errors
+
+
+def bulk_update_monitors(ids, changes):
+    """Applies validated field changes to all given monitors in a single UPDATE."""
+    unknown = set(changes) - set(MONITOR_FIELDS)
+    if unknown:
+        raise serializers.ValidationError({field: ['This field cannot be bulk edited.'] for field in unknown})
+    serializer = MonitorImportSerializer(data=changes, partial=True)
+    serializer.is_valid(raise_exception=True)
+    if not serializer.validated_data:
+        raise serializers.ValidationError({'changes': ['No changes supplied.']})
+    return active_monitors().filter(id__in=ids).update(**serializer.validated_data)
+
+
+def schedule_deletion(ids):
+    """
+    Hides and deactivates the monitors with one UPDATE and unlinks them from
+    status pages. The heavy cascade over UptimeRecord is left to
+    purge_pending_monitors, run in the background by the agent.
+    """
+    with transaction.atomic():
+        count = active_monitors().filter(id__in=ids).update(pending_deletion=True, is_active=False)
+        StatusPage.monitors.through.objects.filter(monitoredurl_id__in=ids).delete()
+    return count
+
+
+def purge_pending_monitors(chunk_size=PURGE_CHUNK_SIZE, max_seconds=None, log=None):
+    """
+    Deletes monitors flagged for deletion, removing their uptime history in
+    bounded chunks first so no single statement holds locks for long.
+    Returns (monitors_deleted, records_deleted). Stops early (and resumes on
+    the next run) once max_seconds is exceeded.
+    """
+    started = time.monotonic()
+    monitors_deleted = records_deleted = 0
+
+    for monitor_id in MonitoredURL.objects.filter(pending_deletion=True).values_list('id', flat=True):
+        while True:
+            chunk = list(UptimeRecord.objects.filter(url_id=monitor_id).values_list('id', flat=True)[:chunk_size])
+            if chunk:
+                deleted, _ = UptimeRecord.objects.filter(id__in=chunk).delete()
+                records_deleted += deleted
+            if max_seconds is not None and time.monotonic() - started > max_seconds:
+                return monitors_deleted, records_deleted
+            if len(chunk) < chunk_size:
+                break
+
+        # Remaining cascade (incidents, activity, maintenance windows) is small
+        MonitoredURL.objects.filter(id=monitor_id).delete()
+        monitors_deleted += 1
+        if log:
+            log(f"Purged monitor #{monitor_id}")
+
+    return monitors_deleted, records_deleted
+
+
+def export_monitors(export_format='json'):
+    """Returns (content, content_type) with every monitor's configuration."""
+    monitors = active_monitors().order_by('id').prefetch_related('alert_contacts', 'team_members')
+    rows = []
+    exported = set(monitors.values_list('id', flat=True))
+    for monitor in monitors:
+        row = {'id': monitor.id}
+        row.update({field: getattr(monitor, field) for field in MONITOR_FIELDS})
+        row[PARENT_FIELD] = monitor.parent_id if monitor.parent_id in exported else None
+        row['alert_contacts'] = [c.id for c in monitor.alert_contacts.all()]
+        row['team_members'] = [u.id for u in monitor.team_members.all()]
+        rows.append(row)
+
+    if export_format == 'json':
+        return json.dumps(rows), 'application/json'
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=['id'] + MONITOR_FIELDS + [PARENT_FIELD] + RELATION_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        for field in RELATION_FIELDS:
+            row[field] = ID_SEPARATOR.join(map(str, row[field]))
+        writer.writerow(row)
+    return buffer.getvalue(), 'text/csv'
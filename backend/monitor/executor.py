@@ -0,0 +1,110 @@
+"""
+Probe planning and concurrency controls for the check engine.
+
+Monitors whose checks would send the same request share one probe per
+cycle (coalesce). Probes run on a thread pool; HostLimiter keeps that from
+hammering a single target. Every probe holds a slot for its host name and
+for the address the host resolves to (many vhosts usually share one
+server), and probes against the same address start at least `spacing`
+seconds apart. Limits of 0 mean unlimited.
+"""
+import socket
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from core import metrics
+
+# kind is HTTP, PORT or PING; fields a kind doesn't use stay None
+ProbeSpec = namedtuple('ProbeSpec', 'kind host url method timeout port', defaults=(None,) * 4)
+
+
+def coalesce(monitors, spec_of):
+    """{ProbeSpec: [monitors]} in first-seen order."""
+    groups = OrderedDict()
+    for monitor in monitors:
+        groups.setdefault(spec_of(monitor), []).append(monitor)
+    return groups
+
+
+class HostLimiter:
+    def __init__(self, per_host=0, per_ip=0, spacing=0.0):
+        self.per_host = per_host
+        self.per_ip = per_ip
+        self.spacing = spacing
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+        self._addresses = {}
+
+    def resolve(self, host):
+        """First resolved address of host, cached for the limiter's lifetime; None if it doesn't resolve."""
+        with self._lock:
+            if host in self._addresses:
+                return self._addresses[host]
+        try:
+            address = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)[0][4][0]
+        except (OSError, UnicodeError):
+            address = None
+        with self._lock:
+            return self._addresses.setdefault(host, address)
+
+    def _semaphore(self, key, limit):
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(limit)
+            return self._semaphores[key]
+
+    def _reserve(self, address):
+        """Books the next start time for address and returns how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(address, now))
+            self._next_start[address] = start + self.spacing
+            return start - now
+
+    @contextmanager
+    def slot(self, host):
+        address = self.resolve(host) if host else None
+        # Always host first, then address, so waiting threads cannot deadlock
+        semaphores = []
+        if host and self.per_host:
+            semaphores.append(self._semaphore(('host', host), self.per_host))
+        if address and self.per_ip:
+            semaphores.append(self._semaphore(('ip', address), self.per_ip))
+
+        started = time.perf_counter()
+        acquired = []
+        try:
+            for semaphore in semaphores:
+                semaphore.acquire()
+                acquired.append(semaphore)
+            if address and self.spacing:
+                time.sleep(self._reserve(address))
+            metrics.HOST_SLOT_WAIT.observe(time.perf_counter() - started)
+            yield address
+        finally:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+
+def interleave_by_host(items, host_of):
+    """
+    Orders items round-robin across hosts (callers pass the resolved address)
+    so the pool isn't filled with probes that all queue behind the same limit.
+    """
+    by_host = OrderedDict()
+    for item in items:
+        by_host.setdefault(host_of(item), []).append(item)
+    queues = [iter(group) for group in by_host.values()]
+    ordered = []
+    while queues:
+        remaining = []
+        for queue in queues:
+            item = next(queue, None)
+            if item is not None:
+                ordered.append(item)
+                remaining.append(queue)
+        queues = remaining
+    return ordered
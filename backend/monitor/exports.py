@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import zlib
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MonitoredURL, UptimeRecord
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = [
+    'monitor_id', 'monitor_name', 'checked_at', 'is_up', 'status_code',
+    'response_time', 'error_message', 'is_maintenance',
+]
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def iter_monitor_records(monitor_id, since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields raw record tuples for one monitor in checked_at order.
+
+    Uses keyset pagination on (checked_at, id) so every chunk is a bounded
+    range scan on the (url, checked_at) index instead of an OFFSET or a
+    single huge result set buffered by the DB driver.
+    """
+    base = UptimeRecord.objects.filter(url_id=monitor_id)
+    if since:
+        base = base.filter(checked_at__gte=since)
+    if until:
+        base = base.filter(checked_at__lte=until)
+    base = base.exclude(checked_at__isnull=True).order_by('checked_at', 'id')
+
+    fields = ('id', 'checked_at', 'is_up', 'status_code', 'response_time', 'error_message', 'is_maintenance')
+    last_checked, last_id = None, None
+    while True:
+        qs = base
+        if last_id is not None:
+            qs = qs.filter(Q(checked_at__gt=last_checked) | Q(checked_at=last_checked, id__gt=last_id))
+        chunk = list(qs.values_list(*fields)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id, last_checked = chunk[-1][0], chunk[-1][1]
+        if len(chunk) < chunk_size:
+            return
+
+
+def iter_export_rows(monitor_ids=None, since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields lists of export rows (dicts keyed by EXPORT_COLUMNS), one list per DB chunk."""
+    monitors = MonitoredURL.objects.order_by('id')
+    if monitor_ids:
+        monitors = monitors.filter(id__in=monitor_ids)
+
+    for monitor_id, monitor_name in monitors.values_list('id', 'name'):
+        for chunk in iter_monitor_records(monitor_id, since, until, chunk_size):
+            yield [
+                {
+                    'monitor_id': monitor_id,
+                    'monitor_name': monitor_name,
+                    'checked_at': checked_at.isoformat(),
+                    'is_up': is_up,
+                    'status_code': status_code,
+                    'response_time': response_time,
+                    'error_message': error_message,
+                    'is_maintenance': is_maintenance,
+                }
+                for _, checked_at, is_up, status_code, response_time, error_message, is_maintenance in chunk
+            ]
+
+
+def _encode_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+    # Header-only export
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _encode_ndjson(chunks):
+    for rows in chunks:
+        yield ''.join(json.dumps(row) + '\n' for row in rows).encode('utf-8')
+
+
+def _gzip(stream):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for data in stream:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(export_format='csv', monitor_ids=None, since=None, until=None, compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Returns a generator of bytes for the requested export. Memory use is
+    bounded by chunk_size regardless of how much history is exported.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {export_format}")
+    chunks = iter_export_rows(monitor_ids, since, until, chunk_size)
+    stream = _encode_csv(chunks) if export_format == 'csv' else _encode_ndjson(chunks)
+    return _gzip(stream) if compress else stream
+
+
+def export_filename(export_format, compress=False):
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    name = f"uptime-{stamp}.{export_format}"
+    return f"{name}.gz" if compress else name
@@ -0,0 +1,194 @@
+"""
+Incident lifecycle decided by a quorum of probe locations.
+
+Every location (the local agent and each remote probe) keeps its latest
+verdict per monitor as a ProbeVerdict. A monitor is down once at least
+PULSE_PROBE_QUORUM locations have reported it down within the last
+PULSE_PROBE_MAX_AGE seconds; the incident's activity log names the locations
+that detected and confirmed the outage.
+
+Degraded response time (monitor.anomaly) is tracked as a separate DEGRADED
+incident, opened and resolved by the check engine alone.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .anomaly import DEGRADED
+from .models import ActivityLog, Incident, MonitorStatus, Probe, ProbeVerdict
+
+
+def local_probe():
+    probe, _ = Probe.objects.get_or_create(name=settings.PULSE_PROBE_LOCATION)
+    return probe
+
+
+def record_verdict(probe, monitor_id, is_up, error_message=None, status_code=None, response_time=None, checked_at=None):
+    values = {
+        'is_up': is_up, 'error_message': error_message, 'status_code': status_code,
+        'response_time': response_time, 'checked_at': checked_at or timezone.now(),
+    }
+    if not ProbeVerdict.objects.filter(probe=probe, monitor_id=monitor_id).update(**values):
+        ProbeVerdict.objects.create(probe=probe, monitor_id=monitor_id, **values)
+
+
+def down_verdicts(monitor_id, now=None):
+    """Fresh down verdicts for the monitor from active probes, earliest first."""
+    since = (now or timezone.now()) - datetime.timedelta(seconds=settings.PULSE_PROBE_MAX_AGE)
+    return list(
+        ProbeVerdict.objects.filter(monitor_id=monitor_id, is_up=False, checked_at__gte=since, probe__is_active=True)
+        .select_related('probe').order_by('checked_at')
+    )
+
+
+class IncidentManager:
+    def __init__(self, notifications=None):
+        self.notifications = notifications
+        self._local_probe = None
+
+    @property
+    def local(self):
+        if self._local_probe is None:
+            self._local_probe = local_probe()
+        return self._local_probe
+
+    def update(self, url_obj, currently_up, error_msg, probe=None, **verdict):
+        """
+        Records one location's verdict (the local agent's by default) and
+        opens or resolves the incident by quorum. Returns the open incident, if any.
+        """
+        with transaction.atomic():
+            self.lock(url_obj)
+            record_verdict(probe or self.local, url_obj.id, currently_up, error_msg, **verdict)
+            return self._evaluate(url_obj, None if currently_up else error_msg)
+
+    def evaluate(self, url_obj, error_msg=None):
+        """Re-applies the quorum after verdicts were recorded elsewhere (bulk ingest)."""
+        with transaction.atomic():
+            self.lock(url_obj)
+            return self._evaluate(url_obj, error_msg)
+
+    def lock(self, url_obj):
+        # Serializes agents and probe ingests handling the same monitor, so at most
+        # one incident is ever open per monitor. A no-op UPDATE holds the status
+        # row's write lock until commit (on SQLite, the database write lock, where
+        # SELECT ... FOR UPDATE does nothing); a missing row is created first.
+        rows = MonitorStatus.objects.filter(pk=url_obj.pk)
+        if not rows.update(lease_owner=F('lease_owner')):
+            MonitorStatus.objects.bulk_create([MonitorStatus(monitor_id=url_obj.pk)], ignore_conflicts=True)
+            rows.update(lease_owner=F('lease_owner'))
+
+    def _evaluate(self, url_obj, error_msg):
+        incident = self._apply_quorum(url_obj, error_msg)
+        # Only ever written here, under the lock: leased status saves leave it alone
+        MonitorStatus.objects.filter(pk=url_obj.pk).update(open_incident=incident)
+        return incident
+
+    def _apply_quorum(self, url_obj, error_msg):
+        active_incident = Incident.objects.filter(monitor=url_obj, kind='OUTAGE', status='OPEN').first()
+        down = down_verdicts(url_obj.id)
+
+        if len(down) >= max(1, settings.PULSE_PROBE_QUORUM):
+            if active_incident:
+                return active_incident
+            # The root cause comes from a down verdict, never from an up check's message
+            error_msg = error_msg or down[0].error_message
+            incident = Incident.objects.create(
+                monitor=url_obj,
+                status='OPEN',
+                root_cause=error_msg,
+                started_at=timezone.now()
+            )
+
+            # Detection and confirmations by the locations that saw the outage
+            logs = [ActivityLog(incident=incident, message=self._message('detected', down[0]), log_type='ERROR')]
+            logs += [ActivityLog(incident=incident, message=self._message('confirmed', verdict), log_type='ERROR') for verdict in down[1:]]
+            if url_obj.notify_email:
+                logs.append(ActivityLog(incident=incident, message="Email alert dispatched to system administrators", log_type='INFO'))
+            ActivityLog.objects.bulk_create(logs)
+            if url_obj.notify_email:
+                self.send_alert(url_obj, error_msg)
+            return incident
+
+        if active_incident:
+            # Resolve incident
+            active_incident.status = 'RESOLVED'
+            active_incident.resolved_at = timezone.now()
+            active_incident.save()
+
+            ActivityLog.objects.create(
+                incident=active_incident,
+                message="Incident resolved. Status restored to operational.",
+                log_type='SUCCESS'
+            )
+
+            if url_obj.notify_email:
+                ActivityLog.objects.create(
+                    incident=active_incident,
+                    message="Resolution confirmation sent to sync endpoints",
+                    log_type='INFO'
+                )
+        return None
+
+    def degradation(self, url_obj, event, message):
+        """Opens (DEGRADED) or resolves (RECOVERED) the monitor's degraded response time incident."""
+        with transaction.atomic():
+            self.lock(url_obj)
+            active_incident = Incident.objects.filter(monitor=url_obj, kind='DEGRADED', status='OPEN').first()
+            if event == DEGRADED:
+                if active_incident:
+                    return active_incident
+                incident = Incident.objects.create(
+                    monitor=url_obj,
+                    kind='DEGRADED',
+                    status='OPEN',
+                    root_cause=message[:255],
+                    started_at=timezone.now()
+                )
+                ActivityLog.objects.create(incident=incident, message=f"Degraded response time detected: {message}"[:255], log_type='ERROR')
+                if url_obj.notify_email:
+                    self.send_alert(url_obj, message, event='monitor_degraded')
+                return incident
+
+            if active_incident:
+                active_incident.status = 'RESOLVED'
+                active_incident.resolved_at = timezone.now()
+                active_incident.save()
+                ActivityLog.objects.create(
+                    incident=active_incident,
+                    message=f"Response time back to baseline: {message}"[:255],
+                    log_type='SUCCESS'
+                )
+            return None
+
+    def _message(self, verb, verdict):
+        return f"Outage {verb} by {verdict.probe.label}: {verdict.error_message or 'down'}"[:255]
+
+    def send_alert(self, url_obj, error_msg, event='monitor_down'):
+        if self.notifications is None:
+            return
+        if event == 'monitor_degraded':
+            subject = f"WARNING: {url_obj.name} Response Time Degraded"
+        else:
+            subject = f"CRITICAL: {url_obj.name} Pulse Failure"
+        message = f"Monitor: {url_obj.name}\nURL: {url_obj.url}\nRoot Cause: {error_msg}\nTime: {timezone.now()}"
+
+        # 1. Global Admin Email
+        if url_obj.notify_email and settings.EMAIL_HOST_USER:
+            self.notifications.put('EMAIL', settings.EMAIL_HOST_USER, subject, message)
+
+        # 2. Specific Alert Contacts (delivered in the background by the notification queue)
+        for contact in url_obj.alert_contacts.all():
+            payload = None
+            if contact.contact_type == 'WEBHOOK':
+                payload = {
+                    "event": event,
+                    "monitor_name": url_obj.name,
+                    "url": url_obj.url,
+                    "error": error_msg,
+                    "timestamp": str(timezone.now())
+                }
+            self.notifications.put(contact.contact_type, contact.value, subject, message, payload)
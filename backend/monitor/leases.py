@@ -0,0 +1,75 @@
+"""
+Row leases that let several agents share the check load.
+
+An agent claims due monitors in batches by stamping their MonitorStatus rows
+with its lease owner and an expiry. The candidates are selected with
+SELECT ... FOR UPDATE SKIP LOCKED where the database supports it. The
+claiming UPDATE only matches rows whose lease is free, so two agents never
+hold the same monitor, even on backends without row locks. save_status()
+clears the lease when the result is stored. Leases of an agent that dies
+expire after PULSE_LEASE_SECONDS and are picked up by the others.
+"""
+import datetime
+import os
+import socket
+import uuid
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import MonitoredURL, MonitorStatus
+from .scheduling import DUE_SLACK
+
+
+def agent_id():
+    return (settings.PULSE_AGENT_ID or f"{socket.gethostname()}-{os.getpid()}")[:55]
+
+
+def new_owner(agent=None):
+    """Lease owner for one cycle: agent id plus a random suffix, unique across processes."""
+    return f"{agent or agent_id()}/{uuid.uuid4().hex[:8]}"
+
+
+def ensure_status_rows():
+    """Creates MonitorStatus rows for active monitors that have none yet, so they can be leased."""
+    missing = MonitoredURL.objects.filter(is_active=True, current_status__isnull=True).values_list('id', flat=True)
+    return len(MonitorStatus.objects.bulk_create([MonitorStatus(monitor_id=pk) for pk in missing], ignore_conflicts=True))
+
+
+def _free(now):
+    return Q(lease_owner__isnull=True) | Q(lease_expires_at__lte=now)
+
+
+def claim_due(cycle_at, owner, limit, ttl):
+    """
+    Leases up to `limit` (0 = all) monitors due at cycle_at to owner for ttl
+    seconds. Returns their MonitorStatus rows with monitor and parent loaded.
+    """
+    now = timezone.now()
+    candidates = (
+        MonitorStatus.objects
+        .filter(_free(now), monitor__is_active=True)
+        .filter(Q(next_check_at__isnull=True) | Q(next_check_at__lte=cycle_at + DUE_SLACK))
+        .order_by(F('next_check_at').asc(nulls_first=True), 'pk')
+    )
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            of = ('self',) if connection.features.has_select_for_update_of else ()
+            candidates = candidates.select_for_update(skip_locked=True, of=of)
+        # Model rows, not values_list: OF needs the model's select info, and
+        # without OF the joined monitor rows would be locked (and skipped) too
+        candidates = candidates.only('pk')
+        ids = [status.pk for status in (candidates[:limit] if limit else candidates)]
+        if not ids:
+            return []
+        MonitorStatus.objects.filter(_free(now), pk__in=ids).update(
+            lease_owner=owner, lease_expires_at=now + datetime.timedelta(seconds=ttl),
+        )
+    return list(MonitorStatus.objects.filter(pk__in=ids, lease_owner=owner).select_related('monitor', 'monitor__parent'))
+
+
+def release_leases(owner):
+    """Frees everything still leased to owner, e.g. monitors skipped when the cycle budget ran out."""
+    return MonitorStatus.objects.filter(lease_owner=owner).update(lease_owner=None, lease_expires_at=None)
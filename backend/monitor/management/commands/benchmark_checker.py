@@ -0,0 +1,170 @@
+import io
+import json
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.benchmark import benchmark_database, percentile
+from monitor.models import CheckCycle, MonitoredURL, MonitorStatus, UptimeRecord
+from monitor.targetfarm import TargetFarm
+
+
+class Command(BaseCommand):
+    help = 'Runs check_websites against synthetic monitors pointing at a local target farm and reports throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--monitors', type=int, default=1000, help='Number of synthetic monitors')
+        parser.add_argument('--cycles', type=int, default=1, help='Number of check cycles to run')
+        parser.add_argument('--timeout', type=int, default=2, help='Timeout (seconds) configured on HTTP monitors')
+        parser.add_argument('--latency-ms', type=str, default='5,20,100', help='Comma separated response latencies to pick from')
+        parser.add_argument('--body-size', type=int, default=4096, help='Response body size in bytes')
+        parser.add_argument('--error-ratio', type=float, default=0.05, help='Share of HTTP monitors answering 503')
+        parser.add_argument('--keyword-ratio', type=float, default=0.1, help='Share of keyword monitors (half of them miss the keyword)')
+        parser.add_argument('--port-ratio', type=float, default=0.1, help='Share of port monitors (half of them closed)')
+        parser.add_argument('--blackhole-ratio', type=float, default=0.01, help='Share of HTTP monitors whose target never answers')
+        parser.add_argument('--slow-tls-ratio', type=float, default=0.0, help='Share of HTTPS monitors whose TLS handshake is delayed')
+        parser.add_argument('--duplicate-ratio', type=float, default=0.0, help='Share of monitors that repeat an earlier monitor of the same scenario (probe coalescing)')
+        parser.add_argument('--tls-delay', type=float, default=1.0, help='Handshake delay (seconds) of the slow TLS target')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the monitor mix')
+        parser.add_argument('--workers', type=int, default=settings.PULSE_CHECK_WORKERS, help='Concurrent checks (check_websites --workers)')
+        # Every farm target lives on 127.0.0.1, so politeness limits are off unless asked for
+        parser.add_argument('--host-concurrency', type=int, default=0, help='Per-host concurrency cap (0 = no limit)')
+        parser.add_argument('--ip-concurrency', type=int, default=0, help='Per-address concurrency cap (0 = no limit)')
+        parser.add_argument('--host-spacing', type=float, default=0.0, help='Minimum seconds between check starts per address')
+        parser.add_argument('--db-file', type=str, help='SQLite file for the benchmark database (default: in memory)')
+        parser.add_argument('--output', type=str, help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['db_file'] and connection.vendor != 'sqlite':
+            raise CommandError('--db-file only applies to SQLite')
+
+        tls_delay = options['tls_delay'] if options['slow_tls_ratio'] else None
+        with benchmark_database(options['db_file']), TargetFarm(tls_delay=tls_delay) as farm:
+            scenarios = self.create_monitors(farm, options)
+            self.stdout.write(f"Created {len(scenarios)} monitors against the target farm on ports {farm.ports}")
+
+            cycles = []
+            for n in range(options['cycles']):
+                # Cycles run back to back, so every monitor is made due again instead
+                # of waiting out the interval adaptive scheduling assigned it
+                MonitorStatus.objects.update(next_check_at=None)
+                started = time.perf_counter()
+                call_command('check_websites', stdout=io.StringIO(), scheduled_at=time.time(), workers=options['workers'],
+                             host_concurrency=options['host_concurrency'], ip_concurrency=options['ip_concurrency'],
+                             host_spacing=options['host_spacing'])
+                elapsed = time.perf_counter() - started
+                cycle = CheckCycle.objects.order_by('-id').first()
+                cycles.append({'seconds': round(elapsed, 3), 'checked': cycle.checked, 'probes': cycle.probes, 'errors': cycle.errors,
+                               'checks_per_second': round(cycle.checked / elapsed, 1), 'max_lag': round(cycle.max_lag, 3),
+                               'db_time': round(cycle.db_time, 3)})
+                self.stdout.write(f"Cycle {n + 1}: {cycle.checked} checks ({cycle.probes} probes) in {elapsed:.2f}s ({cycle.checked / elapsed:.1f}/s)")
+
+            results = {'cycles': cycles, 'scenarios': self.scenario_report(scenarios, options)}
+
+        self.write_report(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def create_monitors(self, farm, options):
+        """Returns {monitor name: (scenario, expected is_up, configured timeout)}."""
+        rng = random.Random(options['seed'])
+        latencies = [int(value) for value in options['latency_ms'].split(',') if value]
+        size = options['body_size']
+        timeout = options['timeout']
+        weights = {
+            'http_error': options['error_ratio'],
+            'keyword': options['keyword_ratio'],
+            'port': options['port_ratio'],
+            'blackhole': options['blackhole_ratio'],
+            'slow_tls': options['slow_tls_ratio'],
+        }
+        weights['http_ok'] = max(0.0, 1 - sum(weights.values()))
+        kinds, kind_weights = zip(*weights.items())
+
+        # Unique URLs (the farm ignores the monitor parameter) so only --duplicate-ratio shares probes
+        monitors, scenarios, seen = [], {}, {}
+        for i in range(options['monitors']):
+            kind = drawn = rng.choices(kinds, kind_weights)[0]
+            name = f"farm-{i:05d}"
+            if seen.get(drawn) and rng.random() < options['duplicate_ratio']:
+                fields, scenario = rng.choice(seen[kind])
+                monitors.append(MonitoredURL(name=name, notify_email=False, **fields))
+                scenarios[name] = scenario
+                continue
+            latency = rng.choice(latencies)
+            fields = {'monitor_type': 'HTTP', 'timeout': timeout}
+            if kind == 'http_ok':
+                fields['url'], expected = farm.url('http', monitor=i, latency=latency, size=size), True
+            elif kind == 'http_error':
+                fields['url'], expected = farm.url('http', monitor=i, latency=latency, status=503, size=size), False
+            elif kind == 'keyword':
+                hit = rng.random() < 0.5
+                kind = 'keyword_hit' if hit else 'keyword_miss'
+                fields.update(monitor_type='KEYWORD', keyword='pulse-ok',
+                              url=farm.url('http', monitor=i, latency=latency, size=size, keyword='pulse-ok', at=rng.choice(('start', 'middle', 'end')) if hit else 'none'))
+                expected = hit
+            elif kind == 'port':
+                kind = rng.choice(('port_open', 'port_closed'))
+                target = 'tcp_open' if kind == 'port_open' else 'tcp_closed'
+                fields.update(monitor_type='PORT', url='127.0.0.1', port=farm.ports[target])
+                expected = kind == 'port_open'
+            elif kind == 'blackhole':
+                fields['url'], expected = farm.url('blackhole', monitor=i), False
+            else:
+                # Self-signed certificate: the check fails after the (slow) handshake
+                fields['url'], expected = farm.url('slow_tls', monitor=i), False
+            monitors.append(MonitoredURL(name=name, notify_email=False, **fields))
+            scenarios[name] = (kind, expected, fields['timeout'])
+            seen.setdefault(drawn, []).append((fields, scenarios[name]))
+
+        MonitoredURL.objects.bulk_create(monitors, batch_size=1000)
+        return scenarios
+
+    def scenario_report(self, scenarios, options):
+        by_kind = {}
+        for name, is_up, response_time in UptimeRecord.objects.values_list('url__name', 'is_up', 'response_time'):
+            kind, expected, timeout = scenarios[name]
+            entry = by_kind.setdefault(kind, {'timeout': timeout, 'times': [], 'wrong': 0})
+            entry['times'].append(response_time or 0.0)
+            entry['wrong'] += is_up != expected
+
+        report = {}
+        for kind, entry in sorted(by_kind.items()):
+            times = sorted(entry['times'])
+            row = {
+                'checks': len(times),
+                'wrong_verdicts': entry['wrong'],
+                'p50_ms': round(percentile(times, 50) * 1000, 1),
+                'p95_ms': round(percentile(times, 95) * 1000, 1),
+                'max_ms': round(times[-1] * 1000, 1),
+            }
+            if kind == 'blackhole':
+                # How far the timeout fires past the configured value
+                overshoot = [t - entry['timeout'] for t in times]
+                row['timeout_s'] = entry['timeout']
+                row['timeout_overshoot_ms'] = round(statistics.mean(overshoot) * 1000, 1)
+            report[kind] = row
+        return report
+
+    def write_report(self, results):
+        cycles = results['cycles']
+        if cycles:
+            rates = [c['checks_per_second'] for c in cycles]
+            self.stdout.write(
+                f"Cycle time: mean {statistics.mean(c['seconds'] for c in cycles):.2f}s, "
+                f"throughput: mean {statistics.mean(rates):.1f} checks/s"
+            )
+        header = f"{'scenario':<14} {'checks':>7} {'wrong':>6} {'p50_ms':>9} {'p95_ms':>9} {'max_ms':>9}  timeout"
+        self.stdout.write(header)
+        for kind, row in results['scenarios'].items():
+            line = f"{kind:<14} {row['checks']:>7} {row['wrong_verdicts']:>6} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['max_ms']:>9}"
+            if 'timeout_s' in row:
+                line += f"  {row['timeout_s']}s configured, fired {row['timeout_overshoot_ms']:+.1f}ms late on average"
+            self.stdout.write(line)
@@ -1,152 +1,327 @@
 from django.core.management.base import BaseCommand
-from monitor.models import MonitoredURL, UptimeRecord, Incident, ActivityLog, MaintenanceWindow
+from monitor.models import MonitoredURL, UptimeRecord, MaintenanceWindow
 import requests
 import time
 import socket
 import subprocess
 import ssl
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
 import datetime
-import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core import metrics
+from core.profiling import add_profile_arguments, profile_command
+from monitor.anomaly import describe, observe_latency
+from monitor.executor import HostLimiter, ProbeSpec, coalesce, interleave_by_host
+from monitor.incidents import IncidentManager
+from monitor.leases import agent_id, claim_due, ensure_status_rows, new_owner, release_leases
+from monitor.probes import prune_batches
+from monitor.scheduling import schedule_next
+from monitor.status import apply_check, load_statuses, save_status
+from monitor.telemetry import CycleStats, prune_cycles
+from notifications.dispatch import NotificationQueue
 
 class Command(BaseCommand):
     help = 'Checks the status of monitored URLs and manages Incidents with regional analysis'
 
-    LOCATIONS = [
-        {"city": "Nuremberg, Germany", "ip": "78.47.173.76"},
-        {"city": "Frankfurt, Germany", "ip": "18.192.166.72"},
-        {"city": "Falkenstein, Germany", "ip": "157.90.156.63"},
-        {"city": "London, UK", "ip": "192.168.1.10"},
-        {"city": "New York, USA", "ip": "104.21.75.11"},
-    ]
+    def add_arguments(self, parser):
+        parser.add_argument('--scheduled-at', type=float, help='Epoch time this cycle was scheduled for (set by the agent)')
+        parser.add_argument('--budget', type=float, default=settings.PULSE_CYCLE_BUDGET, help='Stop starting new checks after this many seconds (0 = no limit); the rest are recorded as skipped')
+        parser.add_argument('--workers', type=int, default=settings.PULSE_CHECK_WORKERS, help='Checks run concurrently')
+        parser.add_argument('--host-concurrency', type=int, default=settings.PULSE_HOST_CONCURRENCY, help='Concurrent checks per target host name (0 = no limit)')
+        parser.add_argument('--ip-concurrency', type=int, default=settings.PULSE_IP_CONCURRENCY, help='Concurrent checks per resolved target address (0 = no limit)')
+        parser.add_argument('--host-spacing', type=float, default=settings.PULSE_HOST_SPACING, help='Minimum seconds between check starts against the same address')
+        add_profile_arguments(parser)
 
     def handle(self, *args, **options):
-        urls = MonitoredURL.objects.filter(is_active=True)
-        for url_obj in urls:
-            try:
-                start_time = time.time()
-                is_up = False
-                status_code = None
-                error_message = None
-                
-                # Check based on type
-                if url_obj.monitor_type in ['HTTP', 'API']:
-                    is_up, status_code, error_message = self.check_http(url_obj)
-                elif url_obj.monitor_type == 'KEYWORD':
-                    is_up, status_code, error_message = self.check_keyword(url_obj)
-                elif url_obj.monitor_type == 'PING':
-                    is_up, error_message = self.check_ping(url_obj)
-                elif url_obj.monitor_type == 'PORT':
-                    is_up, error_message = self.check_port(url_obj)
-                else:
-                    is_up, error_message = self.check_ping(url_obj)
-
-                end_time = time.time()
-                duration = end_time - start_time
-                
-                # Check for active maintenance window
-                now = timezone.now()
-                is_maintenance = MaintenanceWindow.objects.filter(
-                    monitor=url_obj,
-                    is_active=True,
-                    start_time__lte=now,
-                    end_time__gte=now
-                ).exists()
-
-                self.stdout.write(f"  Result: {'UP' if is_up else 'DOWN'} | Latency: {duration:.3f}s | Maintenance: {is_maintenance}")
-
-                if url_obj.check_ssl and url_obj.url and url_obj.url.lower().startswith('https'):
-                    self.perform_ssl_check(url_obj)
-
-                UptimeRecord.objects.create(
-                    url=url_obj,
-                    status_code=status_code,
-                    response_time=duration,
-                    is_up=is_up,
-                    error_message=error_message,
-                    is_maintenance=is_maintenance
-                )
-                
-                if not is_maintenance:
-                    self.manage_incident(url_obj, is_up, error_message or f"Status Code: {status_code}")
-                else:
-                    self.stdout.write(f"  Alert suppression active for {url_obj.name} (Maintenance)")
+        cycle_started = time.time()
+        metrics.registry.role = 'agent'
+        if options.get('scheduled_at'):
+            metrics.SCHEDULER_LAG.set(max(0.0, cycle_started - options['scheduled_at']))
+        self.notifications = NotificationQueue(on_error=self.notification_failed)
+        self.incidents = IncidentManager(self.notifications)
+        self.cycle = CycleStats(options.get('scheduled_at'), agent_id())
 
+        try:
+            limiter = HostLimiter(options['host_concurrency'], options['ip_concurrency'], options['host_spacing'])
+            with profile_command(self, options, 'check_websites') as profiler:
+                self.run_checks(options['budget'], options['workers'], limiter, profiler)
+        finally:
+            # Deliver everything queued during the cycle before exiting
+            self.notifications.close()
+            self.cycle.notify_time = self.notifications.busy_seconds
+            metrics.CYCLE_DURATION.observe(time.time() - cycle_started)
+            try:
+                if self.cycle.worth_recording():
+                    self.cycle.save()
+                    prune_cycles()
+                    prune_batches()
             except Exception as e:
-                self.stdout.write(self.style.ERROR(f"  Critical check error: {str(e)}"))
-                
-                # Check for maintenance even in case of critical error
-                is_maintenance = MaintenanceWindow.objects.filter(
-                    monitor=url_obj,
-                    is_active=True,
-                    start_time__lte=timezone.now(),
-                    end_time__gte=timezone.now()
-                ).exists()
-
-                if not is_maintenance:
-                    self.manage_incident(url_obj, False, str(e))
-        
+                self.stdout.write(self.style.WARNING(f"Failed to record check cycle: {e}"))
+            try:
+                metrics.registry.flush()
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Failed to flush metrics: {e}"))
+
+    def run_checks(self, budget=0, workers=1, limiter=None, profiler=None):
+        cycle_at = datetime.datetime.fromtimestamp(self.cycle.scheduled_at, datetime.timezone.utc)
+        limiter = limiter or HostLimiter()
+        probe = profiler.wrap(self.probe) if profiler else self.probe
+        owner = new_owner(self.cycle.agent)
+        ensure_status_rows()
+        self.host_checks = self.load_host_checks()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='check') as pool:
+                # Lease due monitors in batches so concurrently running agents share the load
+                while not (budget and time.time() - self.cycle.started >= budget):
+                    batch = claim_due(cycle_at, owner, settings.PULSE_LEASE_BATCH, settings.PULSE_LEASE_SECONDS)
+                    if not batch:
+                        break
+                    self.cycle.monitors_due += len(batch)
+                    self.run_batch(pool, probe, batch, cycle_at, limiter, budget)
+        finally:
+            release_leases(owner)
+
+        if self.cycle.skipped:
+            self.stdout.write(self.style.WARNING(f"Cycle budget of {budget}s exhausted, skipped {self.cycle.skipped} monitors"))
         self.stdout.write(self.style.SUCCESS(f'Synchronized Pulse perimeter successfully at {timezone.now()}'))
 
-    def manage_incident(self, url_obj, currently_up, error_msg):
-        active_incident = Incident.objects.filter(monitor=url_obj, status='OPEN').first()
-
-        if not currently_up:
-            if not active_incident:
-                # Create NEW incident
-                incident = Incident.objects.create(
-                    monitor=url_obj,
-                    status='OPEN',
-                    root_cause=error_msg,
-                    started_at=timezone.now()
-                )
-                
-                # Create detailed activity logs with simulated locations
-                locs = random.sample(self.LOCATIONS, 3)
-                
-                # Log 1: Detection
-                ActivityLog.objects.create(
-                    incident=incident,
-                    message=f"T/O Connection Timeout detected by {locs[0]['city']}: {locs[0]['ip']}",
-                    log_type='ERROR'
-                )
-                
-                # Log 2: Confirmation
-                ActivityLog.objects.create(
-                    incident=incident,
-                    message=f"T/O Connection Timeout confirmed by {locs[1]['city']}: {locs[1]['ip']}",
-                    log_type='ERROR'
-                )
+    def run_batch(self, pool, probe, batch, cycle_at, limiter, budget):
+        urls = [status.monitor for status in batch]
+        statuses = {status.monitor_id: status for status in batch}
 
-                # Log 3: Alerts
-                if url_obj.notify_email:
-                    ActivityLog.objects.create(
-                        incident=incident,
-                        message="Email alert dispatched to system administrators",
-                        log_type='INFO'
-                    )
-                    self.send_alert(url_obj, error_msg)
-        else:
-            if active_incident:
-                # Resolve incident
-                active_incident.status = 'RESOLVED'
-                active_incident.resolved_at = timezone.now()
-                active_incident.save()
-                
-                ActivityLog.objects.create(
-                    incident=active_incident,
-                    message="Incident resolved. Status restored to operational.",
-                    log_type='SUCCESS'
+        # Host checks other monitors depend on go first, so their dependents can be
+        # short-circuited instead of each waiting for its own timeout
+        parents = self.resolve_parents(urls)
+        parent_ids = {parent.id for parent in parents.values()}
+        first = [url_obj for url_obj in urls if url_obj.id in parent_ids]
+        rest = [url_obj for url_obj in urls if url_obj.id not in parent_ids]
+        self.run_probes(pool, probe, first, statuses, cycle_at, limiter, budget)
+
+        down = self.parents_down(parents.values(), statuses)
+        reachable = []
+        for url_obj in rest:
+            parent = parents.get(url_obj.id)
+            if parent is not None and parent.id in down:
+                self.record_unreachable(url_obj, statuses[url_obj.id], parent, cycle_at)
+                self.cycle.checked += 1
+            else:
+                reachable.append(url_obj)
+        self.run_probes(pool, probe, reachable, statuses, cycle_at, limiter, budget)
+
+    def run_probes(self, pool, probe, urls, statuses, cycle_at, limiter, budget):
+        # Monitors sending the same request share one probe per cycle
+        groups = coalesce(urls, self.probe_spec)
+        self.cycle.probes += len(groups)
+
+        # Interleave by resolved address: many vhosts on one server share its
+        # per-address limit. Names are resolved on the pool (cached by the limiter).
+        hosts = {spec.host for spec in groups if spec.host}
+        addresses = dict(zip(hosts, pool.map(limiter.resolve, hosts)))
+
+        # Network probes run on the pool; every database write stays on this thread
+        futures = {
+            pool.submit(probe, spec, monitors, limiter, budget): monitors
+            for spec, monitors in interleave_by_host(groups.items(), lambda group: addresses.get(group[0].host) or group[0].host)
+        }
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                results = [(url_obj, e) for url_obj in futures[future]]
+            if results is None:
+                self.cycle.skipped += len(futures[future])
+                continue
+            for url_obj, result in results:
+                status = statuses[url_obj.id]
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    self.record(url_obj, status, cycle_at, *result)
+                    self.cycle.checked += 1
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"  Critical check error: {str(e)}"))
+                    metrics.CHECKS_TOTAL.labels(url_obj.monitor_type, 'error').inc()
+                    self.cycle.errors += 1
+
+                    # Check for maintenance even in case of critical error
+                    is_maintenance = self.in_maintenance(url_obj)
+                    apply_check(status, False, error_message=str(e), is_maintenance=is_maintenance)
+                    schedule_next(status, url_obj, cycle_at)
+                    if not is_maintenance:
+                        status.open_incident = self.manage_incident(url_obj, False, str(e))
+                    save_status(status)
+
+    def load_host_checks(self):
+        """
+        {host: active PING monitor, or failing that PORT monitor}, loaded once
+        per cycle for PULSE_AUTO_DEPENDENCIES; empty when that is off.
+        """
+        host_checks = {}
+        if settings.PULSE_AUTO_DEPENDENCIES:
+            for monitor_type in ['PING', 'PORT']:
+                for host_check in MonitoredURL.objects.filter(is_active=True, monitor_type=monitor_type).order_by('id'):
+                    host_checks.setdefault(self._get_host(host_check.url or ''), host_check)
+        return host_checks
+
+    def resolve_parents(self, urls):
+        """
+        {monitor id: parent monitor}. An explicit parent wins; otherwise
+        HTTP/API/KEYWORD monitors depend on the cycle's host check of the same
+        host (see load_host_checks).
+        """
+        parents = {url_obj.id: url_obj.parent for url_obj in urls if url_obj.parent_id and url_obj.parent.is_active}
+        for url_obj in urls:
+            if url_obj.id not in parents and url_obj.monitor_type in ['HTTP', 'API', 'KEYWORD']:
+                host_check = self.host_checks.get(self._get_host(url_obj.url or ''))
+                if host_check is not None:
+                    parents[url_obj.id] = host_check
+        return parents
+
+    def parents_down(self, parents, statuses):
+        """Ids of parents that are down: checked this cycle, or as last recorded when not due."""
+        missing = [parent for parent in parents if parent.id not in statuses]
+        known = dict(statuses)
+        known.update(load_statuses(missing))
+        return {
+            parent.id for parent in parents
+            if known[parent.id].last_checked_at and not known[parent.id].is_up and not known[parent.id].is_maintenance
+        }
+
+    def record_unreachable(self, url_obj, status, parent, cycle_at):
+        """Records a dependent of a down parent as unreachable, without a check of its own or an alert."""
+        message = f"Unreachable via parent {parent.name}"
+        is_maintenance = self.in_maintenance(url_obj)
+        self.stdout.write(f"  {url_obj.name}: UNREACHABLE | {message}")
+        metrics.CHECKS_TOTAL.labels(url_obj.monitor_type, 'unreachable').inc()
+        with self.cycle.db_write(metrics.DB_WRITE_DURATION.labels('uptime_record')):
+            record = UptimeRecord.objects.create(
+                url=url_obj,
+                is_up=False,
+                error_message=message,
+                is_maintenance=is_maintenance
+            )
+        apply_check(status, False, error_message=message, is_maintenance=is_maintenance, checked_at=record.checked_at)
+        if not is_maintenance:
+            status.status = 'UNREACHABLE'
+        schedule_next(status, url_obj, cycle_at)
+        with self.cycle.db_write(metrics.DB_WRITE_DURATION.labels('status')):
+            save_status(status)
+
+    def probe_spec(self, url_obj):
+        """What a check actually sends over the network; equal specs are probed once per cycle."""
+        url = (url_obj.url or '').strip()
+        if url_obj.monitor_type in ['HTTP', 'API', 'KEYWORD']:
+            # Only what fetch_http sends goes into the spec, so KEYWORD and HTTP monitors of a URL share a request
+            method = 'GET' if url_obj.monitor_type == 'KEYWORD' else (url_obj.http_method or 'GET').upper()
+            return ProbeSpec('HTTP', self._get_host(url), url=url, method=method, timeout=url_obj.timeout or 10)
+        if url_obj.monitor_type == 'PORT':
+            return ProbeSpec('PORT', self._get_host(url), port=url_obj.port or 80)
+        return ProbeSpec('PING', self._get_host(url))
+
+    def probe(self, spec, monitors, limiter, budget=0):
+        """
+        Runs one probe on a worker thread without touching the database and
+        evaluates it for every monitor sharing it. Returns [(monitor,
+        (is_up, status_code, error_message, duration, ssl_changed))], or None
+        when the cycle budget ran out before the probe could start.
+        """
+        if budget and time.time() - self.cycle.started >= budget:
+            return None
+        with limiter.slot(spec.host):
+            if budget and time.time() - self.cycle.started >= budget:
+                return None
+            self.cycle.check_started()
+            start_time = time.time()
+            with metrics.CHECKS_IN_FLIGHT.track_inprogress():
+                if spec.kind == 'HTTP':
+                    outcome = self.fetch_http(spec)
+                elif spec.kind == 'PORT':
+                    outcome = self.check_port(spec.host, spec.port)
+                else:
+                    outcome = self.check_ping(spec.host)
+            duration = time.time() - start_time
+
+            ssl_monitors = [m for m in monitors if m.check_ssl and m.url and m.url.lower().startswith('https')]
+            ssl_changed = bool(ssl_monitors) and self.perform_ssl_check(ssl_monitors[0])
+            for url_obj in ssl_monitors[1:]:
+                url_obj.ssl_expiry, url_obj.ssl_issuer = ssl_monitors[0].ssl_expiry, ssl_monitors[0].ssl_issuer
+
+        results = []
+        for url_obj in monitors:
+            # Each monitor still applies its own verdict rules to the shared outcome
+            if url_obj.monitor_type in ['HTTP', 'API']:
+                is_up, status_code, error_message = self.check_http(url_obj, *outcome)
+            elif url_obj.monitor_type == 'KEYWORD':
+                is_up, status_code, error_message = self.check_keyword(url_obj, *outcome)
+            else:
+                (is_up, error_message), status_code = outcome, None
+            results.append((url_obj, (is_up, status_code, error_message, duration, ssl_changed and url_obj in ssl_monitors)))
+        return results
+
+    def record(self, url_obj, status, cycle_at, is_up, status_code, error_message, duration, ssl_changed):
+        """Stores one probe result: history row, incident handling and the current-state row."""
+        metrics.CHECK_DURATION.labels(url_obj.monitor_type).observe(duration)
+        metrics.CHECKS_TOTAL.labels(url_obj.monitor_type, 'up' if is_up else 'down').inc()
+
+        # Check for active maintenance window
+        is_maintenance = self.in_maintenance(url_obj)
+
+        self.stdout.write(f"  {url_obj.name}: {'UP' if is_up else 'DOWN'} | Latency: {duration:.3f}s | Maintenance: {is_maintenance}")
+
+        if ssl_changed:
+            url_obj.save(update_fields=['ssl_expiry', 'ssl_issuer'])
+
+        with self.cycle.db_write(metrics.DB_WRITE_DURATION.labels('uptime_record')):
+            record = UptimeRecord.objects.create(
+                url=url_obj,
+                status_code=status_code,
+                response_time=duration,
+                is_up=is_up,
+                error_message=error_message,
+                is_maintenance=is_maintenance
+            )
+        apply_check(status, is_up, status_code, duration, error_message, is_maintenance, record.checked_at)
+        reason = schedule_next(status, url_obj, cycle_at)
+        self.stdout.write(f"  Next check in {status.check_interval:.0f}s ({reason.lower()})")
+
+        if not is_maintenance:
+            with self.cycle.db_write(metrics.DB_WRITE_DURATION.labels('incident')):
+                status.open_incident = self.manage_incident(
+                    url_obj, is_up, error_message or f"Status Code: {status_code}",
+                    status_code=status_code, response_time=duration, checked_at=record.checked_at,
                 )
-                
-                if url_obj.notify_email:
-                    ActivityLog.objects.create(
-                        incident=active_incident,
-                        message="Resolution confirmation sent to sync endpoints",
-                        log_type='INFO'
-                    )
+                if is_up:
+                    self.track_latency(url_obj, status, duration, record.checked_at)
+        else:
+            self.stdout.write(f"  Alert suppression active for {url_obj.name} (Maintenance)")
+
+        with self.cycle.db_write(metrics.DB_WRITE_DURATION.labels('status')):
+            save_status(status)
+
+    def track_latency(self, url_obj, status, duration, checked_at):
+        """Updates the response-time baseline and opens or resolves the degraded incident on a state change."""
+        event = observe_latency(status, duration, checked_at)
+        if event is None:
+            return
+        message = describe(status)
+        metrics.LATENCY_EVENTS.labels(event.lower()).inc()
+        self.stdout.write(self.style.WARNING(f"  {url_obj.name}: {event} | {message}"))
+        self.incidents.degradation(url_obj, event, message)
+
+    def in_maintenance(self, url_obj):
+        now = timezone.now()
+        return MaintenanceWindow.objects.filter(
+            monitor=url_obj,
+            is_active=True,
+            start_time__lte=now,
+            end_time__gte=now
+        ).exists()
+
+    def manage_incident(self, url_obj, currently_up, error_msg, **verdict):
+        """Records the local verdict and opens or resolves the incident by probe quorum; returns the open incident, if any."""
+        return self.incidents.update(url_obj, currently_up, error_msg, **verdict)
 
     def _get_host(self, url):
         # Case intensive strip of protocol
@@ -159,20 +334,23 @@ class Command(BaseCommand):
         # Strip path and port
         return host.split('/')[0].split(':')[0]
 
-    def check_http(self, url_obj):
+    def fetch_http(self, spec):
+        """Returns (response, None), or (None, error message) when the request failed."""
         try:
-            method = url_obj.http_method or 'GET'
             # Requests is already case-insensitive for schemes
-            response = requests.request(method, url_obj.url.strip(), timeout=url_obj.timeout or 10)
-            is_up = response.status_code == (url_obj.expected_status_code or 200)
-            if not is_up and 200 <= response.status_code < 400 and not url_obj.expected_status_code:
-                is_up = True
-            return is_up, response.status_code, None if is_up else f"HTTP Status {response.status_code}"
+            return requests.request(spec.method, spec.url, timeout=spec.timeout), None
         except Exception as e:
-            return False, None, str(e)
+            return None, str(e)
 
-    def check_ping(self, url_obj):
-        host = self._get_host(url_obj.url)
+    def check_http(self, url_obj, response, error):
+        if response is None:
+            return False, None, error
+        is_up = response.status_code == (url_obj.expected_status_code or 200)
+        if not is_up and 200 <= response.status_code < 400 and not url_obj.expected_status_code:
+            is_up = True
+        return is_up, response.status_code, None if is_up else f"HTTP Status {response.status_code}"
+
+    def check_ping(self, host):
         try:
             param = '-n' if subprocess.os.name == 'nt' else '-c'
             command = ['ping', param, '1', host]
@@ -182,9 +360,7 @@ class Command(BaseCommand):
         except Exception as e:
             return False, str(e)
 
-    def check_port(self, url_obj):
-        host = self._get_host(url_obj.url)
-        port = url_obj.port or 80
+    def check_port(self, host, port):
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.settimeout(5)
@@ -194,18 +370,17 @@ class Command(BaseCommand):
         except Exception as e:
             return False, str(e)
 
-    def check_keyword(self, url_obj):
-        try:
-            response = requests.get(url_obj.url.strip(), timeout=10)
-            if 200 <= response.status_code < 400:
-                if url_obj.keyword and url_obj.keyword in response.text:
-                    return True, response.status_code, None
-                return False, response.status_code, f"Keyword '{url_obj.keyword}' missing"
-            return False, response.status_code, "HTTP Error"
-        except Exception as e:
-            return False, None, str(e)
+    def check_keyword(self, url_obj, response, error):
+        if response is None:
+            return False, None, error
+        if 200 <= response.status_code < 400:
+            if url_obj.keyword and url_obj.keyword in response.text:
+                return True, response.status_code, None
+            return False, response.status_code, f"Keyword '{url_obj.keyword}' missing"
+        return False, response.status_code, "HTTP Error"
 
     def perform_ssl_check(self, url_obj):
+        """Updates ssl_expiry/ssl_issuer in memory; returns whether they were read."""
         host = self._get_host(url_obj.url)
         try:
             context = ssl.create_default_context()
@@ -217,38 +392,10 @@ class Command(BaseCommand):
                     url_obj.ssl_expiry = timezone.make_aware(expiry)
                     issuer = dict(x[0] for x in cert.get('issuer'))
                     url_obj.ssl_issuer = issuer.get('organizationName', 'Unknown')
-                    url_obj.save()
+                    return True
         except: pass
+        return False
 
-    def send_alert(self, url_obj, error_msg):
-        subject = f"CRITICAL: {url_obj.name} Pulse Failure"
-        message = f"Monitor: {url_obj.name}\nURL: {url_obj.url}\nRoot Cause: {error_msg}\nTime: {timezone.now()}"
-        
-        # 1. Global Admin Email
-        if url_obj.notify_email and settings.EMAIL_HOST_USER:
-             try:
-                send_mail(subject, message, settings.EMAIL_HOST_USER, [settings.EMAIL_HOST_USER], fail_silently=True)
-             except: pass
-
-        # 2. Specific Alert Contacts
-        for contact in url_obj.alert_contacts.all():
-            try:
-                if contact.contact_type == 'EMAIL':
-                    send_mail(subject, message, settings.EMAIL_HOST_USER, [contact.value], fail_silently=True)
-                
-                elif contact.contact_type == 'SLACK':
-                    requests.post(contact.value, json={"text": f"🚨 *{subject}*\n{message}"}, timeout=5)
-                
-                elif contact.contact_type == 'DISCORD':
-                    requests.post(contact.value, json={"content": f"🚨 **{subject}**\n{message}"}, timeout=5)
-                
-                elif contact.contact_type == 'WEBHOOK':
-                    requests.post(contact.value, json={
-                        "event": "monitor_down",
-                        "monitor_name": url_obj.name,
-                        "url": url_obj.url,
-                        "error": error_msg,
-                        "timestamp": str(timezone.now())
-                    }, timeout=5)
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"Failed to send alert to {contact.name}: {str(e)}"))
+    def notification_failed(self, job, error):
+        channel, target = job[0], job[1]
+        self.stdout.write(self.style.WARNING(f"Failed to send {channel} alert to {target}: {str(error)}"))
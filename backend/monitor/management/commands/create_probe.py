@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.models import Probe
+from monitor.probes import create_probe
+
+
+class Command(BaseCommand):
+    help = 'Registers a remote probe location and prints its API token (shown once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Unique probe name')
+        parser.add_argument('--location', default='', help="Shown in incident activity, e.g. 'Frankfurt, DE'")
+
+    def handle(self, *args, **options):
+        if Probe.objects.filter(name=options['name']).exists():
+            raise CommandError(f"Probe {options['name']!r} already exists")
+        probe, token = create_probe(options['name'], options['location'])
+        self.stdout.write(self.style.SUCCESS(f"Created probe {probe.name} ({probe.label})"))
+        self.stdout.write(token)
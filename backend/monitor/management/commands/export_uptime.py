@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dates import parse_timestamp
+from monitor import exports
+
+
+class Command(BaseCommand):
+    help = 'Streams uptime history to a CSV/NDJSON file (optionally gzipped) in constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--monitor', type=int, action='append', help='Monitor id (repeatable). Defaults to all monitors')
+        parser.add_argument('--since', type=str, help='Start date or ISO datetime (inclusive)')
+        parser.add_argument('--until', type=str, help='End date or ISO datetime (inclusive)')
+        parser.add_argument('--format', dest='export_format', choices=exports.EXPORT_FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--chunk-size', type=int, default=exports.EXPORT_CHUNK_SIZE)
+        parser.add_argument('--output', type=str, help='Output file path. Defaults to stdout')
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_timestamp(options['since'])
+            until = parse_timestamp(options['until'], end_of_day=True)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        stream = exports.stream_export(
+            options['export_format'],
+            monitor_ids=options['monitor'],
+            since=since,
+            until=until,
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+        )
+
+        written = 0
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                for data in stream:
+                    f.write(data)
+                    written += len(data)
+            self.stderr.write(self.style.SUCCESS(f"Exported {written} bytes to {options['output']}"))
+        else:
+            out = sys.stdout.buffer
+            for data in stream:
+                out.write(data)
+            out.flush()
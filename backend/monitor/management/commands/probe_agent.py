@@ -0,0 +1,96 @@
+import gzip
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.executor import HostLimiter, coalesce
+from monitor.management.commands.check_websites import Command as CheckCommand
+from monitor.models import MonitoredURL
+from monitor.telemetry import CycleStats
+
+
+class Command(BaseCommand):
+    help = 'Runs checks from this location and submits the results in batches to a central Pulse server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', default=settings.PULSE_PROBE_SERVER, help='Base API URL of the central server, e.g. https://pulse.example.com/api/')
+        parser.add_argument('--token', default=settings.PULSE_PROBE_TOKEN, help='Probe token from create_probe')
+        parser.add_argument('--interval', type=float, default=settings.PULSE_AGENT_INTERVAL, help='Seconds between check rounds')
+        parser.add_argument('--batch-size', type=int, default=500, help='Results per submitted batch')
+        parser.add_argument('--workers', type=int, default=settings.PULSE_CHECK_WORKERS, help='Checks run concurrently')
+        parser.add_argument('--host-concurrency', type=int, default=settings.PULSE_HOST_CONCURRENCY, help='Concurrent checks per target host name (0 = no limit)')
+        parser.add_argument('--ip-concurrency', type=int, default=settings.PULSE_IP_CONCURRENCY, help='Concurrent checks per resolved target address (0 = no limit)')
+        parser.add_argument('--host-spacing', type=float, default=settings.PULSE_HOST_SPACING, help='Minimum seconds between check starts against the same address')
+        parser.add_argument('--once', action='store_true', help='Run a single round and exit')
+
+    def handle(self, *args, **options):
+        if not options['server'] or not options['token']:
+            raise CommandError('--server and --token (or PULSE_PROBE_SERVER / PULSE_PROBE_TOKEN) are required')
+        self.base = options['server'].rstrip('/') + '/'
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f"Probe {options['token']}"
+        # Batches that could not be delivered yet, retried with their original id
+        self.pending = []
+
+        next_run = time.time()
+        while True:
+            try:
+                self.run_round(options)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"Probe round failed: {e}"))
+            if options['once']:
+                break
+            next_run += options['interval']
+            now = time.time()
+            if next_run < now:
+                next_run = now
+            time.sleep(next_run - now)
+
+        if self.pending:
+            raise CommandError(f"{len(self.pending)} batches could not be delivered")
+
+    def run_round(self, options):
+        response = self.session.get(self.base + 'probe/monitors/', timeout=30)
+        response.raise_for_status()
+        monitors = [MonitoredURL(**fields) for fields in response.json()]
+
+        checker = CheckCommand()
+        checker.cycle = CycleStats()
+        limiter = HostLimiter(options['host_concurrency'], options['ip_concurrency'], options['host_spacing'])
+        groups = coalesce(monitors, checker.probe_spec)
+
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, options['workers']), thread_name_prefix='probe') as pool:
+            futures = [pool.submit(checker.probe, spec, group, limiter) for spec, group in groups.items()]
+            for future in as_completed(futures):
+                for url_obj, (is_up, status_code, error_message, duration, _) in future.result():
+                    results.append([url_obj.id, is_up, status_code, round(duration, 4), error_message, time.time()])
+
+        size = max(1, options['batch_size'])
+        self.pending += [
+            {'batch_id': uuid.uuid4().hex, 'results': results[i:i + size]}
+            for i in range(0, len(results), size)
+        ]
+        self.flush()
+        self.stdout.write(f"Checked {len(monitors)} monitors with {len(groups)} probes, {len(self.pending)} batches pending")
+
+    def flush(self):
+        while self.pending:
+            batch = self.pending[0]
+            try:
+                response = self.session.post(
+                    self.base + 'probe/results/',
+                    data=gzip.compress(json.dumps(batch).encode()),
+                    headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip'},
+                    timeout=30,
+                )
+                response.raise_for_status()
+            except requests.RequestException as e:
+                self.stdout.write(self.style.WARNING(f"Batch {batch['batch_id']} not delivered, will retry: {e}"))
+                return
+            self.pending.pop(0)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from monitor.bulk import PURGE_CHUNK_SIZE, purge_pending_monitors
+
+
+class Command(BaseCommand):
+    help = 'Deletes monitors scheduled for deletion, removing their uptime history in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=PURGE_CHUNK_SIZE, help='Uptime records deleted per statement')
+        parser.add_argument('--max-seconds', type=float, default=None, help='Stop after this long; the next run resumes')
+
+    def handle(self, *args, **options):
+        monitors, records = purge_pending_monitors(
+            chunk_size=options['chunk_size'],
+            max_seconds=options['max_seconds'],
+            log=self.stdout.write,
+        )
+        if monitors or records:
+            self.stdout.write(self.style.SUCCESS(f"Purged {monitors} monitors and {records} uptime records"))
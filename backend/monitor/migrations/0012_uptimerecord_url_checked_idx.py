@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0011_uptimerecord_is_maintenance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='uptimerecord',
+            index=models.Index(fields=['url', 'checked_at'], name='uptime_url_checked_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0012_uptimerecord_url_checked_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoredurl',
+            name='pending_deletion',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0013_monitoredurl_pending_deletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckCycle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduled_at', models.DateTimeField()),
+                ('started_at', models.DateTimeField(db_index=True)),
+                ('finished_at', models.DateTimeField()),
+                ('monitors_due', models.IntegerField(default=0)),
+                ('checked', models.IntegerField(default=0)),
+                ('skipped', models.IntegerField(default=0)),
+                ('errors', models.IntegerField(default=0)),
+                ('max_lag', models.FloatField(default=0)),
+                ('avg_lag', models.FloatField(default=0)),
+                ('db_time', models.FloatField(default=0, help_text='Seconds spent writing check results')),
+                ('notify_time', models.FloatField(default=0, help_text='Seconds spent delivering notifications')),
+            ],
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_statuses(apps, schema_editor):
+    """Seeds the current state from each monitor's latest record and open incident."""
+    MonitoredURL = apps.get_model('monitor', 'MonitoredURL')
+    MonitorStatus = apps.get_model('monitor', 'MonitorStatus')
+    UptimeRecord = apps.get_model('monitor', 'UptimeRecord')
+    Incident = apps.get_model('monitor', 'Incident')
+
+    statuses = []
+    for monitor_id in MonitoredURL.objects.values_list('id', flat=True).iterator():
+        last = UptimeRecord.objects.filter(url_id=monitor_id).order_by('-checked_at').first()
+        if last is None:
+            continue
+        failures = 0
+        if not last.is_up:
+            last_up = UptimeRecord.objects.filter(url_id=monitor_id, is_up=True).order_by('-checked_at').values_list('checked_at', flat=True).first()
+            recent = UptimeRecord.objects.filter(url_id=monitor_id)
+            if last_up:
+                recent = recent.filter(checked_at__gt=last_up)
+            failures = recent.count()
+        is_up = bool(last.is_up)
+        statuses.append(MonitorStatus(
+            monitor_id=monitor_id,
+            status='MAINTENANCE' if last.is_maintenance else ('UP' if is_up else 'DOWN'),
+            is_up=is_up,
+            status_code=last.status_code,
+            response_time=last.response_time,
+            error_message=last.error_message,
+            is_maintenance=last.is_maintenance,
+            last_checked_at=last.checked_at,
+            consecutive_failures=failures,
+            open_incident=Incident.objects.filter(monitor_id=monitor_id, status='OPEN').order_by('-started_at').first(),
+        ))
+        if len(statuses) >= 500:
+            MonitorStatus.objects.bulk_create(statuses)
+            statuses = []
+    MonitorStatus.objects.bulk_create(statuses)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0014_checkcycle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonitorStatus',
+            fields=[
+                ('monitor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current_status', serialize=False, to='monitor.monitoredurl')),
+                ('status', models.CharField(choices=[('UP', 'Up'), ('DOWN', 'Down'), ('MAINTENANCE', 'Maintenance')], default='UP', max_length=20)),
+                ('is_up', models.BooleanField(default=True)),
+                ('status_code', models.IntegerField(blank=True, null=True)),
+                ('response_time', models.FloatField(blank=True, help_text='Response time in seconds', null=True)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('is_maintenance', models.BooleanField(default=False)),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('consecutive_failures', models.PositiveIntegerField(default=0)),
+                ('last_state_change_at', models.DateTimeField(blank=True, null=True)),
+                ('open_incident', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='monitor.incident')),
+            ],
+            options={
+                'verbose_name_plural': 'monitor statuses',
+            },
+        ),
+        migrations.RunPython(backfill_statuses, migrations.RunPython.noop),
+    ]
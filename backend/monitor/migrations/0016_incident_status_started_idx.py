@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0015_monitorstatus'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['status', 'started_at'], name='incident_status_started_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0016_incident_status_started_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='check_interval',
+            field=models.FloatField(blank=True, help_text='Seconds until the next check', null=True),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='schedule_reason',
+            field=models.CharField(choices=[('REGULAR', 'Every agent cycle'), ('CONFIRM', 'Confirming a failure'), ('RELAXED', 'Relaxed while stable')], default='REGULAR', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0017_monitorstatus_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checkcycle',
+            name='probes',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0018_checkcycle_probes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitoredurl',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='dependents', to='monitor.monitoredurl'),
+        ),
+        migrations.AlterField(
+            model_name='monitorstatus',
+            name='status',
+            field=models.CharField(choices=[('UP', 'Up'), ('DOWN', 'Down'), ('MAINTENANCE', 'Maintenance'), ('UNREACHABLE', 'Unreachable via parent')], default='UP', max_length=20),
+        ),
+    ]
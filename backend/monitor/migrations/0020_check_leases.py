@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0019_monitor_parent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checkcycle',
+            name='agent',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='lease_owner',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
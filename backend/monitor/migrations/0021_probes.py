@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0020_check_leases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Probe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('location', models.CharField(blank=True, default='', help_text="Shown in incident activity, e.g. 'Frankfurt, DE'", max_length=255)),
+                ('token_hash', models.CharField(blank=True, max_length=64, null=True, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_seen_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProbeBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(max_length=64)),
+                ('results', models.IntegerField(default=0)),
+                ('received_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('probe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='monitor.probe')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('probe', 'batch_id'), name='probe_batch_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProbeVerdict',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_up', models.BooleanField()),
+                ('status_code', models.IntegerField(blank=True, null=True)),
+                ('response_time', models.FloatField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('checked_at', models.DateTimeField()),
+                ('monitor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verdicts', to='monitor.monitoredurl')),
+                ('probe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verdicts', to='monitor.probe')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('monitor', 'probe'), name='probe_verdict_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitor', '0021_probes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incident',
+            name='kind',
+            field=models.CharField(choices=[('OUTAGE', 'Outage'), ('DEGRADED', 'Degraded response time')], default='OUTAGE', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='degraded_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='latency_mean',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='latency_recent',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='latency_samples',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='latency_streak',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='monitorstatus',
+            name='latency_var',
+            field=models.FloatField(default=0),
+        ),
+    ]
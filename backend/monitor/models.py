@@ -36,6 +36,9 @@ class MonitoredURL(models.Model):
     # Advanced Settings
     keyword = models.CharField(max_length=255, blank=True, null=True, help_text="Keyword to search for (Content Matching)")
     port = models.IntegerField(blank=True, null=True, help_text="Port for Port Monitoring")
+    # Host check this monitor depends on. While it is down the monitor is marked
+    # unreachable instead of being checked; defaults to a PING monitor on the same host.
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='dependents')
     
     # HTTP/API Advanced Settings
     HTTP_METHODS = (
@@ -72,6 +75,8 @@ class MonitoredURL(models.Model):
     visible_on_status_page = models.BooleanField(default=True)
     
     is_active = models.BooleanField(default=True, null=True, blank=True)
+    # Set by bulk delete; rows are purged in chunks by the agent (purge_monitors)
+    pending_deletion = models.BooleanField(default=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
 
     def __str__(self):
@@ -86,6 +91,12 @@ class UptimeRecord(models.Model):
     error_message = models.TextField(blank=True, null=True)
     is_maintenance = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Per-monitor history scans (exports, uptime windows, latest record)
+            models.Index(fields=['url', 'checked_at'], name='uptime_url_checked_idx'),
+        ]
+
     def __str__(self):
         return f"{self.url.name} - {self.checked_at} - {'UP' if self.is_up else 'DOWN'}"
 
@@ -94,12 +105,23 @@ class Incident(models.Model):
         ('OPEN', 'Open'),
         ('RESOLVED', 'Resolved'),
     )
+    KIND_CHOICES = (
+        ('OUTAGE', 'Outage'),
+        ('DEGRADED', 'Degraded response time'),
+    )
     monitor = models.ForeignKey(MonitoredURL, on_delete=models.CASCADE, related_name='incidents')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='OPEN')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='OUTAGE')
     root_cause = models.CharField(max_length=255, null=True, blank=True)
     comments = models.TextField(null=True, blank=True)
     started_at = models.DateTimeField(auto_now_add=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Open incident feed and listings ordered by start time
+            models.Index(fields=['status', 'started_at'], name='incident_status_started_idx'),
+        ]
     
     @property
     def duration(self):
@@ -111,6 +133,79 @@ class Incident(models.Model):
     def __str__(self):
         return f"Incident on {self.monitor.name} - {self.status}"
 
+class CheckCycle(models.Model):
+    """One run of check_websites, recorded so the agent can monitor itself."""
+    agent = models.CharField(max_length=64, blank=True, default='')
+    scheduled_at = models.DateTimeField()
+    started_at = models.DateTimeField(db_index=True)
+    finished_at = models.DateTimeField()
+    monitors_due = models.IntegerField(default=0)
+    checked = models.IntegerField(default=0)
+    # Network probes sent; lower than checked when monitors share a probe
+    probes = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    errors = models.IntegerField(default=0)
+    # Seconds between the scheduled cycle start and each check starting
+    max_lag = models.FloatField(default=0)
+    avg_lag = models.FloatField(default=0)
+    db_time = models.FloatField(default=0, help_text="Seconds spent writing check results")
+    notify_time = models.FloatField(default=0, help_text="Seconds spent delivering notifications")
+
+    @property
+    def duration(self):
+        return (self.finished_at - self.started_at).total_seconds()
+
+    def __str__(self):
+        return f"Cycle {self.started_at} - {self.checked}/{self.monitors_due} checked"
+
+class MonitorStatus(models.Model):
+    """
+    Current state of a monitor, one row per monitor, updated in place by the
+    check engine so "is it up right now" never scans UptimeRecord.
+    """
+    STATUS_CHOICES = (
+        ('UP', 'Up'),
+        ('DOWN', 'Down'),
+        ('MAINTENANCE', 'Maintenance'),
+        ('UNREACHABLE', 'Unreachable via parent'),
+    )
+    SCHEDULE_CHOICES = (
+        ('REGULAR', 'Every agent cycle'),
+        ('CONFIRM', 'Confirming a failure'),
+        ('RELAXED', 'Relaxed while stable'),
+    )
+    monitor = models.OneToOneField(MonitoredURL, on_delete=models.CASCADE, primary_key=True, related_name='current_status')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='UP')
+    is_up = models.BooleanField(default=True)
+    status_code = models.IntegerField(null=True, blank=True)
+    response_time = models.FloatField(null=True, blank=True, help_text="Response time in seconds")
+    error_message = models.TextField(null=True, blank=True)
+    is_maintenance = models.BooleanField(default=False)
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    last_state_change_at = models.DateTimeField(null=True, blank=True)
+    open_incident = models.ForeignKey(Incident, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # Adaptive scheduling decision taken after the last check (see monitor.scheduling)
+    next_check_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    check_interval = models.FloatField(null=True, blank=True, help_text="Seconds until the next check")
+    schedule_reason = models.CharField(max_length=20, choices=SCHEDULE_CHOICES, default='REGULAR')
+    # Agent currently checking this monitor (see monitor.leases)
+    lease_owner = models.CharField(max_length=64, null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    # Response-time baseline: EWMA of log seconds (see monitor.anomaly)
+    latency_mean = models.FloatField(null=True, blank=True)
+    latency_var = models.FloatField(default=0)
+    latency_recent = models.FloatField(null=True, blank=True)
+    latency_samples = models.PositiveIntegerField(default=0)
+    latency_streak = models.PositiveSmallIntegerField(default=0)
+    degraded_since = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'monitor statuses'
+
+    def __str__(self):
+        return f"{self.monitor_id} - {self.status}"
+
 class ActivityLog(models.Model):
     incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name='activities')
     message = models.CharField(max_length=255)
@@ -142,3 +237,56 @@ class MaintenanceWindow(models.Model):
 
     def __str__(self):
         return f"{self.title} - {self.monitor.name}"
+
+class Probe(models.Model):
+    """
+    A location that runs checks: the local agent, or a remote probe agent
+    submitting batches through the ingest API (see monitor.probes).
+    """
+    name = models.CharField(max_length=100, unique=True)
+    location = models.CharField(max_length=255, blank=True, default='', help_text="Shown in incident activity, e.g. 'Frankfurt, DE'")
+    # sha256 of the probe's API token; the local agent has none
+    token_hash = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Lets DRF treat an authenticated probe as request.user
+    is_authenticated = True
+
+    @property
+    def label(self):
+        return self.location or self.name
+
+    def __str__(self):
+        return self.label
+
+class ProbeBatch(models.Model):
+    """Received result batch, kept so a retried batch is ingested only once."""
+    probe = models.ForeignKey(Probe, on_delete=models.CASCADE, related_name='batches')
+    batch_id = models.CharField(max_length=64)
+    results = models.IntegerField(default=0)
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['probe', 'batch_id'], name='probe_batch_unique'),
+        ]
+
+class ProbeVerdict(models.Model):
+    """Latest result of a monitor from one probe location, used for the incident quorum."""
+    monitor = models.ForeignKey(MonitoredURL, on_delete=models.CASCADE, related_name='verdicts')
+    probe = models.ForeignKey(Probe, on_delete=models.CASCADE, related_name='verdicts')
+    is_up = models.BooleanField()
+    status_code = models.IntegerField(null=True, blank=True)
+    response_time = models.FloatField(null=True, blank=True)
+    error_message = models.TextField(null=True, blank=True)
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['monitor', 'probe'], name='probe_verdict_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.monitor_id} from {self.probe_id} - {'UP' if self.is_up else 'DOWN'}"
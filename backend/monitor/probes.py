@@ -0,0 +1,168 @@
+"""
+Remote probe agents: authentication and batched result ingest.
+
+A probe agent (manage.py probe_agent) fetches the active monitors, checks
+them from its own location and POSTs its results in batches:
+
+    POST /api/probe/results/
+    Authorization: Probe <token>
+    Content-Encoding: gzip            (optional)
+
+    {"batch_id": "<unique per batch>",
+     "results": [[monitor_id, is_up, status_code, response_time, error_message, checked_at_epoch], ...]}
+
+A batch id is ingested once per probe, so agents can retry a batch safely.
+Results update the probe's ProbeVerdict rows, and monitors whose verdict
+flipped, or whose down verdict became fresh again, have their incident
+re-evaluated by quorum (monitor.incidents).
+"""
+import datetime
+import hashlib
+import json
+import secrets
+import zlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import authentication, exceptions, permissions
+
+from .incidents import IncidentManager
+from .models import MonitoredURL, Probe, ProbeBatch, ProbeVerdict
+
+KEYWORD = 'Probe'
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MONITOR_FIELDS = ['id', 'monitor_type', 'url', 'http_method', 'request_headers', 'post_data', 'timeout', 'port', 'keyword', 'expected_status_code']
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_probe(name, location=''):
+    """Creates a remote probe and returns (probe, token); only the token's hash is stored."""
+    token = secrets.token_urlsafe(32)
+    probe = Probe.objects.create(name=name, location=location, token_hash=hash_token(token))
+    return probe, token
+
+
+class ProbeAuthentication(authentication.BaseAuthentication):
+    """`Authorization: Probe <token>`; request.user and request.auth become the Probe."""
+
+    def authenticate(self, request):
+        parts = authentication.get_authorization_header(request).split()
+        if not parts or parts[0].decode().lower() != KEYWORD.lower():
+            return None
+        if len(parts) != 2:
+            raise exceptions.AuthenticationFailed('Invalid probe authorization header.')
+        probe = Probe.objects.filter(token_hash=hash_token(parts[1].decode()), is_active=True).first()
+        if probe is None:
+            raise exceptions.AuthenticationFailed('Unknown or inactive probe.')
+        return probe, probe
+
+    def authenticate_header(self, request):
+        return KEYWORD
+
+
+class IsProbe(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return isinstance(request.auth, Probe)
+
+
+def probe_monitors():
+    """The check definitions a probe agent needs, for every active monitor."""
+    return list(MonitoredURL.objects.filter(is_active=True).values(*MONITOR_FIELDS))
+
+
+def read_payload(request):
+    """Decodes the (optionally gzip-compressed) JSON body, refusing oversized input."""
+    body = request.body
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(body, MAX_BODY_BYTES)
+        except zlib.error:
+            raise exceptions.ParseError('Malformed gzip body.')
+        if decompressor.unconsumed_tail:
+            raise exceptions.ParseError('Batch too large.')
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise exceptions.ParseError('Malformed JSON body.')
+    if not isinstance(payload, dict) or not isinstance(payload.get('batch_id'), str) or not isinstance(payload.get('results'), list):
+        raise exceptions.ParseError('Expected {"batch_id": str, "results": [...]}.')
+    if not 0 < len(payload['batch_id']) <= 64:
+        raise exceptions.ParseError('batch_id must be 1-64 characters.')
+    if len(payload['results']) > settings.PULSE_PROBE_MAX_BATCH:
+        raise exceptions.ParseError(f"At most {settings.PULSE_PROBE_MAX_BATCH} results per batch.")
+    return payload
+
+
+def _parse_result(row, now):
+    try:
+        monitor_id, is_up, status_code, response_time, error_message, checked_at = row
+        checked_at = datetime.datetime.fromtimestamp(float(checked_at), datetime.timezone.utc)
+        return int(monitor_id), {
+            'is_up': bool(is_up),
+            'status_code': None if status_code is None else int(status_code),
+            'response_time': None if response_time is None else float(response_time),
+            'error_message': None if error_message is None else str(error_message)[:1000],
+            # A probe clock running ahead must not pin its verdict as the newest (and fresh) forever
+            'checked_at': min(checked_at, now),
+        }
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise exceptions.ParseError(f"Malformed result row: {str(row)[:100]}")
+
+
+def ingest_batch(probe, batch_id, rows, notifications=None):
+    """
+    Stores one batch of a probe's results. Returns a summary dict; a batch id
+    seen before from the same probe is acknowledged without being applied again.
+    """
+    now = timezone.now()
+    results = {}
+    for row in rows:
+        monitor_id, values = _parse_result(row, now)
+        # Keep the newest result per monitor within the batch
+        if monitor_id not in results or values['checked_at'] > results[monitor_id]['checked_at']:
+            results[monitor_id] = values
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                ProbeBatch.objects.create(probe=probe, batch_id=batch_id, results=len(rows))
+        except IntegrityError:
+            return {'batch_id': batch_id, 'duplicate': True, 'accepted': 0, 'changed': 0}
+
+        stale_before = now - datetime.timedelta(seconds=settings.PULSE_PROBE_MAX_AGE)
+        known = set(MonitoredURL.objects.filter(id__in=results, is_active=True).values_list('id', flat=True))
+        existing = {v.monitor_id: v for v in ProbeVerdict.objects.filter(probe=probe, monitor_id__in=known)}
+        created, updated, changed = [], [], []
+        for monitor_id in known:
+            values = results[monitor_id]
+            verdict = existing.get(monitor_id)
+            if verdict is None:
+                created.append(ProbeVerdict(probe=probe, monitor_id=monitor_id, **values))
+                changed.append(monitor_id)
+            elif values['checked_at'] > verdict.checked_at:
+                # A flipped verdict, or a down verdict that was too old to count, can move the quorum
+                if verdict.is_up != values['is_up'] or (not values['is_up'] and verdict.checked_at < stale_before):
+                    changed.append(monitor_id)
+                for field, value in values.items():
+                    setattr(verdict, field, value)
+                updated.append(verdict)
+        ProbeVerdict.objects.bulk_create(created)
+        ProbeVerdict.objects.bulk_update(updated, ['is_up', 'status_code', 'response_time', 'error_message', 'checked_at'])
+        Probe.objects.filter(pk=probe.pk).update(last_seen_at=timezone.now())
+
+    incidents = IncidentManager(notifications)
+    for url_obj in MonitoredURL.objects.filter(id__in=changed).prefetch_related('alert_contacts'):
+        values = results[url_obj.id]
+        incidents.evaluate(url_obj, None if values['is_up'] else values['error_message'])
+
+    return {'batch_id': batch_id, 'duplicate': False, 'accepted': len(known), 'changed': len(changed)}
+
+
+def prune_batches(days=None):
+    days = days or settings.CHECK_CYCLE_RETENTION_DAYS
+    return ProbeBatch.objects.filter(received_at__lt=timezone.now() - datetime.timedelta(days=days)).delete()[0]
@@ -0,0 +1,52 @@
+"""
+Adaptive check cadence.
+
+By default every active monitor is checked each agent cycle. A monitor that
+starts failing is re-checked every PULSE_CONFIRM_INTERVAL seconds for its
+first PULSE_CONFIRM_CHECKS failures, so outages are confirmed (or cleared)
+sooner; once it has been stable for PULSE_RELAX_AFTER seconds its cadence
+doubles each check up to its configured `interval`. The decision is stored
+on the MonitorStatus row and agents lease due monitors from it
+(monitor.leases).
+"""
+import datetime
+
+from django.conf import settings
+
+REGULAR = 'REGULAR'
+CONFIRM = 'CONFIRM'
+RELAXED = 'RELAXED'
+
+# Tolerance for timestamp rounding between the agent's schedule and stored due times
+DUE_SLACK = datetime.timedelta(seconds=1)
+
+
+def schedule_next(status, monitor, cycle_at):
+    """
+    Sets next_check_at/check_interval/schedule_reason on the status row (in
+    memory) after a check that ran in the cycle scheduled for `cycle_at`.
+    Delays count from the cycle's scheduled start so the next cycle lines up.
+    """
+    regular = settings.PULSE_AGENT_INTERVAL
+    configured = max(regular, (monitor.interval or 5) * 60)
+    confirming = (
+        settings.PULSE_CONFIRM_INTERVAL
+        and not status.is_up
+        and not status.is_maintenance
+        and status.consecutive_failures <= settings.PULSE_CONFIRM_CHECKS
+    )
+    stable_since = status.last_state_change_at or status.last_checked_at
+
+    if confirming:
+        delay, reason = settings.PULSE_CONFIRM_INTERVAL, CONFIRM
+    elif (settings.PULSE_RELAX_AFTER and status.is_up and stable_since
+          and (cycle_at - stable_since).total_seconds() >= settings.PULSE_RELAX_AFTER):
+        previous = status.check_interval if status.schedule_reason == RELAXED else regular
+        delay, reason = min(configured, max(regular, previous * 2)), RELAXED
+    else:
+        delay, reason = regular, REGULAR
+
+    status.check_interval = delay
+    status.schedule_reason = reason
+    status.next_check_at = cycle_at + datetime.timedelta(seconds=delay)
+    return reason
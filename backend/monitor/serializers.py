@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import MonitoredURL, UptimeRecord, AlertContact, Incident, ActivityLog, StatusPage, MaintenanceWindow
+from .models import MonitoredURL, UptimeRecord, AlertContact, Incident, ActivityLog, StatusPage, MaintenanceWindow, CheckCycle, MonitorStatus
+from .anomaly import baseline_latency
+from .status import serialize_status
 
 class StatusPageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -22,6 +24,23 @@ class UptimeRecordSerializer(serializers.ModelSerializer):
         model = UptimeRecord
         fields = ['status_code', 'response_time', 'is_up', 'checked_at', 'error_message']
 
+class MonitorStatusSerializer(serializers.ModelSerializer):
+    baseline_response_time = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MonitorStatus
+        exclude = ['monitor', 'latency_mean', 'latency_var', 'latency_recent', 'latency_streak']
+
+    def get_baseline_response_time(self, obj):
+        return baseline_latency(obj)
+
+class CheckCycleSerializer(serializers.ModelSerializer):
+    duration = serializers.ReadOnlyField()
+
+    class Meta:
+        model = CheckCycle
+        fields = '__all__'
+
 class ActivityLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = ActivityLog
@@ -47,6 +66,7 @@ class IncidentSerializer(serializers.ModelSerializer):
 
 class MonitoredURLSerializer(serializers.ModelSerializer):
     last_record = serializers.SerializerMethodField()
+    current_status = MonitorStatusSerializer(read_only=True)
     uptime_percentage_24h = serializers.SerializerMethodField()
     uptime_7d = serializers.SerializerMethodField()
     uptime_30d = serializers.SerializerMethodField()
@@ -60,11 +80,21 @@ class MonitoredURLSerializer(serializers.ModelSerializer):
         model = MonitoredURL
         fields = '__all__'
 
+    def validate_parent(self, value):
+        if self.instance is None:
+            return value
+        # Walk up from the new parent; reaching this monitor would close a loop
+        ancestor, seen = value, set()
+        while ancestor is not None and ancestor.pk not in seen:
+            if ancestor.pk == self.instance.pk:
+                raise serializers.ValidationError("A monitor cannot depend on itself or on one of its dependents.")
+            seen.add(ancestor.pk)
+            ancestor = ancestor.parent
+        return value
+
     def get_last_record(self, obj):
-        last = obj.records.order_by('-checked_at').first()
-        if last:
-            return UptimeRecordSerializer(last).data
-        return None
+        # Served from the current-state row (select_related('current_status') in list views)
+        return serialize_status(getattr(obj, 'current_status', None))
 
     def _calculate_uptime(self, obj, days):
         from django.utils import timezone
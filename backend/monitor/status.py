@@ -0,0 +1,71 @@
+"""Maintenance of the MonitorStatus current-state rows."""
+from django.utils import timezone
+
+from .models import MonitorStatus
+
+# Not open_incident: IncidentManager sets it under its own lock
+UPDATE_FIELDS = [
+    'status', 'is_up', 'status_code', 'response_time', 'error_message', 'is_maintenance',
+    'last_checked_at', 'consecutive_failures', 'last_state_change_at', 'next_check_at',
+    'check_interval', 'schedule_reason', 'lease_owner', 'lease_expires_at',
+    'latency_mean', 'latency_var', 'latency_recent', 'latency_samples', 'latency_streak', 'degraded_since',
+]
+
+
+def load_statuses(monitors):
+    """{monitor_id: MonitorStatus} for the given monitors, creating missing rows in memory only."""
+    statuses = {status.monitor_id: status for status in MonitorStatus.objects.filter(monitor__in=monitors)}
+    for monitor in monitors:
+        if monitor.id not in statuses:
+            statuses[monitor.id] = MonitorStatus(monitor=monitor)
+    return statuses
+
+
+def apply_check(status, is_up, status_code=None, response_time=None, error_message=None, is_maintenance=False, checked_at=None):
+    """Applies one check result to the row (in memory) and returns whether the up/down state changed."""
+    checked_at = checked_at or timezone.now()
+    changed = status.last_checked_at is not None and status.is_up != is_up
+    if changed or status.last_checked_at is None:
+        status.last_state_change_at = checked_at
+
+    status.is_up = is_up
+    status.status = 'MAINTENANCE' if is_maintenance else ('UP' if is_up else 'DOWN')
+    status.status_code = status_code
+    status.response_time = response_time
+    status.error_message = error_message
+    status.is_maintenance = is_maintenance
+    status.last_checked_at = checked_at
+    status.consecutive_failures = 0 if is_up else status.consecutive_failures + 1
+    return changed
+
+
+def save_status(status):
+    """
+    Stores the row and releases its lease. A leased row is only written while
+    the lease is still ours; returns False when another agent took it over.
+    """
+    owner = status.lease_owner
+    status.lease_owner = status.lease_expires_at = None
+    if status._state.adding:
+        # Update-or-insert: IncidentManager.lock() may have created the row meanwhile
+        status.save()
+    elif owner:
+        values = {field: getattr(status, field) for field in UPDATE_FIELDS}
+        return MonitorStatus.objects.filter(pk=status.pk, lease_owner=owner).update(**values) == 1
+    else:
+        status.save(update_fields=UPDATE_FIELDS)
+    return True
+
+
+def serialize_status(status):
+    """last_record-compatible payload for API consumers."""
+    if status is None or status.last_checked_at is None:
+        return None
+    return {
+        'status_code': status.status_code,
+        'response_time': status.response_time,
+        'is_up': status.is_up,
+        'checked_at': status.last_checked_at,
+        'error_message': status.error_message,
+        'is_maintenance': status.is_maintenance,
+    }
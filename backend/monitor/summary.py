@@ -0,0 +1,116 @@
+"""
+Fleet summary for the dashboard, built from a fixed number of aggregate
+queries regardless of how many monitors exist.
+"""
+import datetime
+
+from django.db.models import Avg, Case, CharField, Count, F, Q, Value, When
+from django.utils import timezone
+
+from .bulk import active_monitors
+from .models import Incident, MaintenanceWindow, UptimeRecord
+
+UPTIME_WINDOWS = {'24h': 1, '7d': 7, '30d': 30}
+RECENT_INCIDENTS = 5
+
+
+def fleet_summary(now=None):
+    now = now or timezone.now()
+    monitors = active_monitors()
+
+    # 1. Counts by type and current status, with latency from the current-state rows
+    by_status, by_type = {}, {}
+    latency_sum = latency_count = total = 0
+    # Status rows exist before a monitor's first check (leases), those count as pending
+    state = Case(When(current_status__last_checked_at__isnull=False, then=F('current_status__status')), default=Value(None), output_field=CharField())
+    groups = monitors.annotate(state=state).values('monitor_type', 'is_active', 'state').annotate(
+        n=Count('id'),
+        latency=Avg('current_status__response_time'),
+        latency_n=Count('current_status__response_time'),
+    )
+    for group in groups:
+        if not group['is_active']:
+            status = 'PAUSED'
+        else:
+            status = group['state'] or 'PENDING'
+        by_status[status] = by_status.get(status, 0) + group['n']
+        by_type[group['monitor_type']] = by_type.get(group['monitor_type'], 0) + group['n']
+        total += group['n']
+        if group['latency'] is not None:
+            latency_sum += group['latency'] * group['latency_n']
+            latency_count += group['latency_n']
+
+    # 2. Per-monitor uptime over every window in one grouped scan
+    since = {name: now - datetime.timedelta(days=days) for name, days in UPTIME_WINDOWS.items()}
+    aggregates = {}
+    for name, start in since.items():
+        aggregates[f'total_{name}'] = Count('id', filter=Q(checked_at__gte=start))
+        aggregates[f'up_{name}'] = Count('id', filter=Q(checked_at__gte=start, is_up=True))
+    rows = UptimeRecord.objects.filter(
+        url__in=monitors.values('id'),
+        checked_at__gte=min(since.values()),
+        is_maintenance=False,
+    ).values('url_id').annotate(**aggregates)
+    per_monitor = {row['url_id']: row for row in rows}
+
+    # 3. Compact monitor list for the landing page, also used to average uptime
+    monitor_rows = list(monitors.order_by('-created_at').values(
+        'id', 'name', 'url', 'monitor_type', 'is_active', 'check_ssl', 'ssl_expiry',
+        'current_status__status', 'current_status__is_up', 'current_status__response_time',
+        'current_status__error_message', 'current_status__last_checked_at',
+    ))
+    # Mirrors MonitoredURLSerializer: no records counts as 100% if active
+    active_flags = {row['id']: row['is_active'] for row in monitor_rows}
+    uptime = {}
+    for name in UPTIME_WINDOWS:
+        percentages = []
+        for monitor_id, is_active in active_flags.items():
+            row = per_monitor.get(monitor_id)
+            checks = row[f'total_{name}'] if row else 0
+            if checks:
+                percentages.append(row[f'up_{name}'] / checks * 100)
+            else:
+                percentages.append(100.0 if is_active else 0.0)
+        uptime[name] = round(sum(percentages) / len(percentages), 3) if percentages else None
+
+    # 4. Open incidents, 5. monitors in maintenance, 6. recent incidents
+    open_incidents = Incident.objects.filter(status='OPEN', monitor__pending_deletion=False).count()
+    in_maintenance = MaintenanceWindow.objects.filter(
+        is_active=True, start_time__lte=now, end_time__gte=now, monitor__pending_deletion=False,
+    ).values('monitor_id').distinct().count()
+    recent = Incident.objects.filter(monitor__pending_deletion=False).order_by('-started_at').values(
+        'id', 'monitor_id', 'monitor__name', 'status', 'kind', 'root_cause', 'started_at', 'resolved_at',
+    )[:RECENT_INCIDENTS]
+
+    return {
+        'generated_at': now,
+        'total': total,
+        'by_status': by_status,
+        'by_type': by_type,
+        'avg_response_time': round(latency_sum / latency_count, 4) if latency_count else None,
+        'uptime': uptime,
+        'open_incidents': open_incidents,
+        'in_maintenance': in_maintenance,
+        'recent_incidents': [
+            {**{k: v for k, v in incident.items() if k != 'monitor__name'}, 'monitor_name': incident['monitor__name']}
+            for incident in recent
+        ],
+        'monitors': [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'url': row['url'],
+                'monitor_type': row['monitor_type'],
+                'is_active': row['is_active'],
+                'check_ssl': row['check_ssl'],
+                'ssl_expiry': row['ssl_expiry'],
+                'status': 'PAUSED' if not row['is_active'] else (
+                    row['current_status__status'] if row['current_status__last_checked_at'] else 'PENDING'),
+                'is_up': row['current_status__is_up'],
+                'response_time': row['current_status__response_time'],
+                'error_message': row['current_status__error_message'],
+                'last_checked_at': row['current_status__last_checked_at'],
+            }
+            for row in monitor_rows
+        ],
+    }
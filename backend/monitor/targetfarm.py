@@ -0,0 +1,197 @@
+"""
+Local stub targets for benchmarking the check engine without external network.
+
+    http       GET /?latency=<ms>&status=<code>&size=<bytes>&keyword=<word>&at=start|middle|end|none
+    tcp_open   accepts and closes connections
+    tcp_closed nothing listens (connection refused)
+    blackhole  accepts TCP connections but never sends a byte
+    slow_tls   waits `tls_delay` seconds before the TLS handshake, then answers 200
+
+All listeners bind 127.0.0.1 on ephemeral ports; see TargetFarm.urls().
+"""
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HOST = '127.0.0.1'
+FILLER = b'lorem ipsum dolor sit amet '
+
+
+def build_body(size, keyword=None, at='end'):
+    body = (FILLER * (size // len(FILLER) + 1))[:size]
+    if not keyword or at == 'none':
+        return body
+    word = keyword.encode()
+    if at == 'start':
+        return word + body[len(word):]
+    if at == 'middle':
+        half = max(0, (len(body) - len(word)) // 2)
+        return body[:half] + word + body[half + len(word):]
+    return body[:max(0, len(body) - len(word))] + word
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, include_body=True):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        latency = float(params.get('latency', 0)) / 1000
+        if latency:
+            time.sleep(latency)
+        body = build_body(int(params.get('size', 512)), params.get('keyword'), params.get('at', 'end'))
+        self.send_response(int(params.get('status', 200)))
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond()
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def _self_signed_cert(directory):
+    """Writes a throwaway localhost certificate and key, returns their paths."""
+    import datetime
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, 'cert.pem')
+    key_path = os.path.join(directory, 'key.pem')
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class TargetFarm:
+    def __init__(self, tls_delay=None):
+        self.tls_delay = tls_delay
+        self.ports = {}
+        self._stopping = threading.Event()
+        self._sockets = []
+        self._held = []
+        self._threads = []
+        self._http = None
+        self._tempdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self):
+        self._http = _StubHTTPServer((HOST, 0), StubHandler)
+        self.ports['http'] = self._http.server_address[1]
+        self._spawn(self._http.serve_forever)
+
+        self.ports['tcp_open'] = self._listen(self._accept_and_close)
+        self.ports['blackhole'] = self._listen(self._accept_and_hold)
+        self.ports['tcp_closed'] = self._free_port()
+        if self.tls_delay is not None:
+            self._tempdir = tempfile.TemporaryDirectory()
+            self._tls = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self._tls.load_cert_chain(*_self_signed_cert(self._tempdir.name))
+            self.ports['slow_tls'] = self._listen(self._accept_slow_tls)
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._http:
+            self._http.shutdown()
+            self._http.server_close()
+        for sock in self._sockets + self._held:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        if self._tempdir:
+            self._tempdir.cleanup()
+
+    def url(self, target, **params):
+        query = '&'.join(f"{key}={value}" for key, value in params.items() if value is not None)
+        scheme = 'https' if target == 'slow_tls' else 'http'
+        return f"{scheme}://{HOST}:{self.ports[target]}/" + (f"?{query}" if query else '')
+
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _free_port(self):
+        with socket.socket() as sock:
+            sock.bind((HOST, 0))
+            return sock.getsockname()[1]
+
+    def _listen(self, handler):
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((HOST, 0))
+        sock.listen(1024)
+        self._sockets.append(sock)
+        self._spawn(self._accept_loop, sock, handler)
+        return sock.getsockname()[1]
+
+    def _accept_loop(self, sock, handler):
+        while not self._stopping.is_set():
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            handler(conn)
+
+    def _accept_and_close(self, conn):
+        conn.close()
+
+    def _accept_and_hold(self, conn):
+        self._held.append(conn)
+
+    def _accept_slow_tls(self, conn):
+        self._spawn(self._serve_slow_tls, conn)
+
+    def _serve_slow_tls(self, conn):
+        try:
+            if self._stopping.wait(self.tls_delay):
+                return
+            with self._tls.wrap_socket(conn, server_side=True) as tls:
+                tls.recv(4096)
+                tls.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+        except (OSError, ssl.SSLError):
+            pass
+        finally:
+            conn.close()
@@ -0,0 +1,120 @@
+"""
+Per-cycle telemetry for the check engine (self-monitoring).
+
+check_websites accumulates a CycleStats while it runs and stores it as a
+CheckCycle row; agent_health() turns the latest rows into an ok/degraded
+verdict for the health endpoint.
+"""
+import datetime
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CheckCycle
+
+
+class CycleStats:
+    def __init__(self, scheduled_at=None, agent=''):
+        self.agent = agent
+        self.started = time.time()
+        self.scheduled_at = scheduled_at or self.started
+        self.monitors_due = 0
+        self.checked = 0
+        self.probes = 0
+        self.skipped = 0
+        self.errors = 0
+        self.db_time = 0.0
+        self.notify_time = 0.0
+        self._lags = []
+
+    def check_started(self):
+        """Records how late a check starts relative to the cycle's scheduled time."""
+        self._lags.append(max(0.0, time.time() - self.scheduled_at))
+
+    @contextmanager
+    def db_write(self, histogram):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.db_time += elapsed
+            histogram.observe(elapsed)
+
+    def worth_recording(self):
+        """
+        Idle ticks (nothing was due) are only recorded as a heartbeat, once per
+        PULSE_AGENT_INTERVAL, so agent_health still sees the agent alive.
+        """
+        if self.monitors_due:
+            return True
+        since = timezone.now() - datetime.timedelta(seconds=settings.PULSE_AGENT_INTERVAL)
+        return not CheckCycle.objects.filter(finished_at__gte=since).exists()
+
+    def save(self):
+        tz = datetime.timezone.utc
+        return CheckCycle.objects.create(
+            agent=self.agent,
+            scheduled_at=datetime.datetime.fromtimestamp(self.scheduled_at, tz),
+            started_at=datetime.datetime.fromtimestamp(self.started, tz),
+            finished_at=timezone.now(),
+            monitors_due=self.monitors_due,
+            checked=self.checked,
+            probes=self.probes,
+            skipped=self.skipped,
+            errors=self.errors,
+            max_lag=max(self._lags, default=0.0),
+            avg_lag=sum(self._lags) / len(self._lags) if self._lags else 0.0,
+            db_time=self.db_time,
+            notify_time=self.notify_time,
+        )
+
+
+def prune_cycles(days=None):
+    days = days or settings.CHECK_CYCLE_RETENTION_DAYS
+    return CheckCycle.objects.filter(started_at__lt=timezone.now() - datetime.timedelta(days=days)).delete()[0]
+
+
+def agent_health(now=None):
+    """
+    Returns (healthy, report). The agent is degraded when the latest cycle
+    lagged more than PULSE_HEALTH_MAX_LAG seconds or no cycle finished within
+    three agent intervals.
+    """
+    now = now or timezone.now()
+    max_lag = settings.PULSE_HEALTH_MAX_LAG
+    stale_after = 3 * settings.PULSE_AGENT_INTERVAL
+    last = CheckCycle.objects.order_by('-started_at').first()
+    if last is None:
+        return False, {'status': 'degraded', 'reasons': ['No check cycle has been recorded yet.'], 'last_cycle': None}
+
+    reasons = []
+    since_last = (now - last.finished_at).total_seconds()
+    if since_last > stale_after:
+        reasons.append(f"Last cycle finished {since_last:.0f}s ago (expected every {settings.PULSE_AGENT_INTERVAL}s).")
+    if last.max_lag > max_lag:
+        reasons.append(f"Check lag of {last.max_lag:.1f}s exceeds {max_lag}s.")
+    if last.skipped:
+        reasons.append(f"{last.skipped} due monitors were skipped.")
+
+    report = {
+        'status': 'degraded' if reasons else 'ok',
+        'reasons': reasons,
+        'max_lag_threshold': max_lag,
+        'seconds_since_last_cycle': round(since_last, 1),
+        'last_cycle': {
+            'id': last.id,
+            'started_at': last.started_at,
+            'duration': round(last.duration, 3),
+            'monitors_due': last.monitors_due,
+            'checked': last.checked,
+            'probes': last.probes,
+            'skipped': last.skipped,
+            'errors': last.errors,
+            'max_lag': last.max_lag,
+            'avg_lag': last.avg_lag,
+        },
+    }
+    return not reasons, report
@@ -1,3 +1,382 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .anomaly import DEGRADED, RECOVERED, baseline_latency, observe_latency
+from .bulk import export_monitors, import_monitors, parse_import_payload
+from .executor import HostLimiter, coalesce
+from .incidents import IncidentManager
+from .management.commands.check_websites import Command as CheckCommand
+from .models import Incident, MonitoredURL, MonitorStatus, ProbeVerdict
+from .probes import create_probe, ingest_batch
+from .scheduling import CONFIRM, REGULAR, RELAXED, schedule_next
+from .serializers import MonitoredURLSerializer
+from .status import save_status
+from .targetfarm import TargetFarm
+from .telemetry import CycleStats
+
+RESULTS_URL = '/api/probe/results/'
+
+
+def result(monitor, is_up, checked_at=None, error='Connection refused'):
+    return [monitor.id, is_up, 200 if is_up else None, 0.1, None if is_up else error, checked_at or time.time()]
+
+
+class ProbeIngestTests(TestCase):
+    def setUp(self):
+        self.monitor = MonitoredURL.objects.create(name='Shop', url='https://shop.example.com', notify_email=False)
+        self.probe, self.token = create_probe('fra', 'Frankfurt, DE')
+        self.client = APIClient()
+
+    def post(self, payload, token=None, compress=False):
+        body = json.dumps(payload).encode()
+        headers = {'HTTP_AUTHORIZATION': f"Probe {token or self.token}"}
+        if compress:
+            body = gzip.compress(body)
+            headers['HTTP_CONTENT_ENCODING'] = 'gzip'
+        return self.client.post(RESULTS_URL, body, content_type='application/json', **headers)
+
+    def test_requires_probe_token(self):
+        self.assertEqual(self.client.get('/api/probe/monitors/').status_code, 401)
+        response = self.client.get('/api/probe/monitors/', HTTP_AUTHORIZATION='Probe wrong')
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.get('/api/probe/monitors/', HTTP_AUTHORIZATION=f"Probe {self.token}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m['id'] for m in response.json()], [self.monitor.id])
+
+        self.probe.is_active = False
+        self.probe.save()
+        response = self.client.get('/api/probe/monitors/', HTTP_AUTHORIZATION=f"Probe {self.token}")
+        self.assertEqual(response.status_code, 401)
+
+    def test_batch_is_applied_once(self):
+        payload = {'batch_id': 'b1', 'results': [result(self.monitor, False)]}
+        response = self.post(payload, compress=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['accepted'], 1)
+
+        payload['results'] = [result(self.monitor, True)]
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['duplicate'])
+        self.assertFalse(ProbeVerdict.objects.get(probe=self.probe, monitor=self.monitor).is_up)
+
+    def test_rejects_malformed_and_oversized_batches(self):
+        response = self.client.post(RESULTS_URL, b'not gzip', content_type='application/json',
+                                    HTTP_CONTENT_ENCODING='gzip', HTTP_AUTHORIZATION=f"Probe {self.token}")
+        self.assertEqual(response.status_code, 400)
+
+        padded = {'batch_id': 'big', 'results': [], 'padding': 'x' * 5000}
+        with mock.patch('monitor.probes.MAX_BODY_BYTES', 1000):
+            self.assertEqual(self.post(padded, compress=True).status_code, 400)
+
+        with override_settings(PULSE_PROBE_MAX_BATCH=1):
+            payload = {'batch_id': 'many', 'results': [result(self.monitor, True)] * 2}
+            self.assertEqual(self.post(payload).status_code, 400)
+
+        self.assertEqual(self.post({'batch_id': 'row', 'results': [[self.monitor.id, True]]}).status_code, 400)
+        self.assertFalse(ProbeVerdict.objects.exists())
+
+    def test_future_timestamps_are_clamped(self):
+        ingest_batch(self.probe, 'ahead', [result(self.monitor, True, time.time() + 86400)])
+        summary = ingest_batch(self.probe, 'now', [result(self.monitor, False, time.time() + 1)])
+        self.assertEqual(summary['changed'], 1)
+        self.assertFalse(ProbeVerdict.objects.get(probe=self.probe, monitor=self.monitor).is_up)
+
+    @override_settings(PULSE_PROBE_QUORUM=3)
+    def test_quorum_of_remote_probes_and_local_agent(self):
+        other, _ = create_probe('nrt', 'Tokyo, JP')
+        incidents = IncidentManager()
+
+        ingest_batch(self.probe, 'a1', [result(self.monitor, False)])
+        ingest_batch(other, 'b1', [result(self.monitor, False)])
+        self.assertFalse(Incident.objects.filter(monitor=self.monitor).exists())
+
+        incident = incidents.update(self.monitor, False, 'Connection refused')
+        self.assertIsNotNone(incident)
+        messages = list(incident.activities.order_by('id').values_list('message', flat=True))
+        self.assertTrue(messages[0].startswith('Outage detected by Frankfurt, DE'))
+        self.assertEqual(len([m for m in messages if m.startswith('Outage confirmed by')]), 2)
+
+        # Dropping below the quorum resolves it
+        ingest_batch(other, 'b2', [result(self.monitor, True)])
+        incident.refresh_from_db()
+        self.assertEqual(incident.status, 'RESOLVED')
+
+    @override_settings(PULSE_PROBE_QUORUM=2)
+    def test_root_cause_comes_from_down_verdicts(self):
+        other, _ = create_probe('nrt', 'Tokyo, JP')
+        for probe in (self.probe, other):
+            ProbeVerdict.objects.create(probe=probe, monitor=self.monitor, is_up=False,
+                                        error_message='Connection refused', checked_at=timezone.now())
+
+        incident = IncidentManager().update(self.monitor, True, 'Status Code: 200')
+        self.assertEqual(incident.root_cause, 'Connection refused')
+
+    @override_settings(PULSE_PROBE_QUORUM=1)
+    def test_leased_status_save_keeps_open_incident(self):
+        MonitorStatus.objects.create(monitor=self.monitor, lease_owner='agent')
+        status = MonitorStatus.objects.get(pk=self.monitor.pk)
+
+        ingest_batch(self.probe, 'down', [result(self.monitor, False)])
+        self.assertTrue(save_status(status))
+        self.assertIsNotNone(MonitorStatus.objects.get(pk=self.monitor.pk).open_incident)
+
+    @override_settings(PULSE_PROBE_QUORUM=2)
+    def test_refreshed_stale_verdict_counts_again(self):
+        IncidentManager().update(self.monitor, False, 'Connection refused')
+        ingest_batch(self.probe, 'old', [result(self.monitor, False, time.time() - 2 * settings.PULSE_PROBE_MAX_AGE)])
+        self.assertFalse(Incident.objects.filter(monitor=self.monitor, status='OPEN').exists())
+
+        summary = ingest_batch(self.probe, 'new', [result(self.monitor, False)])
+        self.assertEqual(summary['changed'], 1)
+        self.assertTrue(Incident.objects.filter(monitor=self.monitor, status='OPEN').exists())
+
+
+class SchedulingTests(TestCase):
+    def schedule(self, **state):
+        monitor = MonitoredURL(interval=5)
+        status = MonitorStatus(monitor=monitor, **state)
+        cycle_at = timezone.now()
+        reason = schedule_next(status, monitor, cycle_at)
+        self.assertEqual(status.next_check_at, cycle_at + datetime.timedelta(seconds=status.check_interval))
+        return reason, status.check_interval
+
+    @override_settings(PULSE_AGENT_INTERVAL=60, PULSE_CONFIRM_INTERVAL=20, PULSE_CONFIRM_CHECKS=3, PULSE_RELAX_AFTER=600)
+    def test_interval_choice(self):
+        now = timezone.now()
+        self.assertEqual(self.schedule(is_up=False, consecutive_failures=1), (CONFIRM, 20))
+        self.assertEqual(self.schedule(is_up=False, consecutive_failures=3), (CONFIRM, 20))
+        self.assertEqual(self.schedule(is_up=False, consecutive_failures=4), (REGULAR, 60))
+        self.assertEqual(self.schedule(is_up=False, consecutive_failures=1, is_maintenance=True), (REGULAR, 60))
+        self.assertEqual(self.schedule(is_up=True, last_state_change_at=now), (REGULAR, 60))
+
+        stable = now - datetime.timedelta(hours=1)
+        self.assertEqual(self.schedule(is_up=True, last_state_change_at=stable), (RELAXED, 120))
+        self.assertEqual(self.schedule(is_up=True, last_state_change_at=stable, schedule_reason=RELAXED, check_interval=120),
+                         (RELAXED, 240))
+        # Capped at the monitor's configured interval
+        self.assertEqual(self.schedule(is_up=True, last_state_change_at=stable, schedule_reason=RELAXED, check_interval=240),
+                         (RELAXED, 300))
+
+    @override_settings(PULSE_AGENT_INTERVAL=60, PULSE_CONFIRM_INTERVAL=0, PULSE_RELAX_AFTER=0)
+    def test_adaptive_cadence_can_be_disabled(self):
+        self.assertEqual(self.schedule(is_up=False, consecutive_failures=1), (REGULAR, 60))
+        self.assertEqual(self.schedule(is_up=True, last_state_change_at=timezone.now() - datetime.timedelta(days=1)), (REGULAR, 60))
+
+
+class HostLimiterTests(TestCase):
+    ADDRESSES = {'a.example.com': '10.0.0.1', 'b.example.com': '10.0.0.1', 'c.example.com': '10.0.0.2'}
+
+    def setUp(self):
+        patcher = mock.patch('monitor.executor.socket.getaddrinfo',
+                             side_effect=lambda host, *args, **kwargs: [(None, None, None, '', (self.ADDRESSES[host], 0))])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_slots(self, limiter, hosts, hold=0.05):
+        """Enters a slot per host on its own thread; returns (peak concurrency per address, start times per address)."""
+        lock = threading.Lock()
+        active, peak, starts = {}, {}, {}
+
+        def work(host):
+            with limiter.slot(host) as address:
+                with lock:
+                    starts.setdefault(address, []).append(time.monotonic())
+                    active[address] = active.get(address, 0) + 1
+                    peak[address] = max(peak.get(address, 0), active[address])
+                time.sleep(hold)
+                with lock:
+                    active[address] -= 1
+
+        threads = [threading.Thread(target=work, args=(host,)) for host in hosts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return peak, starts
+
+    def test_limits_concurrency_per_host_and_address(self):
+        peak, _ = self.run_slots(HostLimiter(per_host=2), ['a.example.com'] * 6 + ['c.example.com'] * 6)
+        self.assertEqual(peak, {'10.0.0.1': 2, '10.0.0.2': 2})
+
+        # Two vhosts on one address share the per-address limit
+        peak, _ = self.run_slots(HostLimiter(per_host=2, per_ip=1), ['a.example.com', 'b.example.com'] * 3)
+        self.assertEqual(peak, {'10.0.0.1': 1})
+
+    def test_spaces_starts_against_one_address(self):
+        begin = time.monotonic()
+        _, starts = self.run_slots(HostLimiter(spacing=0.1), ['a.example.com', 'b.example.com', 'a.example.com', 'c.example.com'], hold=0)
+        # The n-th start against an address waits n spacings; other addresses don't wait
+        offsets = [start - begin for start in sorted(starts['10.0.0.1'])]
+        self.assertEqual(len(offsets), 3)
+        for n, offset in enumerate(offsets):
+            self.assertGreaterEqual(offset, n * 0.1)
+        self.assertLess(starts['10.0.0.2'][0] - begin, 0.1)
+
+
+class ProbeSpecTests(TestCase):
+    def test_keyword_and_http_monitors_share_a_probe(self):
+        checker = CheckCommand()
+        http = MonitoredURL(monitor_type='HTTP', url='https://shop.example.com/', http_method='get',
+                            request_headers='{"X-Debug": "1"}')
+        keyword = MonitoredURL(monitor_type='KEYWORD', url=' https://shop.example.com/', keyword='Cart')
+        post = MonitoredURL(monitor_type='HTTP', url='https://shop.example.com/', http_method='POST')
+        groups = coalesce([http, keyword, post], checker.probe_spec)
+        self.assertEqual(list(groups.values()), [[http, keyword], [post]])
+
+
+@override_settings(PULSE_ANOMALY_ALPHA=0.05, PULSE_ANOMALY_WARMUP=30, PULSE_ANOMALY_SIGMA=3,
+                   PULSE_ANOMALY_MIN_RATIO=1.5, PULSE_ANOMALY_CHECKS=3)
+class AnomalyTests(TestCase):
+    def observe(self, status, latencies):
+        """[(index, event)] for the checks that changed the monitor's state."""
+        events = [(i, observe_latency(status, latency, timezone.now())) for i, latency in enumerate(latencies)]
+        return [(i, event) for i, event in events if event]
+
+    def test_baseline_is_an_ewma_of_log_latency(self):
+        status = MonitorStatus()
+        self.assertIsNone(baseline_latency(status))
+        self.observe(status, [0.1, 0.2])
+        expected = math.log(0.1) + 0.05 * (math.log(0.2) - math.log(0.1))
+        self.assertAlmostEqual(status.latency_mean, expected)
+        self.assertAlmostEqual(baseline_latency(status), math.exp(expected))
+        self.assertEqual(status.latency_samples, 2)
+
+        # Failed checks and missing latencies leave it alone
+        self.observe(status, [None, 0])
+        self.assertEqual(status.latency_samples, 2)
+
+    def test_nothing_is_flagged_during_warmup(self):
+        status = MonitorStatus()
+        self.assertEqual(self.observe(status, [0.1] * 5 + [0.5] * 24), [])
+        self.assertIsNone(status.degraded_since)
+
+    def test_sustained_slowdown_degrades_and_recovers(self):
+        rng = random.Random(1)
+        normal = [0.1 * rng.uniform(0.9, 1.1) for _ in range(40)]
+        status = MonitorStatus()
+        # Third slow check in a row; recovery takes three times as many checks back near the baseline
+        self.assertEqual(self.observe(status, normal + [0.5] * 12 + [0.1] * 40), [(42, DEGRADED), (63, RECOVERED)])
+        self.assertIsNone(status.degraded_since)
+
+        # A single slow check is not enough
+        status = MonitorStatus()
+        self.assertEqual(self.observe(status, normal + [0.5] + [0.1] * 10), [])
+
+    def test_degraded_incident_opens_and_resolves(self):
+        monitor = MonitoredURL.objects.create(name='Shop', url='https://shop.example.com', notify_email=False)
+        checker = CheckCommand(stdout=io.StringIO())
+        checker.incidents = IncidentManager()
+        status = MonitorStatus(monitor=monitor)
+        latencies = [0.1] * 40 + [0.5] * 12
+        for latency in latencies:
+            checker.track_latency(monitor, status, latency, timezone.now())
+        incident = Incident.objects.get(monitor=monitor, kind='DEGRADED', status='OPEN')
+        self.assertTrue(incident.root_cause.startswith('Response time'))
+        self.assertEqual(checker.incidents.degradation(monitor, DEGRADED, 'again'), incident)
+
+        for latency in [0.1] * 40:
+            checker.track_latency(monitor, status, latency, timezone.now())
+        incident.refresh_from_db()
+        self.assertEqual(incident.status, 'RESOLVED')
+        self.assertFalse(Incident.objects.filter(monitor=monitor, kind='OUTAGE').exists())
+
+
+class BulkTransferTests(TestCase):
+    def test_export_and_import_keep_dependencies(self):
+        host = MonitoredURL.objects.create(name='Host', url='shop.example.com', monitor_type='PING')
+        MonitoredURL.objects.create(name='Shop', url='https://shop.example.com', parent=host)
+
+        for export_format in ('json', 'csv'):
+            content, _ = export_monitors(export_format)
+            if export_format == 'json':
+                rows = json.loads(content)
+            else:
+                rows = parse_import_payload(None, SimpleUploadedFile('monitors.csv', content.encode()))
+            created, errors = import_monitors(rows)
+            self.assertEqual(errors, [])
+            copies = {monitor.name: monitor for monitor in created}
+            self.assertEqual(MonitoredURL.objects.get(pk=copies['Shop'].pk).parent_id, copies['Host'].pk)
+
+        # An existing monitor can be referenced by id as well
+        created, errors = import_monitors([{'name': 'Api', 'url': 'https://shop.example.com/api', 'parent': host.id}])
+        self.assertEqual(created[0].parent_id, host.id)
+
+    def test_import_rejects_unknown_and_looping_parents(self):
+        rows = [
+            {'id': 1, 'name': 'A', 'url': 'https://a.example.com', 'parent': 2},
+            {'id': 2, 'name': 'B', 'url': 'https://b.example.com', 'parent': 1},
+            {'name': 'C', 'url': 'https://c.example.com', 'parent': 999},
+        ]
+        created, errors = import_monitors(rows)
+        self.assertEqual(created, [])
+        self.assertEqual([(e['row'], list(e['errors'])) for e in errors], [(0, ['parent']), (1, ['parent']), (2, ['parent'])])
+
+
+class CycleRecordingTests(TestCase):
+    def test_idle_cycles_are_only_recorded_as_heartbeat(self):
+        self.assertTrue(CycleStats().worth_recording())
+        CycleStats().save()
+        self.assertFalse(CycleStats().worth_recording())
+
+        busy = CycleStats()
+        busy.monitors_due = 1
+        self.assertTrue(busy.worth_recording())
+
+
+class DependencyTests(TestCase):
+    def test_parent_cycles_are_rejected(self):
+        a = MonitoredURL.objects.create(name='A', url='https://a.example.com')
+        b = MonitoredURL.objects.create(name='B', url='https://b.example.com', parent=a)
+        c = MonitoredURL.objects.create(name='C', url='https://c.example.com', parent=b)
+
+        for parent in (a, c):
+            serializer = MonitoredURLSerializer(a, data={'parent': parent.id}, partial=True)
+            self.assertFalse(serializer.is_valid())
+            self.assertIn('parent', serializer.errors)
+        self.assertTrue(MonitoredURLSerializer(c, data={'parent': a.id}, partial=True).is_valid())
+
+
+@override_settings(PULSE_PROBE_QUORUM=2)
+class ProbeAgentProcessTests(LiveServerTestCase):
+    """Two probe_agent processes stand in for two regions."""
+
+    def run_agent(self, token):
+        env = dict(os.environ, PULSE_PROBE_SERVER=f"{self.live_server_url}/api/", PULSE_PROBE_TOKEN=token)
+        return subprocess.Popen(
+            [sys.executable, 'manage.py', 'probe_agent', '--once', '--workers', '2'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        )
+
+    def test_regions_reach_quorum(self):
+        with TargetFarm() as farm:
+            up = MonitoredURL.objects.create(name='Up', url=farm.url('http'), timeout=5, notify_email=False)
+            down = MonitoredURL.objects.create(name='Down', url=farm.url('http', status=503), timeout=5, notify_email=False)
+            # One after the other: the test server shares a single in-memory SQLite connection
+            for name in ('eu', 'us'):
+                agent = self.run_agent(create_probe(name, name)[1])
+                output = agent.communicate(timeout=60)[0].decode()
+                self.assertEqual(agent.returncode, 0, output)
+
+        self.assertEqual(ProbeVerdict.objects.filter(monitor=down, is_up=False).count(), 2)
+        self.assertEqual(ProbeVerdict.objects.filter(monitor=up, is_up=True).count(), 2)
+        incident = Incident.objects.get(monitor=down, status='OPEN')
+        self.assertEqual(incident.activities.filter(message__startswith='Outage').count(), 2)
+        self.assertFalse(Incident.objects.filter(monitor=up).exists())
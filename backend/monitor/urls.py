@@ -6,7 +6,12 @@ from .views import (
     IncidentViewSet, 
     ActivityLogViewSet,
     StatusPageViewSet,
-    MaintenanceWindowViewSet
+    MaintenanceWindowViewSet,
+    UptimeExportView,
+    CheckCycleViewSet,
+    HealthView,
+    ProbeMonitorsView,
+    ProbeResultsView
 )
 
 router = DefaultRouter()
@@ -16,7 +21,12 @@ router.register(r'incidents', IncidentViewSet)
 router.register(r'activity-logs', ActivityLogViewSet)
 router.register(r'status-pages', StatusPageViewSet)
 router.register(r'maintenance-windows', MaintenanceWindowViewSet)
+router.register(r'check-cycles', CheckCycleViewSet)
 
 urlpatterns = [
+    path('health/', HealthView.as_view(), name='health'),
+    path('probe/monitors/', ProbeMonitorsView.as_view(), name='probe_monitors'),
+    path('probe/results/', ProbeResultsView.as_view(), name='probe_results'),
+    path('uptime-records/export/', UptimeExportView.as_view(), name='uptime_export'),
     path('', include(router.urls)),
 ]
@@ -1,5 +1,11 @@
-from rest_framework import viewsets, permissions
-from .models import MonitoredURL, AlertContact, Incident, ActivityLog, StatusPage, MaintenanceWindow
+import hashlib
+import json
+
+from rest_framework import viewsets, permissions, views
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from .models import MonitoredURL, AlertContact, Incident, ActivityLog, StatusPage, MaintenanceWindow, CheckCycle
 from .serializers import (
     MonitoredURLSerializer, 
     AlertContactSerializer, 
@@ -7,11 +13,18 @@ from .serializers import (
     ActivityLogSerializer,
     StatusPageSerializer,
     StatusPageDetailSerializer,
-    MaintenanceWindowSerializer
+    MaintenanceWindowSerializer,
+    CheckCycleSerializer
 )
+from core.dates import parse_timestamp
 from core.permissions import HasOperationPermission
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from django.core.cache import cache
+from notifications.dispatch import NotificationQueue
+from . import bulk, exports, probes, summary, telemetry
 
 class StatusPageViewSet(viewsets.ModelViewSet):
     queryset = StatusPage.objects.all()
@@ -21,7 +34,9 @@ class StatusPageViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny], url_path=r'by-slug/(?P<slug>[-\w]+)')
     def by_slug(self, request, slug=None):
         try:
-            instance = StatusPage.objects.get(slug=slug, is_public=True)
+            instance = StatusPage.objects.prefetch_related(
+                Prefetch('monitors', queryset=MonitoredURL.objects.select_related('current_status'))
+            ).get(slug=slug, is_public=True)
             serializer = StatusPageDetailSerializer(instance)
             return Response(serializer.data)
         except StatusPage.DoesNotExist:
@@ -36,9 +51,66 @@ class MonitorViewSet(viewsets.ModelViewSet):
     queryset = MonitoredURL.objects.all()
     serializer_class = MonitoredURLSerializer
     permission_classes = [permissions.IsAuthenticated, HasOperationPermission]
+    # The dashboard summary is the same for every user and polled by each open tab
+    SUMMARY_CACHE_SECONDS = 10
 
     def get_queryset(self):
-        return MonitoredURL.objects.all().order_by('-created_at')
+        return bulk.active_monitors().select_related('current_status').order_by('-created_at')
+
+    def perform_destroy(self, instance):
+        bulk.schedule_deletion([instance.id])
+
+    def _bulk_ids(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({'ids': ['A non-empty list of monitor ids is required.']})
+        try:
+            return [int(i) for i in ids]
+        except (TypeError, ValueError):
+            raise ValidationError({'ids': ['Monitor ids must be integers.']})
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        return Response(cache.get_or_set('monitors:summary', summary.fleet_summary, self.SUMMARY_CACHE_SECONDS))
+
+    @action(detail=False, methods=['post'], url_path='bulk-import')
+    def bulk_import(self, request):
+        try:
+            rows = bulk.parse_import_payload(request.data, request.FILES.get('file'))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        partial = str(request.query_params.get('partial', '')).lower() in ('1', 'true', 'yes')
+        created, errors = bulk.import_monitors(rows, partial=partial)
+        payload = {"created": len(created), "ids": [m.pk for m in created], "errors": errors}
+        return Response(payload, status=201 if created else 400)
+
+    @action(detail=False, methods=['get'], url_path='bulk-export')
+    def bulk_export(self, request):
+        export_format = (request.query_params.get('output') or 'json').lower()
+        if export_format not in ('json', 'csv'):
+            return Response({"detail": f"Unsupported format: {export_format}"}, status=400)
+        content, content_type = bulk.export_monitors(export_format)
+        response = HttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="monitors.{export_format}"'
+        return response
+
+    @action(detail=False, methods=['patch', 'delete'], url_path='bulk')
+    def bulk_change(self, request):
+        ids = self._bulk_ids(request)
+        if request.method == 'DELETE':
+            return Response({"scheduled_for_deletion": bulk.schedule_deletion(ids)})
+
+        operation = request.data.get('action')
+        if operation == 'pause':
+            changes = {'is_active': False}
+        elif operation == 'resume':
+            changes = {'is_active': True}
+        elif operation in (None, 'edit'):
+            changes = request.data.get('changes') or {}
+        else:
+            return Response({"detail": f"Unknown action: {operation}"}, status=400)
+        return Response({"updated": bulk.bulk_update_monitors(ids, changes)})
 
 class AlertContactViewSet(viewsets.ModelViewSet):
     queryset = AlertContact.objects.all()
@@ -53,7 +125,116 @@ class IncidentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Incident.objects.all().order_by('-started_at')
 
+    @action(detail=False, methods=['get'], url_path='open')
+    def open_feed(self, request):
+        """Open incidents only, for polling clients; answers 304 while the set is unchanged."""
+        incidents = list(
+            Incident.objects.filter(status='OPEN', monitor__pending_deletion=False)
+            .order_by('-started_at')
+            .values('id', 'monitor_id', 'monitor__name', 'kind', 'started_at', 'root_cause')
+        )
+        for incident in incidents:
+            incident['monitor_name'] = incident.pop('monitor__name')
+        payload = {'count': len(incidents), 'results': incidents}
+
+        etag = '"%s"' % hashlib.sha1(json.dumps(payload, cls=DjangoJSONEncoder).encode()).hexdigest()
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=304)
+        else:
+            response = Response(payload)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
 class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ActivityLog.objects.all()
     serializer_class = ActivityLogSerializer
     permission_classes = [permissions.IsAuthenticated, HasOperationPermission]
+
+
+class CheckCyclePagination(LimitOffsetPagination):
+    default_limit = 60
+    max_limit = 1440
+
+
+class CheckCycleViewSet(viewsets.ReadOnlyModelViewSet):
+    """Recent check engine cycles, newest first. Filter with ?since=."""
+    queryset = CheckCycle.objects.all()
+    serializer_class = CheckCycleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CheckCyclePagination
+
+    def get_queryset(self):
+        queryset = CheckCycle.objects.order_by('-started_at')
+        try:
+            since = parse_timestamp(self.request.query_params.get('since'))
+        except ValueError as e:
+            raise ValidationError({'since': [str(e)]})
+        if since:
+            queryset = queryset.filter(started_at__gte=since)
+        return queryset
+
+
+class HealthView(views.APIView):
+    """Agent health for load balancers and external uptime checks; 503 when degraded."""
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        healthy, report = telemetry.agent_health()
+        return Response(report, status=200 if healthy else 503)
+
+
+class UptimeExportView(views.APIView):
+    """
+    Streams uptime history as CSV or NDJSON.
+
+    Query params: monitor (id, repeatable or comma separated), since, until,
+    output (csv|ndjson), gzip (1/true).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        export_format = (params.get('output') or 'csv').lower()
+        compress = params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            monitor_ids = [
+                int(value)
+                for raw in params.getlist('monitor')
+                for value in raw.split(',') if value.strip()
+            ]
+            since = parse_timestamp(params.get('since'))
+            until = parse_timestamp(params.get('until'), end_of_day=True)
+            stream = exports.stream_export(export_format, monitor_ids, since, until, compress)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        response = StreamingHttpResponse(stream, content_type='application/gzip' if compress else exports.CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{exports.export_filename(export_format, compress)}"'
+        return response
+
+
+class ProbeMonitorsView(views.APIView):
+    """Check definitions for remote probe agents."""
+    authentication_classes = [probes.ProbeAuthentication]
+    permission_classes = [probes.IsProbe]
+
+    def get(self, request):
+        return Response(probes.probe_monitors())
+
+
+class ProbeResultsView(views.APIView):
+    """Batched, idempotent result ingest for remote probe agents (see monitor.probes)."""
+    authentication_classes = [probes.ProbeAuthentication]
+    permission_classes = [probes.IsProbe]
+
+    def post(self, request):
+        payload = probes.read_payload(request)
+        notifications = NotificationQueue(workers=1)
+        try:
+            summary = probes.ingest_batch(request.auth, payload['batch_id'], payload['results'], notifications)
+        finally:
+            notifications.close()
+        return Response(summary, status=200 if summary['duplicate'] else 201)
@@ -3,21 +3,41 @@ import subprocess
 import os
 import sys
 
+# Seconds between the scheduled starts of two check cycles
+INTERVAL = int(os.getenv('PULSE_AGENT_INTERVAL', '60'))
+# Failing monitors are re-checked this often (adaptive scheduling), so cycles
+# start at least that frequently; each cycle only checks the monitors due.
+CONFIRM_INTERVAL = int(os.getenv('PULSE_CONFIRM_INTERVAL', '20'))
+TICK = min(INTERVAL, CONFIRM_INTERVAL) if CONFIRM_INTERVAL > 0 else INTERVAL
+
 def run_agent():
     print("MarketBytes Pulse Agent Initialized. Monitoring active perimeters...")
     backend_dir = os.path.dirname(os.path.abspath(__file__))
+    next_run = time.time()
+    next_purge = next_run
     
     while True:
         try:
             print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Executing pulse synchronization...")
             # Use 'python' or 'python3' based on environment
-            cmd = [sys.executable, "manage.py", "check_websites"]
+            cmd = [sys.executable, "manage.py", "check_websites", "--scheduled-at", str(next_run)]
             subprocess.run(cmd, cwd=backend_dir)
+
+            # Background cleanup for bulk-deleted monitors, bounded per run, on the
+            # regular interval rather than every confirmation tick
+            if next_run >= next_purge:
+                cmd = [sys.executable, "manage.py", "purge_monitors", "--max-seconds", "20"]
+                subprocess.run(cmd, cwd=backend_dir)
+                next_purge = next_run + INTERVAL
         except Exception as e:
             print(f"Agent Execution Error: {e}")
         
-        # Run every 60 seconds
-        time.sleep(60)
+        # Keep a fixed schedule so slow cycles show up as scheduler lag instead of drift
+        next_run += TICK
+        now = time.time()
+        if next_run < now:
+            next_run = now
+        time.sleep(next_run - now)
 
 if __name__ == "__main__":
     run_agent()
@@ -0,0 +1,70 @@
+import queue
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.mail import send_mail
+
+from core.metrics import NOTIFICATION_QUEUE_DEPTH, NOTIFICATIONS_FAILED, NOTIFICATIONS_SENT
+
+
+def deliver(channel, target, subject, message, payload=None):
+    """Sends one notification synchronously. Raises on failure."""
+    if channel == 'EMAIL':
+        send_mail(subject, message, settings.EMAIL_HOST_USER, [target], fail_silently=False)
+    elif channel == 'SLACK':
+        requests.post(target, json={"text": f"🚨 *{subject}*\n{message}"}, timeout=5).raise_for_status()
+    elif channel == 'DISCORD':
+        requests.post(target, json={"content": f"🚨 **{subject}**\n{message}"}, timeout=5).raise_for_status()
+    elif channel == 'WEBHOOK':
+        requests.post(target, json=payload, timeout=5).raise_for_status()
+
+
+class NotificationQueue:
+    """
+    Background delivery of alerts so SMTP handshakes and webhook timeouts
+    don't stall the caller. close() waits for everything queued to be sent.
+    """
+
+    def __init__(self, workers=2, on_error=None):
+        self.on_error = on_error
+        # Total time workers spent delivering, across all threads
+        self.busy_seconds = 0.0
+        self._busy_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._threads = [threading.Thread(target=self._run, daemon=True, name=f"notify-{i}") for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, channel, target, subject, message, payload=None):
+        self._queue.put((channel, target, subject, message, payload))
+        NOTIFICATION_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            channel = job[0]
+            started = time.perf_counter()
+            try:
+                deliver(*job)
+                NOTIFICATIONS_SENT.labels(channel=channel).inc()
+            except Exception as e:
+                NOTIFICATIONS_FAILED.labels(channel=channel).inc()
+                if self.on_error:
+                    self.on_error(job, e)
+            finally:
+                with self._busy_lock:
+                    self.busy_seconds += time.perf_counter() - started
+                NOTIFICATION_QUEUE_DEPTH.set(self._queue.qsize())
+                self._queue.task_done()
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        NOTIFICATION_QUEUE_DEPTH.set(0)
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import Counter, defaultdict, deque, namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .ingest import fingerprint
+from .models import SecurityEvent, SecurityOffender
+
+WindowAlert = namedtuple('WindowAlert', ['ip_address', 'event_type', 'count', 'window_seconds'])
+
+
+class SlidingWindowCounter:
+    """Counts hits per key over the last `window` seconds."""
+
+    def __init__(self, window):
+        self.window = window
+        self._hits = defaultdict(deque)
+
+    def hit(self, key, now):
+        hits = self._hits[key]
+        hits.append(now)
+        cutoff = now - self.window
+        while hits and hits[0] < cutoff:
+            hits.popleft()
+        return len(hits)
+
+    def prune(self, now):
+        cutoff = now - self.window
+        for key in [k for k, hits in self._hits.items() if not hits or hits[-1] < cutoff]:
+            del self._hits[key]
+
+
+class AlertAggregator:
+    """
+    Turns a stream of security events into threshold alerts.
+
+    An alert fires when one (ip, event_type) reaches `threshold` events inside
+    the sliding window. Further events for that key are suppressed for
+    `cooldown` seconds and only counted towards the next digest. Windows and
+    cooldowns run on the events' own detected_at, so catching up on a
+    backlog doesn't squeeze hours of events into one window. Cooldowns are
+    seeded from SecurityOffender.last_alerted_at so separate runs of
+    check_logs don't re-alert. Shared by all source threads.
+    """
+
+    def __init__(self, threshold=None, window=None, cooldown=None, digest_interval=None):
+        self.threshold = threshold or settings.SECURITY_ALERT_THRESHOLD
+        self.window = window or settings.SECURITY_ALERT_WINDOW
+        self.cooldown = cooldown or settings.SECURITY_ALERT_COOLDOWN
+        self.digest_interval = digest_interval or settings.SECURITY_DIGEST_INTERVAL
+        self.counter = SlidingWindowCounter(self.window)
+        self._cooldown_until = {}
+        self._suppressed = Counter()
+        self._observed = Counter()
+        self._last_digest = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _in_cooldown(self, key, now):
+        if key not in self._cooldown_until:
+            last = SecurityOffender.objects.filter(ip_address=key[0], event_type=key[1]).values_list('last_alerted_at', flat=True).first()
+            self._cooldown_until[key] = last.timestamp() + self.cooldown if last else 0
+        return now < self._cooldown_until[key]
+
+    def observe(self, events):
+        """Feeds stored events in and returns the WindowAlerts they triggered."""
+        alerts = []
+        latest = 0
+        with self._lock:
+            for event in events:
+                if not event.ip_address:
+                    continue
+                now = event.detected_at.timestamp() if event.detected_at else time.time()
+                latest = max(latest, now)
+                key = (event.ip_address, event.event_type)
+                self._observed[key] += 1
+                count = self.counter.hit(key, now)
+                if count < self.threshold:
+                    continue
+                if self._in_cooldown(key, now):
+                    self._suppressed[key] += 1
+                    continue
+                self._cooldown_until[key] = now + self.cooldown
+                alerts.append(WindowAlert(key[0], key[1], count, self.window))
+            if latest:
+                self.counter.prune(latest)
+        return alerts
+
+    def pop_digest(self, force=False):
+        """
+        Returns (suppressed, observed) Counters since the last digest once
+        digest_interval has passed (or when forced), else None.
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._last_digest < self.digest_interval:
+                return None
+            self._last_digest = time.monotonic()
+            suppressed, observed = self._suppressed, self._observed
+            self._suppressed, self._observed = Counter(), Counter()
+        if not suppressed and not observed:
+            return None
+        return suppressed, observed
+
+
+def create_aggregate_event(alert, source=None):
+    """Stores one SecurityEvent summarising a threshold crossing and marks the offender as alerted."""
+    now = timezone.now()
+    summary = f"{alert.count} {alert.event_type} events from {alert.ip_address} within {alert.window_seconds}s"
+    event = SecurityEvent(
+        event_type=alert.event_type,
+        ip_address=alert.ip_address,
+        raw_log=summary,
+        source=source,
+        fingerprint=fingerprint(source, f"aggregate {summary} {now.isoformat()}"),
+        is_aggregate=True,
+        occurrences=alert.count,
+        detected_at=now,
+    )
+    event.save()
+    SecurityOffender.objects.filter(ip_address=alert.ip_address, event_type=alert.event_type).update(last_alerted_at=now)
+    return event
+
+
+def record_offenders(events):
+    """Adds stored events to the per-IP running totals, one statement per distinct (ip, type)."""
+    totals = defaultdict(lambda: [0, None, None])
+    for event in events:
+        if not event.ip_address or event.is_aggregate:
+            continue
+        entry = totals[(event.ip_address, event.event_type)]
+        entry[0] += 1
+        entry[1] = min(entry[1], event.detected_at) if entry[1] else event.detected_at
+        entry[2] = max(entry[2], event.detected_at) if entry[2] else event.detected_at
+
+    for (ip, event_type), (count, first_seen, last_seen) in totals.items():
+        changes = {'count': F('count') + count, 'last_seen': Greatest(F('last_seen'), Value(last_seen))}
+        if SecurityOffender.objects.filter(ip_address=ip, event_type=event_type).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                SecurityOffender.objects.create(ip_address=ip, event_type=event_type, count=count, first_seen=first_seen, last_seen=last_seen)
+        except IntegrityError:
+            # Another writer created it first
+            SecurityOffender.objects.filter(ip_address=ip, event_type=event_type).update(**changes)
+
+
+def format_digest(suppressed, observed, limit=20):
+    rows = [f"{ip} {event_type}: {count} events, {suppressed[(ip, event_type)]} suppressed alerts"
+            for (ip, event_type), count in observed.most_common(limit)]
+    hidden = len(observed) - limit
+    if hidden > 0:
+        rows.append(f"... and {hidden} more sources")
+    return "\n".join(rows)
@@ -0,0 +1,47 @@
+import glob
+import gzip
+import os
+import re
+
+DEFAULT_CHUNK_LINES = 5000
+
+# auth.log.1, auth.log.2.gz -> rotation index 1, 2 (the live file is 0)
+ROTATION_SUFFIX_RE = re.compile(r'(?:\.(\d+))?(?:\.gz)?$')
+
+
+def rotation_index(path):
+    match = ROTATION_SUFFIX_RE.search(path)
+    return int(match.group(1)) if match and match.group(1) else 0
+
+
+def base_source(path):
+    """
+    Logical log name for a rotated file (auth.log.2.gz -> auth.log), so lines
+    backfilled from rotated copies share fingerprints with the live tail.
+    """
+    return ROTATION_SUFFIX_RE.sub('', path, count=1)
+
+
+def expand_paths(pattern):
+    """Matched files ordered oldest first (highest rotation index first)."""
+    paths = [p for p in glob.glob(pattern) if os.path.isfile(p)]
+    return sorted(paths, key=lambda p: (-rotation_index(p), p))
+
+
+def open_log(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_line_chunks(path, chunk_lines=DEFAULT_CHUNK_LINES):
+    """Streams a plain or gzipped file as lists of at most chunk_lines lines."""
+    chunk = []
+    with open_log(path) as f:
+        for line in f:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,179 @@
+"""
+Offline IP enrichment (country, ASN, known-bad lists) from CIDR datasets
+stored under settings.SECURITY_IP_DATASETS_DIR:
+
+    country.csv        cidr,country_code
+    asn.csv            cidr,asn[,organisation]
+    *.txt / *.netset   one CIDR or address per line (# comments), file stem = list name
+
+Datasets are loaded into per-prefix-length hash tables, so a lookup is at
+most one dict probe per distinct prefix length (longest first), independent
+of how many ranges are loaded.
+"""
+import csv
+import ipaddress
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# Written by reload_ip_datasets; running processes reload when it changes
+STAMP_FILE = '.loaded'
+STAMP_CHECK_SECONDS = 60
+BLOCKLIST_SUFFIXES = ('.txt', '.netset')
+
+
+class PrefixIndex:
+    """Longest-prefix-match map from CIDR to value for IPv4 and IPv6."""
+
+    def __init__(self):
+        self._tables = {4: {}, 6: {}}
+        self._lengths = {4: [], 6: []}
+
+    def __len__(self):
+        return sum(len(table) for tables in self._tables.values() for table in tables.values())
+
+    def add(self, network, value):
+        network = ipaddress.ip_network(network, strict=False)
+        bits = network.max_prefixlen
+        tables = self._tables[network.version]
+        table = tables.setdefault(network.prefixlen, {})
+        table[int(network.network_address) >> (bits - network.prefixlen)] = value
+        self._lengths[network.version] = sorted(tables, reverse=True)
+
+    def lookup(self, ip):
+        try:
+            address = ip if isinstance(ip, (ipaddress.IPv4Address, ipaddress.IPv6Address)) else ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        bits = address.max_prefixlen
+        value = int(address)
+        tables = self._tables[address.version]
+        for prefixlen in self._lengths[address.version]:
+            hit = tables[prefixlen].get(value >> (bits - prefixlen))
+            if hit is not None:
+                return hit
+        return None
+
+
+class IPEnricher:
+    def __init__(self):
+        self.country = PrefixIndex()
+        self.asn = PrefixIndex()
+        self.blocklists = PrefixIndex()
+        self.errors = []
+
+    @property
+    def is_empty(self):
+        return not (len(self.country) or len(self.asn) or len(self.blocklists))
+
+    def _add(self, index, cidr, value, source):
+        try:
+            index.add(cidr.strip(), value)
+        except ValueError:
+            self.errors.append(f"{source}: invalid network {cidr!r}")
+
+    def load(self, directory):
+        if not directory or not os.path.isdir(directory):
+            return self
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if name == 'country.csv':
+                with open(path, newline='') as f:
+                    for row in csv.reader(f):
+                        if len(row) >= 2 and not row[0].startswith('#'):
+                            self._add(self.country, row[0], row[1].strip().upper()[:2], name)
+            elif name == 'asn.csv':
+                with open(path, newline='') as f:
+                    for row in csv.reader(f):
+                        if len(row) >= 2 and row[1].strip().isdigit():
+                            self._add(self.asn, row[0], int(row[1]), name)
+            elif name.endswith(BLOCKLIST_SUFFIXES):
+                list_name = os.path.splitext(name)[0][:100]
+                with open(path) as f:
+                    for line in f:
+                        entry = line.split('#', 1)[0].strip()
+                        if entry:
+                            self._add(self.blocklists, entry, list_name, name)
+        return self
+
+    def enrich(self, ip):
+        """Returns {'country_code', 'asn', 'threat_list'} for an address (values may be None)."""
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return {'country_code': None, 'asn': None, 'threat_list': None}
+        return {
+            'country_code': self.country.lookup(address),
+            'asn': self.asn.lookup(address),
+            'threat_list': self.blocklists.lookup(address),
+        }
+
+
+_enricher = None
+_stamp = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def datasets_dir():
+    return getattr(settings, 'SECURITY_IP_DATASETS_DIR', None)
+
+
+def _read_stamp(directory):
+    try:
+        return os.stat(os.path.join(directory, STAMP_FILE)).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def get_enricher():
+    """Process-wide enricher, reloaded when reload_ip_datasets touches the stamp file."""
+    global _enricher, _stamp, _checked_at
+    now = time.monotonic()
+    if _enricher is not None and now - _checked_at < STAMP_CHECK_SECONDS:
+        return _enricher
+    with _lock:
+        _checked_at = now
+        directory = datasets_dir()
+        stamp = _read_stamp(directory)
+        if _enricher is None or stamp != _stamp:
+            _enricher = IPEnricher().load(directory)
+            _stamp = stamp
+    return _enricher
+
+
+def mark_reloaded():
+    directory = datasets_dir()
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, STAMP_FILE), 'w') as f:
+        f.write(str(time.time()))
+
+
+def summarize_networks(addresses, group_prefix=24, min_hits=2):
+    """
+    Collapses addresses into CIDR summaries. Addresses sharing a /group_prefix
+    (IPv4) with at least min_hits others are reported as that network, the
+    rest as single hosts; adjacent networks are then merged.
+    """
+    groups = {}
+    for ip in addresses:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            continue
+        prefix = group_prefix if address.version == 4 else min(128, group_prefix * 4)
+        groups.setdefault(ipaddress.ip_network(f"{address}/{prefix}", strict=False), set()).add(address)
+
+    networks = []
+    for network, members in groups.items():
+        if len(members) >= min_hits:
+            networks.append(network)
+        else:
+            networks.extend(ipaddress.ip_network(member) for member in members)
+
+    summary = []
+    for version in (4, 6):
+        summary.extend(ipaddress.collapse_addresses(n for n in networks if n.version == version))
+    return summary
@@ -0,0 +1,90 @@
+import datetime
+import ipaddress
+import math
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from core.dates import parse_timestamp
+
+# Largest number of prefixes a non octet-aligned CIDR may expand to
+MAX_CIDR_PREFIXES = 256
+
+
+def cidr_q(value):
+    """
+    Builds an index friendly filter for an IPv4 CIDR.
+
+    ip_address is stored as text, so the network is expanded into octet
+    aligned prefixes ("10.1." for 10.1.0.0/16, "10.1.16." .. "10.1.31." for
+    10.1.16.0/20) matched with LIKE 'prefix%', or into exact addresses for
+    prefixes longer than /24.
+    """
+    try:
+        network = ipaddress.ip_network(value, strict=False)
+    except ValueError:
+        raise ValidationError({'cidr': [f"Invalid network: {value}"]})
+
+    if network.version == 6:
+        if network.prefixlen == 128:
+            return Q(ip_address=str(network.network_address))
+        raise ValidationError({'cidr': ['Only IPv4 networks (or single IPv6 addresses) are supported.']})
+
+    aligned = min(32, math.ceil(network.prefixlen / 8) * 8)
+    subnets = [network] if aligned == network.prefixlen else list(network.subnets(new_prefix=aligned))
+    if len(subnets) > MAX_CIDR_PREFIXES:
+        raise ValidationError({'cidr': ['Network is too large to filter; use a shorter prefix.']})
+
+    if aligned == 32:
+        return Q(ip_address__in=[str(subnet.network_address) for subnet in subnets])
+    if aligned == 0:
+        return Q(ip_address__contains='.')
+
+    query = Q()
+    for subnet in subnets:
+        octets = str(subnet.network_address).split('.')[:aligned // 8]
+        query |= Q(ip_address__startswith='.'.join(octets) + '.')
+    return query
+
+
+def _parse_bool(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def filter_events(queryset, params, default_days=None):
+    """
+    Applies the security event query params: type (comma separated), ip,
+    cidr, since, until, resolved, aggregate. With default_days, a missing
+    `since` falls back to that many days ago.
+    """
+    event_types = [t for t in params.get('type', '').split(',') if t]
+    if event_types:
+        queryset = queryset.filter(event_type__in=event_types)
+
+    if params.get('ip'):
+        try:
+            queryset = queryset.filter(ip_address=str(ipaddress.ip_address(params['ip'])))
+        except ValueError:
+            raise ValidationError({'ip': [f"Invalid address: {params['ip']}"]})
+
+    if params.get('cidr'):
+        queryset = queryset.filter(cidr_q(params['cidr']))
+
+    try:
+        since = parse_timestamp(params.get('since'))
+        until = parse_timestamp(params.get('until'), end_of_day=True)
+    except ValueError as e:
+        raise ValidationError({'detail': str(e)})
+    if since is None and default_days:
+        since = timezone.now() - datetime.timedelta(days=default_days)
+    if since:
+        queryset = queryset.filter(detected_at__gte=since)
+    if until:
+        queryset = queryset.filter(detected_at__lte=until)
+
+    if params.get('resolved') not in (None, ''):
+        queryset = queryset.filter(is_resolved=_parse_bool(params['resolved']))
+    if params.get('aggregate') not in (None, ''):
+        queryset = queryset.filter(is_aggregate=_parse_bool(params['aggregate']))
+    return queryset
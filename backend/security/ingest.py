@@ -0,0 +1,92 @@
+import hashlib
+from collections import OrderedDict
+
+from django.utils import timezone
+
+from .enrichment import get_enricher
+from .models import SecurityEvent
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CACHE_SIZE = 10000
+
+
+def normalize_line(line):
+    return ' '.join(line.split())
+
+
+def fingerprint(source, line):
+    return hashlib.sha256(f"{source or ''}\n{normalize_line(line)}".encode('utf-8')).hexdigest()
+
+
+class RecentFingerprints:
+    """Bounded LRU set of fingerprints already stored by this process."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def __contains__(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key):
+        self._items[key] = None
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+class EventIngestor:
+    """
+    Buffers parsed log events and writes them in batches.
+
+    Duplicates are dropped by fingerprint: first against the in-process
+    cache, then with one indexed IN lookup per batch, and finally by the
+    unique index itself (bulk_create ignore_conflicts) for concurrent
+    writers. Cost per line no longer depends on the size of the table.
+    """
+
+    def __init__(self, source, batch_size=DEFAULT_BATCH_SIZE, cache=None, enricher=None):
+        self.source = source
+        self.enricher = enricher or get_enricher()
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else RecentFingerprints()
+        self._pending = OrderedDict()
+
+    def add(self, event_type, ip, line, detected_at=None):
+        """Queues an event. Returns the events created if this triggered a flush."""
+        raw = line.strip()
+        key = fingerprint(self.source, raw)
+        if key in self.cache or key in self._pending:
+            return []
+        self._pending[key] = SecurityEvent(
+            event_type=event_type,
+            ip_address=ip,
+            raw_log=raw,
+            source=self.source,
+            fingerprint=key,
+            detected_at=detected_at or timezone.now(),
+        )
+        if ip and not self.enricher.is_empty:
+            for field, value in self.enricher.enrich(ip).items():
+                setattr(self._pending[key], field, value)
+        if len(self._pending) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Writes queued events and returns the ones that were not stored before."""
+        if not self._pending:
+            return []
+        pending, self._pending = self._pending, OrderedDict()
+
+        existing = set(SecurityEvent.objects.filter(fingerprint__in=list(pending)).values_list('fingerprint', flat=True))
+        new_events = [event for key, event in pending.items() if key not in existing]
+        if new_events:
+            SecurityEvent.objects.bulk_create(new_events, batch_size=self.batch_size, ignore_conflicts=True)
+
+        for key in pending:
+            self.cache.add(key)
+        return new_events
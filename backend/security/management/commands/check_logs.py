@@ -1,63 +1,231 @@
-from django.core.management.base import BaseCommand
-from security.models import SecurityEvent
-import re
+from django.core.management.base import BaseCommand, CommandError
 import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.db import close_old_connections, connection
+from security.tailer import LogTailer, DEFAULT_CHUNK_SIZE
+from security.ingest import EventIngestor, RecentFingerprints
+from security.parsers import ParserPipeline, SOURCE_KINDS, parse_chunk
+from security.aggregation import AlertAggregator, create_aggregate_event, record_offenders, format_digest
+from security.backfill import expand_paths, base_source, iter_line_chunks, DEFAULT_CHUNK_LINES
 from django.conf import settings
 from django.core.mail import send_mail
+from core.profiling import add_profile_arguments, profile_command
+
+def parse_source_spec(spec):
+    """'nginx:/var/log/nginx/access.log' -> ('nginx', path); a bare path parses with every parser."""
+    kind, sep, path = spec.partition(':')
+    if sep and kind in SOURCE_KINDS:
+        return kind, path
+    if sep and kind.isalpha() and len(kind) > 1:
+        raise ValueError(f"Unknown log source kind '{kind}'. Expected one of: {', '.join(SOURCE_KINDS)}")
+    return 'all', spec
 
 class Command(BaseCommand):
     help = 'Parses server logs for security events'
 
     def add_arguments(self, parser):
         parser.add_argument('--log-file', type=str, help='Path to load file')
+        parser.add_argument('--log', type=str, action='append', metavar='KIND:PATH',
+                            help=f"Log source, repeatable. KIND is one of {', '.join(SOURCE_KINDS)} (default all)")
+        parser.add_argument('--follow', action='store_true', help='Keep running and process new lines as they are written')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between file checks in follow mode')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Bytes read per chunk')
+        parser.add_argument('--from-end', action='store_true', help='Start at the end of a file that has not been read before')
+        parser.add_argument('--backfill', type=str, metavar='[KIND:]GLOB', help='Import history from plain/gzipped files, e.g. "auth:/var/log/auth.log*"')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parser processes used by --backfill')
+        parser.add_argument('--chunk-lines', type=int, default=DEFAULT_CHUNK_LINES, help='Lines per parser task in --backfill')
+        parser.add_argument('--source', type=str, help='Source name stored with backfilled events (default: log path without rotation suffix)')
+        parser.add_argument('--stats', action='store_true', help='Print per-parser throughput counters')
+        parser.add_argument('--stats-interval', type=float, default=300, help='Seconds between counter reports in follow mode')
+        add_profile_arguments(parser)
 
     def handle(self, *args, **options):
-        log_file_path = options['log_file'] or '/var/log/auth.log' # Default to linux auth log
-        
-        # For development on Windows, we might want to default to a dummy file if not provided
-        if os.name == 'nt' and not options['log_file']:
-             log_file_path = 'd:\\MarketBytes\\web-works\\website-monitoring-portal\\backend\\dummy_auth.log'
-
-        if not os.path.exists(log_file_path):
-            self.stdout.write(self.style.WARNING(f"Log file not found: {log_file_path}"))
+        title = 'check_logs'
+        if options['backfill']:
+            title += ' --backfill (parser worker processes are not included)'
+        with profile_command(self, options, title) as profiler:
+            self.profiler = profiler
+            if options['backfill']:
+                self.backfill(options)
+            else:
+                self.tail(options)
+
+    def tail(self, options):
+        sources = self.get_sources(options)
+        self.stopping = threading.Event()
+        # Shared by all sources so one IP is counted (and alerted) once
+        self.aggregator = AlertAggregator()
+
+        # One thread per source: each tails, parses and writes independently
+        threads = [
+            threading.Thread(target=self.profiler.wrap(self.run_source) if self.profiler else self.run_source, args=(kind, path, options), name=path, daemon=True)
+            for kind, path in sources
+        ]
+        if options['follow']:
+            self.stdout.write(f"Following {', '.join(f'{k}:{p}' for k, p in sources)} (poll every {options['poll_interval']}s)")
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+                self.send_digest(self.aggregator.pop_digest())
+        except KeyboardInterrupt:
+            self.stopping.set()
+            for thread in threads:
+                thread.join()
+            self.stdout.write("Stopped following.")
+
+        # Short runs never reach the digest interval; still report what was held back
+        digest = self.aggregator.pop_digest(force=True)
+        if digest and (options['follow'] or digest[0]):
+            self.send_digest(digest)
+
+    def get_sources(self, options):
+        if options['log']:
+            specs = options['log']
+        elif options['log_file']:
+            specs = [options['log_file']]
+        elif settings.SECURITY_LOG_SOURCES:
+            specs = settings.SECURITY_LOG_SOURCES
+        elif os.name == 'nt':
+            # For development on Windows, we might want to default to a dummy file if not provided
+            specs = ['d:\\MarketBytes\\web-works\\website-monitoring-portal\\backend\\dummy_auth.log']
+        else:
+            specs = ['/var/log/auth.log'] # Default to linux auth log
+        try:
+            return [parse_source_spec(spec) for spec in specs]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def run_source(self, kind, path, options):
+        pipeline = ParserPipeline(kind)
+        try:
+            if not os.path.exists(path) and not options['follow']:
+                self.stdout.write(self.style.WARNING(f"Log file not found: {path}"))
+                return
+
+            # Resumes from the persisted (inode, offset) so every line is seen once
+            tailer = LogTailer(path, chunk_size=options['chunk_size'], from_end=options['from_end'])
+            # Fingerprints stored by this thread; survives across polls in follow mode
+            recent = RecentFingerprints()
+
+            if not options['follow']:
+                self.process(tailer, pipeline, recent)
+                return
+
+            last_report = time.monotonic()
+            while not self.stopping.is_set():
+                if tailer.has_changed():
+                    close_old_connections()
+                    self.process(tailer, pipeline, recent)
+                if options['stats'] and time.monotonic() - last_report >= options['stats_interval']:
+                    last_report = time.monotonic()
+                    self.write_stats(path, pipeline)
+                self.stopping.wait(options['poll_interval'])
+        finally:
+            if options['stats']:
+                self.write_stats(path, pipeline)
+            connection.close()
+
+    def process(self, tailer, pipeline, recent):
+        ingestor = EventIngestor(source=tailer.path, cache=recent)
+        count = 0
+        for lines in tailer.read_batches():
+            for line in lines:
+                parsed = pipeline.parse(line)
+                if parsed:
+                    self.report(ingestor.add(*parsed, line), tailer.path)
+            # Flush before the tailer persists the offset for this batch
+            self.report(ingestor.flush(), tailer.path)
+            count += len(lines)
+        return count
+
+    def write_stats(self, path, pipeline):
+        self.stdout.write(f"[{path}] " + "\n".join(pipeline.summary()))
+
+    def backfill(self, options):
+        try:
+            kind, pattern = parse_source_spec(options['backfill'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        paths = expand_paths(pattern)
+        if not paths:
+            self.stdout.write(self.style.WARNING(f"No log files match: {pattern}"))
             return
 
-        with open(log_file_path, 'r') as f:
-            # In a real scenario, we would need to track the last read position to avoid re-reading
-            # For this MVP/Demo, we might just read the last N lines or all
-             lines = f.readlines()
-             for line in lines[-50:]: # Check last 50 lines for demo
-                 self.parse_line(line)
-
-    def parse_line(self, line):
-        # Example UFW block pattern
-        # "[UFW BLOCK] IN=eth0 OUT= SRC=185.209.0.12 DST=192.168.1.10..."
-        ufw_block_pattern = r"\[UFW BLOCK\].*SRC=(\d+\.\d+\.\d+\.\d+)"
-        
-        match = re.search(ufw_block_pattern, line)
-        if match:
-            ip = match.group(1)
-            
-            exists = SecurityEvent.objects.filter(
-                event_type='UFW_BLOCK', 
-                ip_address=ip, 
-                raw_log__contains=line.strip()
-            ).exists()
-            
-            if not exists:
-                SecurityEvent.objects.create(
-                    event_type='UFW_BLOCK',
-                    ip_address=ip,
-                    raw_log=line.strip()
-                )
-                self.send_alert(f"Firewall Block: IP {ip}")
-                self.stdout.write(self.style.ERROR(f"Security Alert: Blocked {ip}"))
+        pipeline = ParserPipeline(kind)
+        workers = max(1, options['workers'])
+        started = last_report = time.monotonic()
+        total_lines = total_events = 0
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path in paths:
+                ingestor = EventIngestor(source=options['source'] or base_source(path))
+                self.stdout.write(f"Backfilling {path} as {ingestor.source}")
+
+                # Bounded number of chunks in flight keeps memory flat for any file size
+                in_flight = deque()
+                chunks = iter_line_chunks(path, options['chunk_lines'])
+                while True:
+                    for chunk in chunks:
+                        in_flight.append(pool.submit(parse_chunk, chunk, kind))
+                        if len(in_flight) >= workers * 2:
+                            break
+                    if not in_flight:
+                        break
+
+                    line_count, events, stats = in_flight.popleft().result()
+                    pipeline.merge(line_count, stats)
+                    total_lines += line_count
+                    for event_type, ip, line, detected_at in events:
+                        created = ingestor.add(event_type, ip, line, detected_at)
+                        record_offenders(created)
+                        total_events += len(created)
+
+                    now = time.monotonic()
+                    if now - last_report >= 5:
+                        last_report = now
+                        self.stdout.write(f"  {total_lines} lines, {total_events} new events, {total_lines / (now - started):.0f} lines/sec")
+
+                created = ingestor.flush()
+                record_offenders(created)
+                total_events += len(created)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfill complete: {len(paths)} files, {total_lines} lines, {total_events} new events "
+            f"in {elapsed:.1f}s ({total_lines / elapsed:.0f} lines/sec)"
+        ))
+        if options['stats']:
+            self.stdout.write("\n".join(pipeline.summary()[1:]))
+
+    def report(self, events, source):
+        if not events:
+            return
+        record_offenders(events)
+        # Individual lines are stored but only threshold crossings alert
+        for alert in self.aggregator.observe(events):
+            event = create_aggregate_event(alert, source)
+            self.send_alert(f"{event.get_event_type_display()}: {event.raw_log}")
+            self.stdout.write(self.style.ERROR(f"Security Alert: {event.raw_log}"))
+
+    def send_digest(self, digest):
+        if not digest:
+            return
+        suppressed, observed = digest
+        message = format_digest(suppressed, observed)
+        self.stdout.write(f"Security digest:\n{message}")
+        self.send_alert(f"Security events since the last digest:\n\n{message}", subject="SECURITY DIGEST: Activity Summary")
 
-    def send_alert(self, message):
+    def send_alert(self, message, subject="SECURITY ALERT: Suspicious Activity Detected"):
          if settings.EMAIL_HOST_USER:
              try:
                 send_mail(
-                    "SECURITY ALERT: Suspicious Activity Detected",
+                    subject,
                     message,
                     settings.EMAIL_HOST_USER,
                     [settings.EMAIL_HOST_USER],
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0004_logcursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='securityevent',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='source',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0005_securityevent_source_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='securityevent',
+            name='detected_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+    ]
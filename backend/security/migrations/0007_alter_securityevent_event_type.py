@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0006_alter_securityevent_detected_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='securityevent',
+            name='event_type',
+            field=models.CharField(blank=True, choices=[('UFW_BLOCK', 'Firewall Block'), ('SSH_FAIL', 'SSH Failed Login'), ('SUDO_FAIL', 'Sudo Failure'), ('HTTP_ERROR', 'HTTP Error Response'), ('FAIL2BAN_BAN', 'Fail2ban Ban'), ('OTHER', 'Other')], default='OTHER', max_length=20, null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0007_alter_securityevent_event_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='securityevent',
+            name='is_aggregate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='occurrences',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='SecurityOffender',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ip_address', models.GenericIPAddressField()),
+                ('event_type', models.CharField(choices=[('UFW_BLOCK', 'Firewall Block'), ('SSH_FAIL', 'SSH Failed Login'), ('SUDO_FAIL', 'Sudo Failure'), ('HTTP_ERROR', 'HTTP Error Response'), ('FAIL2BAN_BAN', 'Fail2ban Ban'), ('OTHER', 'Other')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('first_seen', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_alerted_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-count'], name='offender_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ip_address', 'event_type'), name='unique_offender_ip_type')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0008_securityoffender_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='securityevent',
+            index=models.Index(fields=['detected_at'], name='secevent_detected_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securityevent',
+            index=models.Index(fields=['ip_address', 'detected_at'], name='secevent_ip_detected_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securityevent',
+            index=models.Index(fields=['event_type', 'detected_at'], name='secevent_type_detected_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('security', '0009_securityevent_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='securityevent',
+            name='asn',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='country_code',
+            field=models.CharField(blank=True, max_length=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='threat_list',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -1,16 +1,69 @@
 from django.db import models
+from django.utils import timezone
 
 class SecurityEvent(models.Model):
     EVENT_TYPES = (
         ('UFW_BLOCK', 'Firewall Block'),
+        ('SSH_FAIL', 'SSH Failed Login'),
+        ('SUDO_FAIL', 'Sudo Failure'),
+        ('HTTP_ERROR', 'HTTP Error Response'),
+        ('FAIL2BAN_BAN', 'Fail2ban Ban'),
         ('OTHER', 'Other'),
     )
 
     event_type = models.CharField(max_length=20, choices=EVENT_TYPES, default='OTHER', null=True, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     raw_log = models.TextField(null=True, blank=True)
-    detected_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    # Taken from the log line when it carries a timestamp (backfills), else insert time
+    detected_at = models.DateTimeField(default=timezone.now, null=True, blank=True)
     is_resolved = models.BooleanField(default=False, null=True, blank=True)
+    # Log file the line came from and sha256(source + normalized line) for dedup
+    source = models.CharField(max_length=255, null=True, blank=True)
+    fingerprint = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    # Aggregated alert rows summarise `occurrences` events from one IP within a window
+    is_aggregate = models.BooleanField(default=False)
+    occurrences = models.PositiveIntegerField(default=1)
+    # Offline enrichment from local CIDR datasets (see security/enrichment.py)
+    country_code = models.CharField(max_length=2, null=True, blank=True)
+    asn = models.PositiveIntegerField(null=True, blank=True)
+    threat_list = models.CharField(max_length=100, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['detected_at'], name='secevent_detected_idx'),
+            models.Index(fields=['ip_address', 'detected_at'], name='secevent_ip_detected_idx'),
+            models.Index(fields=['event_type', 'detected_at'], name='secevent_type_detected_idx'),
+        ]
 
     def __str__(self):
         return f"{self.event_type} - {self.ip_address} - {self.detected_at}"
+
+class SecurityOffender(models.Model):
+    """Running per-IP, per-type totals so "top offenders" never scans SecurityEvent."""
+    ip_address = models.GenericIPAddressField()
+    event_type = models.CharField(max_length=20, choices=SecurityEvent.EVENT_TYPES)
+    count = models.PositiveIntegerField(default=0)
+    first_seen = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now)
+    last_alerted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ip_address', 'event_type'], name='unique_offender_ip_type'),
+        ]
+        indexes = [
+            models.Index(fields=['-count'], name='offender_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ip_address} {self.event_type} x{self.count}"
+
+class LogCursor(models.Model):
+    """Last read position of a tailed log file, so each line is processed once."""
+    path = models.CharField(max_length=255, unique=True)
+    inode = models.BigIntegerField(null=True, blank=True)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.path} @ {self.offset} (inode {self.inode})"
@@ -0,0 +1,166 @@
+"""
+Pure line parsers for security logs.
+
+Nothing here touches Django so the functions can run inside worker
+processes during backfills.
+"""
+import datetime
+import ipaddress
+import re
+import time
+from collections import namedtuple
+
+# A parser only runs its regex when one of its literals occurs in the line,
+# so the bulk of unrelated log lines cost a few substring checks.
+LineParser = namedtuple('LineParser', ['name', 'kind', 'event_type', 'literals', 'regex'])
+
+PARSERS = [
+    # "[UFW BLOCK] IN=eth0 OUT= SRC=185.209.0.12 DST=192.168.1.10..."
+    LineParser('ufw_block', 'auth', 'UFW_BLOCK', ('[UFW BLOCK]',),
+               re.compile(r"\[UFW BLOCK\].*SRC=(?P<ip>[0-9a-fA-F:.]+)")),
+    # "sshd[811]: Failed password for invalid user admin from 1.2.3.4 port 22 ssh2"
+    LineParser('ssh_failed_password', 'auth', 'SSH_FAIL', ('Failed password',),
+               re.compile(r"Failed password for (?:invalid user )?\S* ?from (?P<ip>[0-9a-fA-F:.]+) port")),
+    # "sshd[811]: Invalid user oracle from 1.2.3.4 port 50022"
+    LineParser('ssh_invalid_user', 'auth', 'SSH_FAIL', ('Invalid user',),
+               re.compile(r"Invalid user \S* ?from (?P<ip>[0-9a-fA-F:.]+)")),
+    # "sudo: pam_unix(sudo:auth): authentication failure; ... rhost= user=deploy"
+    # "sudo:   deploy : 3 incorrect password attempts ; TTY=pts/0 ; ..."
+    LineParser('sudo_failure', 'auth', 'SUDO_FAIL', ('sudo',),
+               re.compile(r"sudo(?:\[\d+\])?:.*(?:authentication failure|incorrect password attempt|NOT in sudoers)")),
+    # nginx combined format: '1.2.3.4 - - [19/Oct/2026:11:00:00 +0000] "GET /x HTTP/1.1" 404 153 ...'
+    LineParser('nginx_error', 'nginx', 'HTTP_ERROR', ('" 4', '" 5'),
+               re.compile(r'^(?P<ip>[0-9a-fA-F:.]+) \S+ \S+ \[[^\]]+\] "[^"]*" (?P<status>[45]\d\d) ')),
+    # "2026-10-19 11:00:00,123 fail2ban.actions [912]: NOTICE  [sshd] Ban 1.2.3.4"
+    LineParser('fail2ban_ban', 'fail2ban', 'FAIL2BAN_BAN', ('] Ban ',),
+               re.compile(r"\[(?P<jail>[^\]]+)\] Ban (?P<ip>[0-9a-fA-F:.]+)")),
+]
+
+SOURCE_KINDS = ('all', 'auth', 'nginx', 'fail2ban')
+
+# "2026-03-03T12:34:56.123456+00:00 host ..." (rsyslog high precision format)
+ISO_TIMESTAMP_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[+-]\d{2}:?\d{2}|Z)?)\s")
+# "Mar  3 12:34:56 host ..." (classic syslog, no year)
+SYSLOG_TIMESTAMP_RE = re.compile(r"^([A-Z][a-z]{2}\s+\d{1,2}\s\d{2}:\d{2}:\d{2})\s")
+
+
+class ParserStats:
+    __slots__ = ('candidates', 'matched', 'seconds')
+
+    def __init__(self, candidates=0, matched=0, seconds=0.0):
+        self.candidates = candidates
+        self.matched = matched
+        self.seconds = seconds
+
+
+class ParserPipeline:
+    """
+    Runs the parsers for one kind of log source over lines and keeps
+    per-parser counters (lines that passed the literal prefilter, matches,
+    time spent in the regex). Not thread safe: use one pipeline per source.
+    """
+
+    def __init__(self, kind='all'):
+        if kind not in SOURCE_KINDS:
+            raise ValueError(f"Unknown log source kind: {kind}")
+        self.kind = kind
+        self.parsers = [p for p in PARSERS if kind == 'all' or p.kind == kind]
+        self.stats = {p.name: ParserStats() for p in self.parsers}
+        self.lines = 0
+        self.started = time.monotonic()
+
+    def parse(self, line):
+        """Returns (event_type, ip) for the first parser that matches, else None."""
+        self.lines += 1
+        for parser in self.parsers:
+            for literal in parser.literals:
+                if literal in line:
+                    break
+            else:
+                continue
+
+            stats = self.stats[parser.name]
+            stats.candidates += 1
+            started = time.perf_counter()
+            match = parser.regex.search(line)
+            stats.seconds += time.perf_counter() - started
+            if match:
+                stats.matched += 1
+                return parser.event_type, _clean_ip(match.groupdict().get('ip'))
+        return None
+
+    def merge(self, lines, stats):
+        """Adds counters collected elsewhere (e.g. by a worker process)."""
+        self.lines += lines
+        for name, (candidates, matched, seconds) in stats.items():
+            own = self.stats[name]
+            own.candidates += candidates
+            own.matched += matched
+            own.seconds += seconds
+
+    def export_stats(self):
+        return {name: (s.candidates, s.matched, s.seconds) for name, s in self.stats.items()}
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rows = [f"{self.lines} lines in {elapsed:.1f}s ({self.lines / elapsed:.0f} lines/sec)"]
+        for name, s in self.stats.items():
+            regex_rate = s.candidates / s.seconds if s.seconds else 0
+            rows.append(f"  {name}: {s.candidates} candidates, {s.matched} matched, {s.seconds * 1000:.1f}ms regex ({regex_rate:.0f} lines/sec)")
+        return rows
+
+
+def _clean_ip(value):
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+
+def parse_timestamp(line, now=None):
+    """
+    Extracts the log timestamp as an aware UTC datetime, or None.
+
+    Classic syslog lines carry no year or zone: they are read as UTC in the
+    current year, or the previous one if that would be in the future.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    match = ISO_TIMESTAMP_RE.match(line)
+    if match:
+        try:
+            value = datetime.datetime.fromisoformat(match.group(1).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.astimezone(datetime.timezone.utc)
+
+    match = SYSLOG_TIMESTAMP_RE.match(line)
+    if match:
+        # Trying each year separately also copes with Feb 29 existing in only one of them
+        for year in (now.year, now.year - 1):
+            try:
+                value = datetime.datetime.strptime(f"{year} {match.group(1)}", '%Y %b %d %H:%M:%S')
+            except ValueError:
+                continue
+            value = value.replace(tzinfo=datetime.timezone.utc)
+            if value <= now + datetime.timedelta(days=1):
+                return value
+    return None
+
+
+def parse_chunk(lines, kind='all'):
+    """
+    Worker entry point for backfills. Returns (line_count, events, stats)
+    where events is a list of (event_type, ip, line, detected_at) and stats
+    is ParserPipeline.export_stats() for this chunk.
+    """
+    pipeline = ParserPipeline(kind)
+    events = []
+    for line in lines:
+        parsed = pipeline.parse(line)
+        if parsed:
+            events.append((parsed[0], parsed[1], line, parse_timestamp(line)))
+    return len(lines), events, pipeline.export_stats()
@@ -0,0 +1,98 @@
+import os
+
+from django.utils import timezone
+
+from .models import LogCursor
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# A "line" without a newline is flushed once it grows past this many bytes
+MAX_LINE_BYTES = 16 * 1024
+
+
+class LogTailer:
+    """
+    Incrementally reads a log file from a persisted (inode, offset) cursor.
+
+    Handles logrotate (inode change: the rest of the old file is drained from
+    its rotated name, e.g. auth.log.1, before starting the new file) and
+    truncation (size below offset: restart from 0). Reads happen in bounded
+    chunks and only complete lines are emitted; the cursor is saved after the
+    caller has processed each batch.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, from_end=False):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.cursor, created = LogCursor.objects.get_or_create(path=path)
+        if created and from_end and os.path.exists(path):
+            st = os.stat(path)
+            self._save(st.st_ino, st.st_size)
+        self._last_stat = None
+
+    def _save(self, inode, offset):
+        self.cursor.inode = inode
+        self.cursor.offset = offset
+        LogCursor.objects.filter(pk=self.cursor.pk).update(inode=inode, offset=offset, updated_at=timezone.now())
+
+    def has_changed(self):
+        """Cheap stat() check used by follow mode before opening the file."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        changed = key != self._last_stat
+        self._last_stat = key
+        return changed
+
+    def _find_rotated(self, inode):
+        for candidate in (f"{self.path}.1", f"{self.path}.0"):
+            try:
+                if os.stat(candidate).st_ino == inode:
+                    return candidate
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _read_from(self, path, inode, offset):
+        """Yields lists of decoded lines, saving the cursor after each one is consumed."""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            pending = b''
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    return
+                pending += data
+                cut = pending.rfind(b'\n') + 1
+                if not cut and len(pending) >= MAX_LINE_BYTES:
+                    cut = len(pending)
+                if not cut:
+                    continue
+                complete, pending = pending[:cut], pending[cut:]
+                offset += len(complete)
+                yield [line.decode('utf-8', errors='replace') for line in complete.splitlines()]
+                self._save(inode, offset)
+
+    def read_batches(self):
+        """Yields batches of new lines since the last saved position."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        inode, offset = self.cursor.inode, self.cursor.offset
+        if inode is not None and inode != st.st_ino:
+            rotated = self._find_rotated(inode)
+            if rotated:
+                yield from self._read_from(rotated, inode, offset)
+            offset = 0
+            self._save(st.st_ino, 0)
+        elif st.st_size < offset:
+            # Truncated in place (copytruncate)
+            offset = 0
+            self._save(st.st_ino, 0)
+        elif inode is None:
+            self._save(st.st_ino, offset)
+
+        yield from self._read_from(self.path, st.st_ino, offset)
@@ -1,3 +1,127 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .aggregation import AlertAggregator, WindowAlert
+from .models import LogCursor, SecurityEvent, SecurityOffender
+from .tailer import LogTailer
+
+START = timezone.now() - datetime.timedelta(days=1)
+
+
+def events(*offsets, ip='203.0.113.7', event_type='SSH_FAIL'):
+    """Unsaved events detected `offsets` seconds after START."""
+    return [SecurityEvent(ip_address=ip, event_type=event_type, detected_at=START + datetime.timedelta(seconds=s))
+            for s in offsets]
+
+
+class LogTailerTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'auth.log')
+
+    def write(self, text, mode='a', path=None):
+        with open(path or self.path, mode) as f:
+            f.write(text)
+
+    def read(self, **kwargs):
+        # A fresh tailer per read, as each check_logs run resumes from the stored cursor
+        return [line for batch in LogTailer(self.path, **kwargs).read_batches() for line in batch]
+
+    def test_resumes_from_saved_cursor(self):
+        self.write('one\ntwo\n')
+        self.assertEqual(self.read(), ['one', 'two'])
+        cursor = LogCursor.objects.get(path=self.path)
+        self.assertEqual((cursor.inode, cursor.offset), (os.stat(self.path).st_ino, 8))
+
+        # Incomplete lines wait for their newline
+        self.write('three\nfou')
+        self.assertEqual(self.read(), ['three'])
+        self.write('r\n')
+        self.assertEqual(self.read(), ['four'])
+        self.assertEqual(self.read(), [])
+
+    def test_small_chunks_split_lines_correctly(self):
+        self.write('alpha\nbeta\ngamma\n')
+        self.assertEqual(self.read(chunk_size=4), ['alpha', 'beta', 'gamma'])
+
+    def test_from_end_skips_existing_lines(self):
+        self.write('old\n')
+        self.assertEqual(self.read(from_end=True), [])
+        self.write('new\n')
+        self.assertEqual(self.read(from_end=True), ['new'])
+
+    def test_drains_rotated_file_before_new_one(self):
+        self.write('one\n')
+        self.assertEqual(self.read(), ['one'])
+        self.write('two\n')
+        os.rename(self.path, f"{self.path}.1")
+        self.write('three\n', mode='w')
+
+        self.assertEqual(self.read(), ['two', 'three'])
+        cursor = LogCursor.objects.get(path=self.path)
+        self.assertEqual((cursor.inode, cursor.offset), (os.stat(self.path).st_ino, 6))
+
+    def test_rotated_file_gone_starts_new_file_from_the_top(self):
+        self.write('one\n')
+        self.read()
+        # Created before the old file goes away, so it can't reuse its inode
+        self.write('two\n', mode='w', path=f"{self.path}.new")
+        os.replace(f"{self.path}.new", self.path)
+        self.assertEqual(self.read(), ['two'])
+
+    def test_truncation_restarts_from_zero(self):
+        self.write('a fairly long first line\n')
+        self.read()
+        # copytruncate keeps the inode and empties the file
+        self.write('short\n', mode='w')
+        self.assertEqual(self.read(), ['short'])
+        self.assertEqual(LogCursor.objects.get(path=self.path).offset, 6)
+
+
+class AlertAggregatorTests(TestCase):
+    def aggregator(self, **kwargs):
+        return AlertAggregator(**{'threshold': 3, 'window': 60, 'cooldown': 600, 'digest_interval': 3600, **kwargs})
+
+    def test_threshold_within_window_of_event_time(self):
+        aggregator = self.aggregator()
+        self.assertEqual(aggregator.observe(events(0, 10)), [])
+        self.assertEqual(aggregator.observe(events(20)), [WindowAlert('203.0.113.7', 'SSH_FAIL', 3, 60)])
+
+        # A backlog read in one go still spreads over its own timestamps
+        aggregator = self.aggregator()
+        self.assertEqual(aggregator.observe(events(*range(0, 1000, 100))), [])
+        # Keys are counted separately
+        self.assertEqual(aggregator.observe(events(0, 1, ip='198.51.100.1') + events(2, event_type='UFW_BLOCK')), [])
+
+    def test_cooldown_runs_on_event_time(self):
+        aggregator = self.aggregator()
+        alerts = aggregator.observe(events(0, 1, 2, 3, 4, 300, 301, 302))
+        self.assertEqual(len(alerts), 1)
+        # Once the cooldown has passed in event time, the next burst alerts again
+        self.assertEqual(len(aggregator.observe(events(700, 701, 702))), 1)
+
+    def test_cooldown_is_seeded_from_last_alert(self):
+        SecurityOffender.objects.create(ip_address='203.0.113.7', event_type='SSH_FAIL',
+                                        last_alerted_at=START + datetime.timedelta(seconds=-60))
+        aggregator = self.aggregator()
+        self.assertEqual(aggregator.observe(events(0, 1, 2)), [])
+        self.assertEqual(len(aggregator.observe(events(600, 601, 602))), 1)
+
+    def test_digest_reports_suppressed_and_observed(self):
+        aggregator = self.aggregator()
+        aggregator.observe(events(0, 1, 2, 3, 4) + events(5, ip='198.51.100.1'))
+        self.assertIsNone(aggregator.pop_digest())
 
-# Create your tests here.
+        with mock.patch('security.aggregation.time.monotonic', return_value=aggregator._last_digest + 3600):
+            suppressed, observed = aggregator.pop_digest()
+        self.assertEqual(suppressed, {('203.0.113.7', 'SSH_FAIL'): 2})
+        self.assertEqual(observed, {('203.0.113.7', 'SSH_FAIL'): 5, ('198.51.100.1', 'SSH_FAIL'): 1})
+        # Counters start over, and an empty digest is skipped
+        self.assertIsNone(aggregator.pop_digest(force=True))
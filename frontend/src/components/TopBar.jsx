@@ -1,9 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { MagnifyingGlassIcon, BellIcon, Bars3Icon, ArrowLeftOnRectangleIcon } from '@heroicons/react/24/outline';
 import { useToast } from './Toast';
 import { getAuth } from '../services/auth';
-import api, { logout } from '../services/api';
+import { getOpenIncidents, logout } from '../services/api';
 
 const TopBar = ({ toggleSidebar }) => {
     const { addToast } = useToast();
@@ -11,6 +11,8 @@ const TopBar = ({ toggleSidebar }) => {
     const [search, setSearch] = useState('');
     const [auth, setAuth] = useState(getAuth());
     const [incidents, setIncidents] = useState([]);
+    const [openCount, setOpenCount] = useState(0);
+    const incidentsEtag = useRef(null);
     const [isNotifOpen, setIsNotifOpen] = useState(false);
 
     useEffect(() => {
@@ -24,9 +26,11 @@ const TopBar = ({ toggleSidebar }) => {
 
     const fetchIncidents = async () => {
         try {
-            const res = await api.get('incidents/');
-            // Get last 5 ongoing/recent incidents
-            setIncidents(res.data.slice(0, 5));
+            const res = await getOpenIncidents(incidentsEtag.current);
+            if (res.status === 304) return;
+            incidentsEtag.current = res.headers.etag;
+            setOpenCount(res.data.count);
+            setIncidents(res.data.results.slice(0, 5));
         } catch (error) {
             console.error("Failed to fetch notification pulse", error);
         }
@@ -76,7 +80,7 @@ const TopBar = ({ toggleSidebar }) => {
                             className={`relative p-2 ${isNotifOpen ? 'text-black' : 'text-zinc-600'} hover:text-black transition-colors duration-500`}
                         >
                             <BellIcon className="w-6 h-6" />
-                            {incidents.some(i => !i.resolved_at) && (
+                            {openCount > 0 && (
                                 <span className="absolute top-2.5 right-2.5 block h-1.5 w-1.5 rounded-full bg-red-500 animate-pulse"></span>
                             )}
                         </button>
@@ -90,7 +94,7 @@ const TopBar = ({ toggleSidebar }) => {
                                         <div className="flex items-center justify-between">
                                             <h3 className="text-[10px] font-bold text-black uppercase tracking-[0.2em]">Pulse Alerts</h3>
                                             <span className="text-[8px] bg-black text-white px-2 py-0.5 rounded-md font-bold uppercase tracking-widest">
-                                                {incidents.filter(i => !i.resolved_at).length} ACTIVE
+                                                {openCount} ACTIVE
                                             </span>
                                         </div>
                                     </div>
@@ -106,15 +110,15 @@ const TopBar = ({ toggleSidebar }) => {
                                                     className="p-5 hover:bg-zinc-50 transition-colors border-b border-zinc-50 last:border-0 cursor-pointer group"
                                                 >
                                                     <div className="flex items-start space-x-4">
-                                                        <div className={`mt-1 h-1.5 w-1.5 rounded-full shrink-0 ${incident.resolved_at ? 'bg-zinc-200' : 'bg-red-500 shadow-[0_0_8px_rgba(239,68,68,0.5)]'}`}></div>
+                                                        <div className={`mt-1 h-1.5 w-1.5 rounded-full shrink-0 ${incident.kind === 'DEGRADED' ? 'bg-amber-500 shadow-[0_0_8px_rgba(245,158,11,0.5)]' : 'bg-red-500 shadow-[0_0_8px_rgba(239,68,68,0.5)]'}`}></div>
                                                         <div className="flex-1 min-w-0">
-                                                            <p className="text-[11px] font-bold text-black uppercase tracking-tight truncate group-hover:text-red-500 transition-colors">
-                                                                {incident.url_name} Offline
+                                                            <p className={`text-[11px] font-bold text-black uppercase tracking-tight truncate ${incident.kind === 'DEGRADED' ? 'group-hover:text-amber-500' : 'group-hover:text-red-500'} transition-colors`}>
+                                                                {incident.monitor_name} {incident.kind === 'DEGRADED' ? 'Degraded' : 'Offline'}
                                                             </p>
-                                                            <p className="text-[10px] text-zinc-500 mt-1 line-clamp-1">{incident.error_message}</p>
+                                                            <p className="text-[10px] text-zinc-500 mt-1 line-clamp-1">{incident.root_cause}</p>
                                                             <p className="text-[8px] text-zinc-400 mt-2 font-medium">
-                                                                {new Date(incident.created_at).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })} //
-                                                                <span className="ml-1">{incident.resolved_at ? 'RESOLVED' : 'ONGOING'}</span>
+                                                                {new Date(incident.started_at).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })} //
+                                                                <span className="ml-1">ONGOING</span>
                                                             </p>
                                                         </div>
                                                     </div>
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate, useOutletContext } from 'react-router-dom';
-import { getMonitors } from '../services/api';
+import { getDashboardSummary } from '../services/api';
 import { getAuth } from '../services/auth';
 import {
     ClockIcon,
@@ -25,11 +25,11 @@ const Dashboard = () => {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const res = await getMonitors();
-                setMonitors(res.data);
+                const res = await getDashboardSummary();
+                setMonitors(res.data.monitors);
                 calculateStats(res.data);
             } catch (error) {
-                console.error("Failed to fetch monitors", error);
+                console.error("Failed to fetch dashboard summary", error);
             }
         };
         fetchData();
@@ -37,16 +37,16 @@ const Dashboard = () => {
         return () => clearInterval(interval);
     }, [refreshTrigger]);
 
-    const calculateStats = (data) => {
-        const up = data.filter(m => m.last_record?.is_up).length;
-        const down = data.filter(m => m.last_record && !m.last_record.is_up).length;
-        const avg = data.length > 0
-            ? Math.round(data.reduce((acc, m) => acc + (m.last_record?.response_time || 0), 0) / data.length * 1000)
-            : 0;
-        const uptime = data.length > 0
-            ? (data.reduce((acc, m) => acc + (m.uptime_percentage_24h || 0), 0) / data.length).toFixed(2)
-            : 0;
-        setStats({ up, down, total: data.length, avgResponse: `${avg}ms`, fleetUptime: `${uptime}%` });
+    const calculateStats = (summary) => {
+        const avg = Math.round((summary.avg_response_time || 0) * 1000);
+        const uptime = (summary.uptime['24h'] ?? 0).toFixed(2);
+        setStats({
+            up: summary.by_status.UP || 0,
+            down: summary.by_status.DOWN || 0,
+            total: summary.total,
+            avgResponse: `${avg}ms`,
+            fleetUptime: `${uptime}%`,
+        });
     };
 
     const handleAction = (name) => {
@@ -131,8 +131,8 @@ const Dashboard = () => {
                                 >
                                     <div className="flex items-center space-x-6">
                                         <div className="relative">
-                                            <div className={`w-3 h-3 rounded-full ${mon.last_record?.is_up ? 'bg-black' : 'bg-zinc-300'} shadow-sm`}></div>
-                                            {!mon.last_record?.is_up && mon.last_record && (
+                                            <div className={`w-3 h-3 rounded-full ${mon.is_up ? 'bg-black' : 'bg-zinc-300'} shadow-sm`}></div>
+                                            {mon.is_up === false && (
                                                 <div className="absolute -inset-1 rounded-full bg-zinc-300/20 animate-ping"></div>
                                             )}
                                         </div>
@@ -154,19 +154,19 @@ const Dashboard = () => {
                                         </div>
                                     </div>
                                     <div className="flex items-center space-x-12">
-                                        {mon.last_record?.is_up ? (
+                                        {mon.is_up ? (
                                             <div className="text-right hidden sm:block">
                                                 <p className="text-[10px] text-zinc-900 font-bold uppercase tracking-[0.2em] leading-none mb-1">Online</p>
                                                 <p className="text-[8px] text-zinc-400 font-medium uppercase tracking-widest">Active Pulse</p>
                                             </div>
-                                        ) : mon.last_record && (
+                                        ) : mon.is_up === false && (
                                             <div className="text-right hidden sm:block">
                                                 <p className="text-[10px] text-red-500 font-bold uppercase tracking-[0.2em] leading-none mb-1">Offline</p>
-                                                <p className="text-[8px] text-zinc-400 mt-1 truncate max-w-[100px]">{mon.last_record.error_message}</p>
+                                                <p className="text-[8px] text-zinc-400 mt-1 truncate max-w-[100px]">{mon.error_message}</p>
                                             </div>
                                         )}
                                         <div className="text-right">
-                                            <p className="text-sm font-medium text-black">{mon.last_record?.response_time ? (mon.last_record.response_time * 1000).toFixed(0) : 0}ms</p>
+                                            <p className="text-sm font-medium text-black">{mon.response_time ? (mon.response_time * 1000).toFixed(0) : 0}ms</p>
                                             <p className="text-[9px] text-zinc-600 font-normal uppercase mt-0.5">Latency</p>
                                         </div>
                                         <button className="p-2 transition-transform duration-500 group-hover:translate-x-1">
@@ -77,8 +77,8 @@ const Incidents = () => {
                                         className="hover:bg-zinc-50/50 transition-colors group cursor-pointer"
                                     >
                                         <td className="px-8 py-6 whitespace-nowrap">
-                                            <span className={`px-3 py-1 text-[9px] font-bold uppercase tracking-widest rounded-full border ${incident.status === 'RESOLVED' ? 'bg-zinc-50 text-black border-zinc-200' : 'bg-red-50 text-red-600 border-red-100'}`}>
-                                                {incident.status}
+                                            <span className={`px-3 py-1 text-[9px] font-bold uppercase tracking-widest rounded-full border ${incident.status === 'RESOLVED' ? 'bg-zinc-50 text-black border-zinc-200' : incident.kind === 'DEGRADED' ? 'bg-amber-50 text-amber-600 border-amber-100' : 'bg-red-50 text-red-600 border-red-100'}`}>
+                                                {incident.status === 'OPEN' && incident.kind === 'DEGRADED' ? 'DEGRADED' : incident.status}
                                             </span>
                                         </td>
                                         <td className="px-8 py-6 whitespace-nowrap">
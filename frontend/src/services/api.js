@@ -21,6 +21,25 @@ api.interceptors.request.use(
     (error) => Promise.reject(error)
 );
 
+// Role/permission changes invalidate issued access tokens; refresh once and retry
+api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        const refresh = localStorage.getItem('refresh_token');
+        if (error.response?.status === 401 && error.response.data?.code === 'token_outdated' && refresh && !original._retried) {
+            original._retried = true;
+            const res = await axios.post(`${API_URL}token/refresh/`, { refresh });
+            localStorage.setItem('access_token', res.data.access);
+            localStorage.setItem('user_role', res.data.role);
+            localStorage.setItem('user_permissions', JSON.stringify(res.data.permissions));
+            original.headers.Authorization = `Bearer ${res.data.access}`;
+            return api(original);
+        }
+        return Promise.reject(error);
+    }
+);
+
 export const login = (email, password) => {
     return api.post('login/', { email, password });
 };
@@ -46,6 +65,10 @@ export const getMonitors = () => {
     return api.get('monitors/');
 };
 
+export const getDashboardSummary = () => {
+    return api.get('monitors/summary/');
+};
+
 export const getMonitor = (id) => {
     return api.get(`monitors/${id}/`);
 };
@@ -62,6 +85,18 @@ export const deleteMonitor = (id) => {
     return api.delete(`monitors/${id}/`);
 };
 
+export const bulkImportMonitors = (monitors) => {
+    return api.post('monitors/bulk-import/', monitors);
+};
+
+export const bulkUpdateMonitors = (ids, action, changes) => {
+    return api.patch('monitors/bulk/', { ids, action, changes });
+};
+
+export const bulkDeleteMonitors = (ids) => {
+    return api.delete('monitors/bulk/', { data: { ids } });
+};
+
 // Alert Contacts
 export const getAlertContacts = () => {
     return api.get('alert-contacts/');
@@ -80,6 +115,14 @@ export const getIncidents = () => {
     return api.get('incidents/');
 };
 
+// Open incidents only; pass the last ETag to get a 304 when nothing changed
+export const getOpenIncidents = (etag) => {
+    return api.get('incidents/open/', {
+        headers: etag ? { 'If-None-Match': etag } : {},
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+};
+
 export const getIncident = (id) => {
     return api.get(`incidents/${id}/`);
 };